@@ -9,60 +9,277 @@ from typing import Any
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from aegis.config import settings
+from aegis.core.diagnosis_cache import anomaly_fingerprint, diagnosis_cache
 from aegis.core.models import (
     AnomalyModel,
     Diagnosis,
     MonitoredTableModel,
     Recommendation,
 )
-from aegis.services.llm import llm_client
+from aegis.services.llm import BATCH_SYSTEM_PROMPT, SYSTEM_PROMPT, llm_client
 
 logger = logging.getLogger("aegis.architect")
 
 
+class DiagnosisUnavailableError(RuntimeError):
+    """The LLM could not diagnose an anomaly and the caller declined the fallback."""
+
+
 class Architect:
     """Uses GPT-4 to diagnose root causes of data anomalies."""
 
     def __init__(self, lineage_graph=None):
         self.lineage = lineage_graph
 
-    def analyze(self, anomaly: AnomalyModel, db: Session) -> Diagnosis:
-        """Perform root-cause analysis on an anomaly."""
+    def analyze(
+        self, anomaly: AnomalyModel, db: Session, fallback: bool = True
+    ) -> Diagnosis:
+        """Perform root-cause analysis on an anomaly.
+
+        LLM diagnoses are cached by anomaly fingerprint; a recurring anomaly
+        gets the earlier diagnosis back, rewritten for its table and marked
+        ``cached``, without an LLM call.
+
+        With ``fallback=False`` and an LLM configured, a failed LLM call
+        raises ``DiagnosisUnavailableError`` instead of returning the
+        rule-based diagnosis, so a queued job can retry it later.
+        """
+        cached, cache_key = self._cache_lookup(anomaly, db)
+        if cached is not None:
+            return cached
+        return self._diagnose(anomaly, db, cache_key, fallback)
+
+    def analyze_many(
+        self, anomalies: list[AnomalyModel], db: Session, fallback: bool = True
+    ) -> dict[int, Diagnosis | None]:
+        """Diagnose anomalies from one scan cycle, keyed by anomaly id.
+
+        Cache hits are answered directly. The rest are grouped by lineage
+        root and each group of two or more goes to the LLM as one prompt with
+        the shared lineage context; the per-anomaly diagnoses are parsed back
+        out. Anomalies the batched responses leave out are diagnosed alone.
+        Each round's prompts are sent together through
+        ``llm_client.diagnose_many``, so in async mode they are in flight at
+        once. With ``fallback=False``, anomalies the LLM could not diagnose
+        map to None.
+        """
+        results: dict[int, Diagnosis | None] = {}
+        pending: dict[int, tuple[AnomalyModel, tuple | None]] = {}
+        for anomaly in anomalies:
+            cached, cache_key = self._cache_lookup(anomaly, db)
+            if cached is not None:
+                results[anomaly.id] = cached
+            else:
+                pending[anomaly.id] = (anomaly, cache_key)
+
+        groups: list[tuple[str | None, list[AnomalyModel]]] = [
+            (None, [anomaly]) for anomaly, _ in pending.values()
+        ]
+        if settings.diagnosis_batch_enabled and len(pending) > 1:
+            groups = self._group_by_root([anomaly for anomaly, _ in pending.values()], db)
+
+        size = max(2, settings.diagnosis_batch_max_size)
+        chunks = [
+            (root, group[start:start + size])
+            for root, group in groups
+            for start in range(0, len(group), size)
+        ]
+        batches = [(root, chunk) for root, chunk in chunks if len(chunk) > 1]
+        if batches:
+            replies = llm_client.diagnose_many([
+                (self._build_batch_prompt(root, chunk, db), BATCH_SYSTEM_PROMPT)
+                for root, chunk in batches
+            ])
+            for (root, chunk), reply in zip(batches, replies):
+                for anomaly_id, diagnosis in self._parse_batch(root, chunk, reply).items():
+                    results[anomaly_id] = diagnosis
+                    cache_key = pending[anomaly_id][1]
+                    if cache_key is not None:
+                        diagnosis_cache.put(cache_key[1], cache_key[0], diagnosis, cache_key[2])
+
+        alone = [anomaly for anomaly, _ in pending.values() if anomaly.id not in results]
+        if alone:
+            replies = llm_client.diagnose_many([
+                (self._build_prompt(anomaly, db), SYSTEM_PROMPT) for anomaly in alone
+            ])
+            for anomaly, reply in zip(alone, replies):
+                try:
+                    results[anomaly.id] = self._conclude(
+                        anomaly, db, reply, pending[anomaly.id][1], fallback
+                    )
+                except DiagnosisUnavailableError:
+                    results[anomaly.id] = None
+        return results
+
+    def _cache_lookup(
+        self, anomaly: AnomalyModel, db: Session
+    ) -> tuple[Diagnosis | None, tuple[str, str, set[str]] | None]:
+        """(cached diagnosis, cache key) — the key is None when caching is off."""
+        if not settings.diagnosis_cache_enabled:
+            return None, None
+        table_name, fingerprint, neighborhood = self._fingerprint(anomaly, db)
+        cached = diagnosis_cache.get(fingerprint, table_name)
+        if cached is not None:
+            logger.info("Diagnosis cache hit for anomaly %d on %s", anomaly.id, table_name)
+            cached.blast_radius = self._downstream(table_name, cached.blast_radius)
+        return cached, (table_name, fingerprint, neighborhood)
+
+    def _diagnose(
+        self,
+        anomaly: AnomalyModel,
+        db: Session,
+        cache_key: tuple[str, str, set[str]] | None,
+        fallback: bool = True,
+    ) -> Diagnosis:
         # Build context for the LLM
         prompt = self._build_prompt(anomaly, db)
 
         # Try LLM diagnosis
         result = llm_client.diagnose(prompt)
+        return self._conclude(anomaly, db, result, cache_key, fallback)
+
+    def _conclude(
+        self,
+        anomaly: AnomalyModel,
+        db: Session,
+        result: dict[str, Any] | None,
+        cache_key: tuple[str, str, set[str]] | None,
+        fallback: bool = True,
+    ) -> Diagnosis:
+        """Turn one LLM response into a diagnosis, caching it or falling back."""
         if result is not None:
             try:
-                return self._parse_diagnosis(result)
+                diagnosis = self._parse_diagnosis(result)
             except Exception:
                 logger.warning("Failed to parse LLM diagnosis, falling back to rules")
+            else:
+                if cache_key is not None:
+                    table_name, fingerprint, neighborhood = cache_key
+                    diagnosis_cache.put(fingerprint, table_name, diagnosis, neighborhood)
+                return diagnosis
+
+        if not fallback and settings.openai_api_key:
+            raise DiagnosisUnavailableError(f"No LLM diagnosis for anomaly {anomaly.id}")
 
         # Fallback to rule-based
         return self._rule_based_fallback(anomaly, db)
 
-    def _build_prompt(self, anomaly: AnomalyModel, db: Session) -> str:
-        """Construct the LLM prompt with anomaly, lineage, and history context."""
-        detail = json.loads(anomaly.detail)
+    def _parse_batch(
+        self, root: str | None, anomalies: list[AnomalyModel], result: dict[str, Any] | None
+    ) -> dict[int, Diagnosis]:
+        """The diagnoses that parsed out of one group's batched response."""
+        if not isinstance(result, dict) or not isinstance(result.get("diagnoses"), list):
+            logger.warning("Batched LLM diagnosis returned nothing usable for %d anomalies",
+                           len(anomalies))
+            return {}
+
+        wanted = {a.id for a in anomalies}
+        diagnoses: dict[int, Diagnosis] = {}
+        for item in result["diagnoses"]:
+            try:
+                anomaly_id = int(item["anomaly_id"])
+                if anomaly_id in wanted:
+                    diagnoses[anomaly_id] = self._parse_diagnosis(item)
+            except Exception:
+                logger.warning("Skipping unparseable entry in batched LLM diagnosis")
+        logger.info("Batched diagnosis covered %d of %d anomalies (root %s)",
+                    len(diagnoses), len(anomalies), root)
+        return diagnoses
+
+    def _group_by_root(
+        self, anomalies: list[AnomalyModel], db: Session
+    ) -> list[tuple[str | None, list[AnomalyModel]]]:
+        """Group anomalies whose tables are linked through upstream lineage.
+
+        Two tables fall in one group when one is upstream of the other or they
+        share an upstream table. Each group is labeled with its root: the table
+        that is (or feeds) the most members, preferring one in the group.
+        """
+        names = {a.id: self._table_name(a, db) for a in anomalies}
+        tables = sorted(set(names.values()))
+        upstream: dict[str, set[str]] = {}
+        for table in tables:
+            upstream[table] = set()
+            if self.lineage:
+                try:
+                    upstream[table] = {
+                        n["table"] for n in self.lineage.get_upstream(table, depth=3)
+                    }
+                except Exception:
+                    logger.debug("Could not load lineage for grouping")
+
+        parent = {t: t for t in tables}
+
+        def find(t: str) -> str:
+            while parent[t] != t:
+                parent[t] = parent[parent[t]]
+                t = parent[t]
+            return t
+
+        seen_by: dict[str, str] = {}
+        for table in tables:
+            for source in upstream[table]:
+                other = source if source in parent else seen_by.setdefault(source, table)
+                parent[find(table)] = find(other)
+
+        members: dict[str, list[str]] = {}
+        for table in tables:
+            members.setdefault(find(table), []).append(table)
+
+        groups = []
+        for group_tables in members.values():
+            in_group = set(group_tables)
+            candidates = in_group.union(*(upstream[t] for t in group_tables))
+            root = max(
+                sorted(candidates),
+                key=lambda c: (
+                    sum(c == t or c in upstream[t] for t in group_tables),
+                    c in in_group,
+                ),
+            )
+            group = [a for a in anomalies if names[a.id] in in_group]
+            groups.append((root if len(group) > 1 else None, group))
+        return groups
+
+    def _table_name(self, anomaly: AnomalyModel, db: Session) -> str:
         table = db.get(MonitoredTableModel, anomaly.table_id)
-        table_name = table.fully_qualified_name if table else f"table_id={anomaly.table_id}"
+        return table.fully_qualified_name if table else f"table_id={anomaly.table_id}"
 
-        sections = []
+    def _fingerprint(
+        self, anomaly: AnomalyModel, db: Session
+    ) -> tuple[str, str, set[str]]:
+        """(table name, fingerprint, lineage neighborhood) for the diagnosis cache."""
+        table_name = self._table_name(anomaly, db)
+        upstream: list[str] = []
+        downstream: list[str] = []
+        if self.lineage:
+            try:
+                upstream = [n["table"] for n in self.lineage.get_upstream(table_name, depth=3)]
+                downstream = [
+                    n["table"] for n in self.lineage.get_downstream(table_name, depth=3)
+                ]
+            except Exception:
+                logger.debug("Could not load lineage for fingerprint")
+        fingerprint = anomaly_fingerprint(
+            anomaly.type, anomaly.severity, json.loads(anomaly.detail), upstream, len(downstream)
+        )
+        return table_name, fingerprint, set(upstream) | set(downstream)
 
-        # Anomaly section
-        sections.append(f"## Anomaly\nType: {anomaly.type}\nTable: {table_name}")
-        if anomaly.type == "schema_drift":
-            changes_str = "\n".join(
-                f"- {c.get('change', 'unknown')}: column `{c.get('column', '?')}`"
-                + (f" type {c.get('old_type')} → {c.get('new_type')}" if c.get("old_type") else "")
-                for c in detail
-            ) if isinstance(detail, list) else json.dumps(detail, indent=2)
-            sections.append(f"Changes:\n{changes_str}")
-        else:
-            sections.append(f"Detail: {json.dumps(detail, indent=2)}")
+    def _downstream(self, table_name: str, default: list[str]) -> list[str]:
+        if not self.lineage:
+            return default
+        try:
+            return [n["table"] for n in self.lineage.get_downstream(table_name, depth=10)]
+        except Exception:
+            return default
 
-        sections.append(f"Detected: {anomaly.detected_at.isoformat()}")
+    def _build_prompt(self, anomaly: AnomalyModel, db: Session) -> str:
+        """Construct the LLM prompt with anomaly, lineage, and history context."""
+        table_name = self._table_name(anomaly, db)
+
+        # Anomaly section
+        sections = self._anomaly_section("## Anomaly", anomaly, table_name)
 
         # Lineage section
         if self.lineage:
@@ -103,6 +320,56 @@ class Architect:
 
         return "\n\n".join(sections)
 
+    def _anomaly_section(
+        self, heading: str, anomaly: AnomalyModel, table_name: str
+    ) -> list[str]:
+        detail = json.loads(anomaly.detail)
+        sections = [f"{heading}\nType: {anomaly.type}\nTable: {table_name}"]
+        if anomaly.type == "schema_drift":
+            changes_str = "\n".join(
+                f"- {c.get('change', 'unknown')}: column `{c.get('column', '?')}`"
+                + (f" type {c.get('old_type')} → {c.get('new_type')}" if c.get("old_type") else "")
+                for c in detail
+            ) if isinstance(detail, list) else json.dumps(detail, indent=2)
+            sections.append(f"Changes:\n{changes_str}")
+        else:
+            sections.append(f"Detail: {json.dumps(detail, indent=2)}")
+
+        sections.append(f"Detected: {anomaly.detected_at.isoformat()}")
+        return sections
+
+    def _build_batch_prompt(
+        self, root: str | None, anomalies: list[AnomalyModel], db: Session
+    ) -> str:
+        """One prompt for a group: the shared lineage once, then each anomaly by id."""
+        names = {a.id: self._table_name(a, db) for a in anomalies}
+        affected = sorted(set(names.values()))
+        upstream: set[str] = set()
+        downstream: set[str] = set()
+        if self.lineage:
+            for table in affected:
+                try:
+                    upstream.update(n["table"] for n in self.lineage.get_upstream(table, depth=3))
+                    downstream.update(
+                        n["table"] for n in self.lineage.get_downstream(table, depth=3)
+                    )
+                except Exception:
+                    logger.debug("Could not load lineage for batch prompt")
+
+        shared = [f"## Shared Lineage\nLikely root: {root or 'unknown'}"]
+        if upstream - set(affected):
+            shared.append("Upstream: " + ", ".join(sorted(upstream - set(affected))))
+        shared.append("Affected: " + ", ".join(affected))
+        if downstream - set(affected):
+            shared.append("Downstream: " + ", ".join(sorted(downstream - set(affected))))
+
+        sections = ["\n".join(shared)]
+        for anomaly in anomalies:
+            sections.append("\n".join(
+                self._anomaly_section(f"## Anomaly {anomaly.id}", anomaly, names[anomaly.id])
+            ))
+        return "\n\n".join(sections)
+
     def _parse_diagnosis(self, result: dict[str, Any]) -> Diagnosis:
         """Parse the LLM response into a Diagnosis object."""
         recommendations = [
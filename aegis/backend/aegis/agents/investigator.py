@@ -11,7 +11,7 @@ from typing import Any
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from aegis.core.connectors import WarehouseConnector
+from aegis.core.connectors import WarehouseConnector, resolve_timestamp_column
 from aegis.core.models import (
     ConnectionModel,
     DiscoveryReport,
@@ -96,6 +96,9 @@ class Investigator:
 
         data = json.loads(json_match.group())
         proposals = [TableProposal(**p) for p in data["proposals"]]
+        for proposal in proposals:
+            if proposal.timestamp_column is None:
+                proposal.timestamp_column = resolve_timestamp_column(proposal.columns)
 
         return DiscoveryReport(
             connection_id=connection_model.id,
@@ -192,6 +195,7 @@ class Investigator:
                     suggested_sla_minutes=sla,
                     reasoning=reasoning,
                     skip=skip,
+                    timestamp_column=resolve_timestamp_column(columns),
                 ))
 
         return DiscoveryReport(
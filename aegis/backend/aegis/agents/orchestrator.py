@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import json
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
@@ -12,21 +12,101 @@ from sqlalchemy.orm import Session
 from aegis.agents.architect import Architect
 from aegis.agents.executor import Executor
 from aegis.agents.report_generator import ReportGenerator
-from aegis.core.models import AnomalyModel, IncidentModel, MonitoredTableModel, Remediation
+from aegis.config import settings
+from aegis.core.models import (
+    AnomalyModel,
+    Diagnosis,
+    IncidentModel,
+    MonitoredTableModel,
+    Remediation,
+)
 
 logger = logging.getLogger("aegis.orchestrator")
 
+OPEN_STATUSES = ("open", "investigating", "pending_review")
+
 
 class Orchestrator:
-    """Coordinates the incident lifecycle: detection → diagnosis → remediation."""
+    """Coordinates the incident lifecycle: detection → diagnosis → remediation.
+
+    With a ``work_queue`` (see ``aegis.services.incident_queue``) new
+    incidents are only recorded and queued; diagnosis, remediation and the
+    report run later via ``process_incident`` on a worker, so callers such as
+    the scan loop never wait on the LLM.
 
-    def __init__(self, architect: Architect, executor: Executor, notifier=None):
+    With a ``lineage_graph``, an anomaly on a table downstream of one that
+    already has a recent open incident is attached to that incident rather
+    than opening its own, so one broken source does not fan out into an
+    incident, diagnosis and report per downstream table.
+    """
+
+    def __init__(
+        self,
+        architect: Architect,
+        executor: Executor,
+        notifier=None,
+        work_queue=None,
+        lineage_graph=None,
+    ):
         self.architect = architect
         self.executor = executor
         self.notifier = notifier
+        self.work_queue = work_queue
+        self.lineage = lineage_graph
+
+    def handle_anomalies(
+        self, anomalies: list[AnomalyModel], db: Session
+    ) -> list[IncidentModel]:
+        """Handle one scan cycle's anomalies, upstream tables first.
+
+        A source and its downstream tables often break in the same cycle;
+        handling the source first means its incident exists by the time the
+        downstream anomalies are correlated.
+
+        Without a ``work_queue``, every incident is opened first and the new
+        ones are then diagnosed together through ``diagnose_many``, so
+        related anomalies can share one batched LLM call.
+        """
+        ordered = self._upstream_first(anomalies, db)
+        if self.work_queue is not None:
+            return [self.handle_anomaly(a, db) for a in ordered]
+
+        incidents: list[IncidentModel] = []
+        created: list[tuple[IncidentModel, AnomalyModel]] = []
+        for anomaly in ordered:
+            incident, is_new = self._open_incident(anomaly, db)
+            incidents.append(incident)
+            if is_new:
+                created.append((incident, anomaly))
+
+        diagnoses: dict[int, Diagnosis | None] = {}
+        if len(created) > 1:
+            diagnoses = self.diagnose_many([a for _, a in created], db, fallback=True)
+        for incident, anomaly in created:
+            self.process_incident(incident, anomaly, db, diagnosis=diagnoses.get(anomaly.id))
+            self._announce(incident)
+        return incidents
 
     def handle_anomaly(self, anomaly: AnomalyModel, db: Session) -> IncidentModel:
         """Process a detected anomaly through the full incident pipeline."""
+        incident, is_new = self._open_incident(anomaly, db)
+        if not is_new:
+            return incident
+
+        # Diagnose now, or leave it to the incident workers
+        if self.work_queue is not None:
+            self.work_queue.enqueue(db, incident, anomaly)
+            db.flush()
+        else:
+            self.process_incident(incident, anomaly, db)
+
+        self._announce(incident)
+        return incident
+
+    def _open_incident(
+        self, anomaly: AnomalyModel, db: Session
+    ) -> tuple[IncidentModel, bool]:
+        """Merge, correlate or create. Returns the incident and whether it is new."""
 
         # 1. Deduplication — check for open incident on same table + type
         existing = self._find_open_incident(anomaly.table_id, anomaly.type, db)
@@ -36,9 +116,14 @@ class Orchestrator:
                 anomaly.id,
                 existing.id,
             )
-            return self._merge_anomaly(existing, anomaly, db)
+            return self._merge_anomaly(existing, anomaly, db), False
+
+        # 2. Correlation — attach to an open incident on an upstream table
+        upstream = self._find_upstream_incident(anomaly, db)
+        if upstream:
+            return self._correlate_anomaly(upstream, anomaly, db), False
 
-        # 2. Create incident
+        # 3. Create incident
         incident = IncidentModel(
             anomaly_id=anomaly.id,
             status="investigating",
@@ -54,31 +139,73 @@ class Orchestrator:
             anomaly.type,
             anomaly.severity,
         )
+        return incident, True
 
-        # 3. Dispatch to Architect for root-cause analysis
+    def _announce(self, incident: IncidentModel) -> None:
+        """Notify the dashboard of a new incident."""
+        if self.notifier:
+            self.notifier.broadcast(
+                "incident.created",
+                {"incident_id": incident.id, "severity": incident.severity},
+            )
+
+    def diagnose_many(
+        self, anomalies: list[AnomalyModel], db: Session, fallback: bool = False
+    ) -> dict[int, Diagnosis | None]:
+        """Diagnose several new incidents' anomalies together.
+
+        ``handle_anomalies`` and the incident workers call this with one scan
+        cycle's new incidents so the Architect can diagnose related anomalies
+        in one LLM call. Without ``fallback``, anomalies the LLM could not
+        diagnose map to None; if the batch fails outright the result is empty
+        and each incident is diagnosed on its own.
+        """
         try:
-            diagnosis = self.architect.analyze(anomaly, db)
+            return self.architect.analyze_many(anomalies, db, fallback=fallback)
+        except Exception:
+            logger.exception("Batched analysis failed for %d incidents", len(anomalies))
+            return {}
+
+    def process_incident(
+        self,
+        incident: IncidentModel,
+        anomaly: AnomalyModel,
+        db: Session,
+        diagnosis: Diagnosis | None = None,
+        strict: bool = False,
+    ) -> IncidentModel:
+        """Diagnose a new incident, prepare remediation and build its report.
+
+        A ``diagnosis`` already produced by ``diagnose_many`` skips the
+        Architect call. With ``strict`` the Architect gets no rule-based
+        fallback and its errors propagate, so a queued job is retried.
+        """
+
+        # 1. Dispatch to Architect for root-cause analysis
+        try:
+            if diagnosis is None:
+                diagnosis = self.architect.analyze(anomaly, db, fallback=not strict)
             incident.diagnosis = diagnosis.model_dump_json()
             incident.blast_radius = json.dumps(diagnosis.blast_radius)
             incident.severity = diagnosis.severity
         except Exception:
+            if strict:
+                raise
             logger.exception("Architect analysis failed for incident %d", incident.id)
 
-        # 4. Dispatch to Executor for remediation recommendation
+        # 2. Dispatch to Executor for remediation recommendation
         try:
             if incident.diagnosis:
-                from aegis.core.models import Diagnosis
-
                 diag = Diagnosis.model_validate_json(incident.diagnosis)
                 remediation = self.executor.prepare(anomaly, diag)
                 incident.remediation = remediation.model_dump_json()
         except Exception:
             logger.exception("Executor preparation failed for incident %d", incident.id)
 
-        # 5. Update status
+        # 3. Update status
         incident.status = "pending_review"
 
-        # 6. Generate incident report
+        # 4. Generate incident report
         try:
             table = db.get(MonitoredTableModel, anomaly.table_id)
             diag_obj = None
@@ -96,14 +223,6 @@ class Orchestrator:
 
         incident.updated_at = datetime.now(timezone.utc)
         db.flush()
-
-        # 7. Notify dashboard
-        if self.notifier:
-            self.notifier.broadcast(
-                "incident.created",
-                {"incident_id": incident.id, "severity": incident.severity},
-            )
-
         return incident
 
     def _find_open_incident(
@@ -112,15 +231,92 @@ class Orchestrator:
         """Check for an existing open incident for the same table + anomaly type."""
         stmt = (
             select(IncidentModel)
-            .join(AnomalyModel)
+            .join(IncidentModel.anomaly)
             .where(AnomalyModel.table_id == table_id)
             .where(AnomalyModel.type == anomaly_type)
-            .where(IncidentModel.status.in_(["open", "investigating", "pending_review"]))
+            .where(IncidentModel.status.in_(OPEN_STATUSES))
             .order_by(IncidentModel.created_at.desc())
             .limit(1)
         )
         return db.execute(stmt).scalar_one_or_none()
 
+    def _upstream_first(
+        self, anomalies: list[AnomalyModel], db: Session
+    ) -> list[AnomalyModel]:
+        """Sort by number of upstream tables, which puts ancestors before descendants."""
+        if self.lineage is None or not settings.incident_correlation_enabled:
+            return list(anomalies)
+        upstream_counts: dict[int, int] = {}
+        for table_id in {a.table_id for a in anomalies}:
+            table = db.get(MonitoredTableModel, table_id)
+            try:
+                upstream_counts[table_id] = len(self.lineage.get_upstream(
+                    table.fully_qualified_name, depth=settings.incident_correlation_max_depth
+                )) if table else 0
+            except Exception:
+                upstream_counts[table_id] = 0
+        return sorted(anomalies, key=lambda a: upstream_counts[a.table_id])
+
+    def _find_upstream_incident(
+        self, anomaly: AnomalyModel, db: Session
+    ) -> IncidentModel | None:
+        """The open incident on the nearest upstream table, opened within the window."""
+        if self.lineage is None or not settings.incident_correlation_enabled:
+            return None
+        table = db.get(MonitoredTableModel, anomaly.table_id)
+        if table is None:
+            return None
+        try:
+            upstream = self.lineage.get_upstream(
+                table.fully_qualified_name, depth=settings.incident_correlation_max_depth
+            )
+        except Exception:
+            logger.warning(
+                "Could not load lineage to correlate anomaly %d on %s",
+                anomaly.id,
+                table.fully_qualified_name,
+                exc_info=True,
+            )
+            return None
+        depths = {n["table"]: n["depth"] for n in upstream}
+        if not depths:
+            return None
+
+        detected_at = anomaly.detected_at or datetime.now(timezone.utc)
+        since = detected_at - timedelta(minutes=settings.incident_correlation_window_minutes)
+        stmt = (
+            select(IncidentModel, MonitoredTableModel.fully_qualified_name)
+            .join(IncidentModel.anomaly)
+            .join(AnomalyModel.table)
+            .where(MonitoredTableModel.fully_qualified_name.in_(depths))
+            .where(IncidentModel.status.in_(OPEN_STATUSES))
+            .where(IncidentModel.created_at >= since)
+        )
+        candidates = db.execute(stmt).all()
+        if not candidates:
+            return None
+        # Nearest ancestor first, then the most recent incident.
+        incident, _ = min(candidates, key=lambda row: (depths[row[1]], -row[0].id))
+        return incident
+
+    def _correlate_anomaly(
+        self, incident: IncidentModel, anomaly: AnomalyModel, db: Session
+    ) -> IncidentModel:
+        """Attach a downstream anomaly to an upstream incident.
+
+        No diagnosis is queued: the upstream incident's diagnosis already
+        covers its blast radius. The incident is updated as for a merge, so a
+        more severe downstream anomaly raises its severity.
+        """
+        anomaly.correlated_incident_id = incident.id
+        logger.info(
+            "Correlated anomaly %d (table_id=%d) with upstream incident %d",
+            anomaly.id,
+            anomaly.table_id,
+            incident.id,
+        )
+        return self._merge_anomaly(incident, anomaly, db)
+
     def _merge_anomaly(
         self, incident: IncidentModel, anomaly: AnomalyModel, db: Session
     ) -> IncidentModel:
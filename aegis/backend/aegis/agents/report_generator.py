@@ -99,6 +99,7 @@ class ReportGenerator:
             explanation=diagnosis.root_cause,
             source_table=diagnosis.root_cause_table,
             confidence=diagnosis.confidence,
+            cached=diagnosis.cached,
         )
 
     def _build_blast_radius(self, diagnosis: Diagnosis | None) -> BlastRadiusDetail:
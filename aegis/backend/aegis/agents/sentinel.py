@@ -10,7 +10,7 @@ from datetime import datetime, timezone
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from aegis.core.connectors import WarehouseConnector
+from aegis.core.connectors import WarehouseConnector, resolve_timestamp_column
 from aegis.core.models import (
     AnomalyModel,
     MonitoredTableModel,
@@ -19,20 +19,43 @@ from aegis.core.models import (
 
 logger = logging.getLogger("aegis.sentinel")
 
+# Table ids whose timestamp column the scanner could not resolve from a
+# snapshot: True when the latest snapshot has no candidate column, False when
+# there is no snapshot yet. SchemaSentinel drops an entry whenever it stores a
+# new or changed snapshot for the table, which is when the answer can change.
+unresolved_timestamp_columns: dict[int, bool] = {}
+
 
 class SchemaSentinel:
     """Detects schema drift by comparing INFORMATION_SCHEMA snapshots."""
 
     def inspect(
-        self, table: MonitoredTableModel, connector: WarehouseConnector, db: Session
+        self,
+        table: MonitoredTableModel,
+        connector: WarehouseConnector,
+        db: Session,
+        prefetched: dict[tuple[str, str], list[dict]] | None = None,
     ) -> AnomalyModel | None:
-        # 1. Fetch current schema from warehouse
+        # 1. Current schema — from a bulk fetch_schemas() map when the scanner
+        # has one, otherwise one information_schema round trip for this table.
+        # A table missing from the map was not fetched (case folding, a
+        # partial catalog view), which is not the same as having no columns.
+        key = (table.schema_name, table.table_name)
+        if prefetched is not None and key in prefetched:
+            return self.evaluate(table, prefetched[key], db)
+
         try:
             current_columns = connector.fetch_schema(table.schema_name, table.table_name)
         except Exception:
             logger.exception("Failed to fetch schema for %s", table.fully_qualified_name)
             return None
 
+        return self.evaluate(table, current_columns, db)
+
+    def evaluate(
+        self, table: MonitoredTableModel, current_columns: list[dict], db: Session
+    ) -> AnomalyModel | None:
+        """Compare already-fetched column metadata against the latest snapshot."""
         # 2. Hash for O(1) drift detection
         columns_json = json.dumps(current_columns, sort_keys=True)
         current_hash = hashlib.sha256(columns_json.encode()).hexdigest()
@@ -56,6 +79,10 @@ class SchemaSentinel:
         db.add(new_snapshot)
         db.flush()
 
+        if last_snapshot is None or last_snapshot.snapshot_hash != current_hash:
+            self._refresh_timestamp_column(table, current_columns)
+            unresolved_timestamp_columns.pop(table.id, None)
+
         # 5. Compare
         if last_snapshot is None:
             logger.info("First snapshot for %s — no baseline to compare", table.fully_qualified_name)
@@ -87,6 +114,26 @@ class SchemaSentinel:
         db.flush()
         return anomaly
 
+    def _refresh_timestamp_column(
+        self, table: MonitoredTableModel, columns: list[dict]
+    ) -> None:
+        """Re-resolve the freshness column after the table's schema changed.
+
+        A column that still exists is kept, so explicit choices survive drift.
+        """
+        if table.timestamp_column and any(
+            c["name"] == table.timestamp_column for c in columns
+        ):
+            return
+        resolved = resolve_timestamp_column(columns)
+        if resolved != table.timestamp_column:
+            logger.info(
+                "Timestamp column for %s resolved to %s",
+                table.fully_qualified_name,
+                resolved,
+            )
+            table.timestamp_column = resolved
+
     def _diff_schemas(
         self, old: list[dict], new: list[dict]
     ) -> list[dict]:
@@ -151,17 +198,40 @@ class FreshnessSentinel:
     """Detects when tables are not updated within their expected SLA."""
 
     def inspect(
-        self, table: MonitoredTableModel, connector: WarehouseConnector, db: Session
+        self,
+        table: MonitoredTableModel,
+        connector: WarehouseConnector,
+        db: Session,
+        last_updates: dict[tuple[str, str], datetime | None] | None = None,
     ) -> AnomalyModel | None:
         if not table.freshness_sla_minutes:
             return None
 
+        # A batched fetch_last_update_times() map omits tables whose probe failed;
+        # the connector has already logged those.
+        if last_updates is not None:
+            key = (table.schema_name, table.table_name)
+            if key not in last_updates:
+                return None
+            return self.evaluate(table, last_updates[key], db)
+
         try:
-            last_update = connector.fetch_last_update_time(table.schema_name, table.table_name)
+            last_update = connector.fetch_last_update_time(
+                table.schema_name, table.table_name, table.timestamp_column
+            )
         except Exception:
             logger.exception("Failed to check freshness for %s", table.fully_qualified_name)
             return None
 
+        return self.evaluate(table, last_update, db)
+
+    def evaluate(
+        self, table: MonitoredTableModel, last_update: datetime | None, db: Session
+    ) -> AnomalyModel | None:
+        """Check an already-fetched last update time against the table's SLA."""
+        if not table.freshness_sla_minutes:
+            return None
+
         if last_update is None:
             logger.warning("No timestamp found for %s", table.fully_qualified_name)
             return None
@@ -5,7 +5,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from aegis.api.deps import get_db, verify_api_key
-from aegis.core.connectors import WarehouseConnector
+from aegis.core.connectors import connector_registry
 from aegis.core.models import ConnectionCreate, ConnectionModel, ConnectionResponse, ConnectionUpdate
 
 router = APIRouter(dependencies=[Depends(verify_api_key)])
@@ -50,6 +50,7 @@ async def update_connection(
         setattr(conn, field, value)
 
     await db.commit()
+    connector_registry.invalidate(conn_id)
     await db.refresh(conn)
     return conn
 
@@ -61,6 +62,7 @@ async def delete_connection(conn_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Connection not found")
     await db.delete(conn)
     await db.commit()
+    connector_registry.invalidate(conn_id)
 
 
 @router.post("/{conn_id}/test")
@@ -69,8 +71,7 @@ async def test_connection(conn_id: int, db: AsyncSession = Depends(get_db)):
     if not conn:
         raise HTTPException(status_code=404, detail="Connection not found")
 
-    connector = WarehouseConnector(conn.connection_uri, conn.dialect)
-    success = connector.test_connection()
-    connector.dispose()
+    with connector_registry.checkout(conn.id, conn.connection_uri, conn.dialect) as connector:
+        success = connector.test_connection()
 
     return {"success": success, "connection": conn.name}
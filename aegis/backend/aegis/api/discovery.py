@@ -11,7 +11,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from aegis.agents.investigator import Investigator
 from aegis.api.deps import get_db, verify_api_key
-from aegis.core.connectors import WarehouseConnector
+from aegis.core.connectors import connector_registry
 from aegis.core.database import SyncSessionLocal
 from aegis.core.models import (
     ConnectionModel,
@@ -24,17 +24,16 @@ router = APIRouter(dependencies=[Depends(verify_api_key)])
 
 def _run_discover_sync(connection_uri: str, dialect: str, conn_id: int, conn_name: str):
     """Run discovery in a sync context (LangChain and connector are blocking)."""
-    connector = WarehouseConnector(connection_uri, dialect)
-    try:
-        with SyncSessionLocal() as db:
-            from aegis.core.models import ConnectionModel as CM
+    with (
+        connector_registry.checkout(conn_id, connection_uri, dialect) as connector,
+        SyncSessionLocal() as db,
+    ):
+        from aegis.core.models import ConnectionModel as CM
 
-            conn_model = db.get(CM, conn_id)
-            investigator = Investigator()
-            report = investigator.discover(connector, db, conn_model)
-            return report.model_dump(mode="json")
-    finally:
-        connector.dispose()
+        conn_model = db.get(CM, conn_id)
+        investigator = Investigator()
+        report = investigator.discover(connector, db, conn_model)
+        return report.model_dump(mode="json")
 
 
 @router.post("/{conn_id}/discover")
@@ -83,6 +82,7 @@ async def confirm_discovery(
             fully_qualified_name=f"{selection.schema_name}.{selection.table_name}",
             check_types=json.dumps(selection.check_types),
             freshness_sla_minutes=selection.freshness_sla_minutes,
+            timestamp_column=selection.timestamp_column,
         )
         db.add(table)
         enrolled.append({
@@ -90,6 +90,7 @@ async def confirm_discovery(
             "table_name": selection.table_name,
             "check_types": selection.check_types,
             "freshness_sla_minutes": selection.freshness_sla_minutes,
+            "timestamp_column": selection.timestamp_column,
         })
 
     await db.commit()
@@ -10,6 +10,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from aegis.api.deps import get_db, verify_api_key
 from aegis.core.models import (
+    AnomalyModel,
+    AnomalyResponse,
     IncidentApprove,
     IncidentDismiss,
     IncidentModel,
@@ -37,9 +39,7 @@ async def list_incidents(
     if severity:
         stmt = stmt.where(IncidentModel.severity == severity)
     if table_id:
-        from aegis.core.models import AnomalyModel
-
-        stmt = stmt.join(AnomalyModel).where(AnomalyModel.table_id == table_id)
+        stmt = stmt.join(IncidentModel.anomaly).where(AnomalyModel.table_id == table_id)
     if since:
         stmt = stmt.where(IncidentModel.created_at >= since)
 
@@ -71,6 +71,21 @@ async def get_incident_report(incident_id: int, db: AsyncSession = Depends(get_d
     return json.loads(incident.report)
 
 
+@router.get("/{incident_id}/correlated", response_model=list[AnomalyResponse])
+async def get_correlated_anomalies(incident_id: int, db: AsyncSession = Depends(get_db)):
+    """Downstream anomalies attached to this incident by lineage correlation."""
+    incident = await db.get(IncidentModel, incident_id)
+    if not incident:
+        raise HTTPException(status_code=404, detail="Incident not found")
+
+    result = await db.execute(
+        select(AnomalyModel)
+        .where(AnomalyModel.correlated_incident_id == incident_id)
+        .order_by(AnomalyModel.detected_at)
+    )
+    return [AnomalyResponse.from_orm_model(a) for a in result.scalars().all()]
+
+
 @router.post("/{incident_id}/approve", response_model=IncidentResponse)
 async def approve_incident(
     incident_id: int, body: IncidentApprove, db: AsyncSession = Depends(get_db)
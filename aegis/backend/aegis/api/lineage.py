@@ -1,23 +1,82 @@
 """Lineage graph query endpoints."""
 
-from fastapi import APIRouter, Depends, Query
+import asyncio
+import json
+from collections.abc import Iterator
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from aegis.api.deps import verify_api_key
+from aegis.core.connectors import connector_registry
 from aegis.core.database import SyncSessionLocal
-from aegis.core.lineage import LineageGraph
+from aegis.core.lineage import LineageGraph, LineageRefresher, lineage_index
+from aegis.core.models import ConnectionModel
 
 router = APIRouter(dependencies=[Depends(verify_api_key)])
 
 
 def _get_lineage_graph() -> LineageGraph:
     db = SyncSessionLocal()
-    return LineageGraph(db)
+    return LineageGraph(db, index=lineage_index)
 
 
 @router.get("/graph")
-async def get_full_graph(connection_id: int | None = Query(None)):
+async def get_full_graph(
+    connection_id: int | None = Query(None),
+    focus: str | None = Query(None, description="Only the subgraph around this table"),
+    depth: int = Query(2, ge=1, le=10),
+    cursor: int | None = Query(None, description="next_cursor from the previous page"),
+    limit: int | None = Query(None, ge=1, le=10000),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_graph(connection_id, focus, depth, cursor),
+            media_type="application/x-ndjson",
+        )
+    graph = _get_lineage_graph()
+    return graph.get_full_graph(
+        connection_id=connection_id, focus=focus, depth=depth, cursor=cursor, limit=limit
+    )
+
+
+def _stream_graph(
+    connection_id: int | None, focus: str | None, depth: int, cursor: int | None
+) -> Iterator[str]:
+    db = SyncSessionLocal()
+    try:
+        graph = LineageGraph(db, index=lineage_index)
+        for record in graph.iter_full_graph(connection_id, focus, depth, cursor):
+            yield json.dumps(record) + "\n"
+    finally:
+        db.close()
+
+
+def _backfill(connection_id: int, since: datetime) -> int:
+    with SyncSessionLocal() as db:
+        conn = db.get(ConnectionModel, connection_id)
+        if conn is None:
+            raise HTTPException(status_code=404, detail="Connection not found")
+        with connector_registry.checkout(conn.id, conn.connection_uri, conn.dialect) as connector:
+            return LineageRefresher(db).backfill(connector, conn.id, since)
+
+
+@router.post("/backfill")
+async def backfill_lineage(connection_id: int = Query(...), since: datetime = Query(...)):
+    edges = await asyncio.to_thread(_backfill, connection_id, since)
+    return {"connection_id": connection_id, "edges_updated": edges}
+
+
+@router.get("/paths")
+async def get_top_paths(
+    source: str = Query(...),
+    target: str = Query(...),
+    k: int = Query(3, ge=1, le=20),
+):
     graph = _get_lineage_graph()
-    return graph.get_full_graph(connection_id=connection_id)
+    return {"source": source, "target": target, "paths": graph.get_top_paths(source, target, k=k)}
 
 
 @router.get("/{table}/upstream")
@@ -50,3 +109,9 @@ async def get_downstream(
 async def get_blast_radius(table: str):
     graph = _get_lineage_graph()
     return graph.get_blast_radius(table)
+
+
+@router.get("/{table}/columns/{column}/blast-radius")
+async def get_column_blast_radius(table: str, column: str, depth: int = Query(10, ge=1, le=10)):
+    graph = _get_lineage_graph()
+    return graph.get_column_blast_radius(table, column, depth=depth)
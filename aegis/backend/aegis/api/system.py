@@ -25,12 +25,22 @@ async def health():
 @router.get("/status", dependencies=[Depends(verify_api_key)])
 async def status():
     from aegis.config import settings
+    from aegis.core import lineage_compaction
+    from aegis.core.connectors import connector_registry
+    from aegis.core.diagnosis_cache import diagnosis_cache
+    from aegis.core.parse_cache import parse_cache
+    from aegis.services.incident_queue import incident_workers
     from aegis.services.notifier import notifier
 
     return {
         "scanner": "running",
         "websocket_clients": notifier.connection_count,
         "llm_enabled": bool(settings.openai_api_key),
+        "connector_pool": connector_registry.stats(),
+        "parse_cache": parse_cache.stats(),
+        "diagnosis_cache": diagnosis_cache.stats(),
+        "lineage_compaction": lineage_compaction.last_report,
+        "incident_workers": incident_workers.stats(),
     }
 
 
@@ -67,7 +77,7 @@ async def stats(db: AsyncSession = Depends(get_db)):
     # Tables with open incidents
     tables_with_incidents_result = await db.execute(
         select(func.count(func.distinct(AnomalyModel.table_id)))
-        .join(IncidentModel)
+        .join(AnomalyModel.incident)
         .where(IncidentModel.status.in_(["open", "investigating", "pending_review"]))
     )
     tables_with_incidents = tables_with_incidents_result.scalar() or 0
@@ -6,7 +6,9 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from aegis.agents.sentinel import unresolved_timestamp_columns
 from aegis.api.deps import get_db, verify_api_key
+from aegis.core.connectors import FRESHNESS_STRATEGIES
 from aegis.core.models import (
     MonitoredTableModel,
     SchemaSnapshotModel,
@@ -18,8 +20,40 @@ from aegis.core.models import (
 router = APIRouter(dependencies=[Depends(verify_api_key)])
 
 
+def _check_freshness_strategy(strategy: str | None) -> None:
+    if strategy is not None and strategy not in FRESHNESS_STRATEGIES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"freshness_strategy must be one of {', '.join(FRESHNESS_STRATEGIES)}",
+        )
+
+
+async def _check_timestamp_column(db: AsyncSession, table_id: int, column: str) -> None:
+    """Reject a timestamp column the table's latest schema snapshot does not have.
+
+    Before the first snapshot there is nothing to check against; the probes
+    quote the name, and the schema sentinel replaces it with a resolved
+    column once the snapshot shows it is missing.
+    """
+    snapshot = (await db.execute(
+        select(SchemaSnapshotModel)
+        .where(SchemaSnapshotModel.table_id == table_id)
+        .order_by(SchemaSnapshotModel.captured_at.desc())
+        .limit(1)
+    )).scalar_one_or_none()
+    if snapshot is None:
+        return
+    names = {c["name"] for c in json.loads(snapshot.columns)}
+    if column not in names:
+        raise HTTPException(
+            status_code=422,
+            detail=f"timestamp_column {column!r} is not a column of this table",
+        )
+
+
 @router.post("", response_model=TableResponse, status_code=201)
 async def add_table(body: TableCreate, db: AsyncSession = Depends(get_db)):
+    _check_freshness_strategy(body.freshness_strategy)
     table = MonitoredTableModel(
         connection_id=body.connection_id,
         schema_name=body.schema_name,
@@ -27,6 +61,8 @@ async def add_table(body: TableCreate, db: AsyncSession = Depends(get_db)):
         fully_qualified_name=f"{body.schema_name}.{body.table_name}",
         check_types=json.dumps(body.check_types),
         freshness_sla_minutes=body.freshness_sla_minutes,
+        timestamp_column=body.timestamp_column,
+        freshness_strategy=body.freshness_strategy,
     )
     db.add(table)
     await db.commit()
@@ -66,11 +102,18 @@ async def update_table(
     table = await db.get(MonitoredTableModel, table_id)
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
+    _check_freshness_strategy(body.freshness_strategy)
+    if body.timestamp_column is not None:
+        await _check_timestamp_column(db, table_id, body.timestamp_column)
 
     if body.check_types is not None:
         table.check_types = json.dumps(body.check_types)
     if body.freshness_sla_minutes is not None:
         table.freshness_sla_minutes = body.freshness_sla_minutes
+    if body.timestamp_column is not None:
+        table.timestamp_column = body.timestamp_column
+    if body.freshness_strategy is not None:
+        table.freshness_strategy = body.freshness_strategy
 
     await db.commit()
     await db.refresh(table)
@@ -84,6 +127,7 @@ async def delete_table(table_id: int, db: AsyncSession = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Table not found")
     await db.delete(table)
     await db.commit()
+    unresolved_timestamp_columns.pop(table_id, None)
 
 
 @router.get("/{table_id}/snapshots")
@@ -19,6 +19,71 @@ class Settings(BaseSettings):
     lineage_refresh_seconds: int = 3600
     rediscovery_interval_seconds: int = 86400  # 24 hours
 
+    # Scan execution
+    scan_mode: str = "sequential"  # "sequential" or "concurrent"
+    scan_max_workers: int = 8
+    scan_max_workers_per_connection: int = 2
+    freshness_batch_size: int = 50  # tables per UNION ALL freshness probe
+
+    # Diagnosis cache
+    diagnosis_cache_enabled: bool = False
+    diagnosis_cache_size: int = 1024
+    diagnosis_cache_ttl_seconds: int = 86400
+    diagnosis_batch_enabled: bool = False  # one LLM call per group of related anomalies
+    diagnosis_batch_max_size: int = 8  # anomalies per batched prompt
+
+    # Incident pipeline
+    incident_queue_enabled: bool = False  # diagnose on worker threads instead of in the scan
+    incident_workers: int = 2
+    incident_job_max_attempts: int = 3
+    incident_job_retry_seconds: int = 30  # doubled after each failed attempt
+    incident_job_visibility_timeout_seconds: int = 900  # running jobs older than this are retried
+    incident_queue_poll_seconds: float = 5.0
+    incident_job_batch_size: int = 20  # jobs a worker claims and diagnoses together
+    incident_correlation_enabled: bool = False  # attach anomalies to an upstream open incident
+    incident_correlation_window_minutes: int = 120
+    incident_correlation_max_depth: int = 10  # lineage hops searched for an upstream incident
+
+    # Lineage extraction
+    lineage_initial_lookback_hours: int = 2  # first refresh of a connection
+    lineage_max_backfill_hours: int = 168  # cap on catch-up after an outage
+    lineage_ingest_latency_minutes: int = 60  # re-read window for rows the log publishes late
+    lineage_extract_page_size: int = 10000
+    lineage_max_pages: int = 20  # per refresh; the rest is picked up next time
+    lineage_upsert_batch_size: int = 500  # edges per INSERT ... ON CONFLICT statement
+
+    # Lineage retention
+    lineage_retention_days: int = 90  # edges unseen this long are compacted (min STALE_DAYS)
+    lineage_compaction_mode: str = "archive"  # "archive" or "delete"
+    lineage_compaction_interval_seconds: int = 86400
+
+    # Lineage traversal
+    # "index" (in-memory dicts), "csr" (NumPy arrays), "cte" (one recursive query) or "sql"
+    lineage_traversal_mode: str = "index"
+    lineage_index_check_seconds: int = 30  # how often the shared index looks for outside writes
+    lineage_reachability_enabled: bool = False  # serve blast radius from lineage_reachability
+
+    # Column-level lineage
+    column_lineage_enabled: bool = False
+    column_lineage_max_chars: int = 100000  # longer statements are skipped before parsing
+    column_lineage_max_nodes: int = 20000  # statements with larger ASTs are skipped
+    column_lineage_timeout_ms: int = 500  # per statement; partial edges are kept
+
+    # Lineage parse pool
+    lineage_parse_workers: int = 4  # worker processes; <= 1 parses in-process
+    lineage_parse_chunk_size: int = 250  # statements per task sent to a worker
+    lineage_parse_min_batch: int = 500  # smaller batches of cache misses parse in-process
+
+    # Lineage parse cache
+    parse_cache_size: int = 4096  # in-memory LRU entries
+    parse_cache_persist: bool = False  # also keep parses in the parsed_queries table
+    parse_cache_retention_days: int = 30  # persisted parses older than this are compacted
+    parse_cache_max_rows: int = 100000  # oldest persisted parses beyond this are compacted
+    lineage_prefilter_enabled: bool = True  # skip the full parse when tokens rule out edges
+
+    # Warehouse engine pool
+    connector_idle_timeout_seconds: int = 900
+
     # Logging
     log_level: str = "INFO"
 
@@ -27,6 +92,14 @@ class Settings(BaseSettings):
 
     # OpenAI (no prefix — uses OPENAI_API_KEY directly)
     openai_api_key: str = ""
+    openai_base_url: str = ""  # e.g. a proxy or local stub; empty uses the OpenAI API
+
+    # LLM client
+    llm_mode: str = "sync"  # "async" shares one rate limiter across concurrent diagnoses
+    llm_max_concurrency: int = 4
+    llm_requests_per_minute: int = 60  # starting budget until rate-limit headers arrive
+    llm_max_attempts: int = 3
+    llm_diagnosis_timeout_seconds: int = 300  # per diagnosis, rate-limit waits included
 
     model_config = {
         "env_prefix": "AEGIS_",
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
-from datetime import datetime
+import threading
+import time
+from collections.abc import Collection, Iterable, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from typing import Any, Protocol
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import bindparam, create_engine, text
 
 logger = logging.getLogger("aegis.connectors")
 
@@ -20,12 +26,80 @@ SUPPORTED_WAREHOUSE_DIALECTS = (
 )
 
 
+# How FreshnessSentinel reads a table's last update: MAX() over a timestamp
+# column, or the warehouse catalog's last-modified metadata.
+FRESHNESS_STRATEGIES = ("column", "metadata")
+
+# Columns tried, in priority order, when a table has no explicit timestamp column.
+TIMESTAMP_COLUMN_CANDIDATES = ("updated_at", "_loaded_at", "created_at", "_etl_loaded_at")
+
+
+def resolve_timestamp_column(columns: list[dict[str, Any]]) -> str | None:
+    """Pick the freshness timestamp column from known column metadata.
+
+    Matches ``TIMESTAMP_COLUMN_CANDIDATES`` case-insensitively and returns the
+    column's name as the warehouse spells it, or None if no candidate exists.
+    """
+    by_lower = {c["name"].lower(): c["name"] for c in columns}
+    for candidate in TIMESTAMP_COLUMN_CANDIDATES:
+        if candidate in by_lower:
+            return by_lower[candidate]
+    return None
+
+
+def _column_from_row(row: Any) -> dict[str, Any]:
+    """Map an information_schema.columns row to Aegis' column dict."""
+    return {
+        "name": row[0],
+        "type": row[1],
+        "nullable": row[2] in ("YES", True, "true", 1),
+        "ordinal": row[3],
+    }
+
+
+# Type each batched MAX() is cast to, so a UNION ALL chunk can mix timestamp
+# flavours (Postgres timestamp/timestamptz, BigQuery TIMESTAMP/DATETIME).
+# Both casts read a zoneless value as UTC: BigQuery's default time zone is
+# UTC, and the Postgres batch pins its transaction to UTC.
+_BATCH_TIMESTAMP_TYPES = {
+    "postgresql": "TIMESTAMPTZ",
+    "postgres": "TIMESTAMPTZ",
+    "bigquery": "TIMESTAMP",
+}
+
+
+def _coerce_timestamp(value: Any) -> datetime | None:
+    """Normalize a MAX(timestamp) result; some drivers return ISO strings."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
 class WarehouseConnector:
     """Connects to a warehouse and executes queries via SQLAlchemy."""
 
-    def __init__(self, connection_uri: str, dialect: str):
+    def __init__(
+        self,
+        connection_uri: str,
+        dialect: str,
+        change_markers: dict[tuple[str, str], tuple[int, datetime | None]] | None = None,
+    ):
         self.dialect = dialect
         self._engine = create_engine(connection_uri.strip(), pool_pre_ping=True)
+        # pg_stat_user_tables write counters last seen per (schema, table),
+        # with the time they were first seen to move. The ConnectorRegistry
+        # passes in a dict it owns so markers outlive engine eviction.
+        self._change_markers = change_markers if change_markers is not None else {}
+        self._marker_lock = threading.Lock()
+
+    def _quote(self, name: str) -> str:
+        """Quote an identifier for this warehouse's dialect (only when it needs it)."""
+        return self._engine.dialect.identifier_preparer.quote(name)
+
+    def _table_ref(self, schema_name: str, table_name: str) -> str:
+        return f"{self._quote(schema_name)}.{self._quote(table_name)}"
 
     def test_connection(self) -> bool:
         """Verify connectivity with SELECT 1."""
@@ -47,46 +121,257 @@ class WarehouseConnector:
         )
         with self._engine.connect() as conn:
             rows = conn.execute(sql, {"schema": schema_name, "table": table_name}).fetchall()
-        return [
-            {
-                "name": row[0],
-                "type": row[1],
-                "nullable": row[2] in ("YES", True, "true", 1),
-                "ordinal": row[3],
-            }
-            for row in rows
-        ]
+        return [_column_from_row(row) for row in rows]
+
+    def fetch_schemas(
+        self, schema_names: Iterable[str] | None = None
+    ) -> dict[tuple[str, str], list[dict[str, Any]]]:
+        """Column metadata for every table in the given schemas, in one query.
+
+        With no schema names, covers every user schema on the connection.
+        Returns ``{(schema, table): columns}`` with the same column dicts as
+        ``fetch_schema``.
+        """
+        columns_sql = (
+            "SELECT table_schema, table_name, column_name, data_type, is_nullable, "
+            "ordinal_position FROM information_schema.columns"
+        )
+        order_by = " ORDER BY table_schema, table_name, ordinal_position"
+        params: dict[str, Any] = {}
+
+        if schema_names is None:
+            sql = text(columns_sql + order_by)
+        else:
+            params["schemas"] = sorted(set(schema_names))
+            if not params["schemas"]:
+                return {}
+            sql = text(columns_sql + " WHERE table_schema IN :schemas" + order_by).bindparams(
+                bindparam("schemas", expanding=True)
+            )
+
+        with self._engine.connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        result: dict[tuple[str, str], list[dict[str, Any]]] = {}
+        for row in rows:
+            if schema_names is None and self._is_system_schema(row[0]):
+                continue
+            result.setdefault((row[0], row[1]), []).append(_column_from_row(row[2:]))
+        return result
 
     def fetch_last_update_time(
         self, schema_name: str, table_name: str, timestamp_column: str | None = None
     ) -> datetime | None:
-        """Get the most recent row timestamp for freshness checking."""
-        fqn = f"{schema_name}.{table_name}"
+        """Get the most recent row timestamp for freshness checking.
+
+        Identifiers come from the API, so they are quoted for the dialect
+        rather than interpolated as-is.
+        """
+        fqn = self._table_ref(schema_name, table_name)
 
         if timestamp_column:
-            sql = text(f"SELECT MAX({timestamp_column}) FROM {fqn}")  # noqa: S608
+            sql = text(f"SELECT MAX({self._quote(timestamp_column)}) FROM {fqn}")  # noqa: S608
         else:
             # Try common timestamp columns
-            for col in ("updated_at", "_loaded_at", "created_at", "_etl_loaded_at"):
+            for col in TIMESTAMP_COLUMN_CANDIDATES:
                 try:
-                    sql = text(f"SELECT MAX({col}) FROM {fqn}")  # noqa: S608
+                    sql = text(f"SELECT MAX({self._quote(col)}) FROM {fqn}")  # noqa: S608
                     with self._engine.connect() as conn:
                         result = conn.execute(sql).scalar()
                     if result:
-                        if isinstance(result, str):
-                            return datetime.fromisoformat(result)
-                        return result
+                        return _coerce_timestamp(result)
                 except Exception:
                     continue
             return None
 
         with self._engine.connect() as conn:
             result = conn.execute(sql).scalar()
-        if result is None:
-            return None
-        if isinstance(result, str):
-            return datetime.fromisoformat(result)
-        return result
+        return _coerce_timestamp(result)
+
+    def fetch_last_update_times(
+        self,
+        tables: Sequence[tuple[str, str, str | None]],
+        chunk_size: int = 50,
+        metadata_tables: Collection[tuple[str, str]] = (),
+    ) -> dict[tuple[str, str], datetime | None]:
+        """Batched freshness probe over ``(schema, table, timestamp_column)`` triples.
+
+        Tables listed in ``metadata_tables`` are first answered from catalog
+        metadata (see ``fetch_metadata_last_modified``). One the catalog tracks
+        but cannot date yet is probed only if it has a timestamp column;
+        otherwise it is reported as ``None`` rather than re-running the
+        candidate probe every cycle. Everything else is read
+        ``chunk_size`` at a time with one ``UNION ALL`` of ``MAX()`` aggregates
+        per chunk; tables without a timestamp column fall back to
+        ``fetch_last_update_time``'s candidate probing. If a chunk fails, its
+        tables are retried one by one so a single broken table only drops
+        itself from the result — callers should treat a missing key as a
+        failed check.
+        """
+        results: dict[tuple[str, str], datetime | None] = {}
+
+        if metadata_tables:
+            undated: set[tuple[str, str]] = set()
+            try:
+                for key, value in self.fetch_metadata_last_modified(metadata_tables).items():
+                    if value is None:
+                        undated.add(key)
+                    else:
+                        results[key] = value
+            except Exception:
+                logger.warning(
+                    "Metadata freshness lookup failed — using column probes", exc_info=True
+                )
+            remaining = []
+            for schema_name, table_name, column in tables:
+                key = (schema_name, table_name)
+                if key in results:
+                    continue
+                if key in undated and not column:
+                    results[key] = None
+                else:
+                    remaining.append((schema_name, table_name, column))
+            tables = remaining
+
+        known = [entry for entry in tables if entry[2]]
+
+        for schema_name, table_name, column in tables:
+            if not column:
+                self._probe_isolated(results, schema_name, table_name, None)
+
+        for start in range(0, len(known), max(1, chunk_size)):
+            chunk = known[start:start + max(1, chunk_size)]
+            try:
+                results.update(self._max_timestamps(chunk))
+            except Exception:
+                logger.warning(
+                    "Batched freshness probe failed for %d tables — isolating",
+                    len(chunk),
+                    exc_info=True,
+                )
+                for schema_name, table_name, column in chunk:
+                    self._probe_isolated(results, schema_name, table_name, column)
+
+        return results
+
+    def fetch_metadata_last_modified(
+        self, tables: Collection[tuple[str, str]]
+    ) -> dict[tuple[str, str], datetime | None]:
+        """Last-modified times from warehouse catalog metadata — no table scans.
+
+        - Snowflake: ``INFORMATION_SCHEMA.TABLES.LAST_ALTERED``
+        - BigQuery: ``<dataset>.__TABLES__.last_modified_time``
+        - PostgreSQL: ``pg_stat_user_tables`` write counters. They carry no
+          timestamp, so a change is dated when this connector first sees the
+          counters move; until one has been observed the table maps to ``None``.
+
+        Tables the catalog does not know are omitted so callers can fall
+        back to the ``MAX(column)`` probe.
+        """
+        lookups = {
+            "snowflake": self._snowflake_last_altered,
+            "bigquery": self._bigquery_last_modified,
+            "postgresql": self._postgres_last_changed,
+            "postgres": self._postgres_last_changed,
+        }
+        lookup = lookups.get(self.dialect)
+        if lookup is None:
+            return {}
+
+        by_schema: dict[str, list[str]] = {}
+        for schema_name, table_name in tables:
+            by_schema.setdefault(schema_name, []).append(table_name)
+
+        results: dict[tuple[str, str], datetime | None] = {}
+        for schema_name, table_names in by_schema.items():
+            for table_name, value in lookup(schema_name, sorted(set(table_names))):
+                results[(schema_name, table_name)] = _coerce_timestamp(value)
+        return results
+
+    def _snowflake_last_altered(
+        self, schema_name: str, table_names: list[str]
+    ) -> list[tuple[str, Any]]:
+        sql = text(
+            "SELECT table_name, last_altered FROM information_schema.tables "
+            "WHERE table_schema = :schema AND table_name IN :names"
+        ).bindparams(bindparam("names", expanding=True))
+        with self._engine.connect() as conn:
+            rows = conn.execute(sql, {"schema": schema_name, "names": table_names}).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def _bigquery_last_modified(
+        self, schema_name: str, table_names: list[str]
+    ) -> list[tuple[str, Any]]:
+        sql = text(
+            "SELECT table_id, TIMESTAMP_MILLIS(last_modified_time) "  # noqa: S608
+            f"FROM {self._quote(schema_name)}.__TABLES__ WHERE table_id IN :names"
+        ).bindparams(bindparam("names", expanding=True))
+        with self._engine.connect() as conn:
+            rows = conn.execute(sql, {"names": table_names}).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def _postgres_last_changed(
+        self, schema_name: str, table_names: list[str]
+    ) -> list[tuple[str, Any]]:
+        sql = text(
+            "SELECT relname, n_tup_ins + n_tup_upd + n_tup_del "
+            "FROM pg_stat_user_tables "
+            "WHERE schemaname = :schema AND relname IN :names"
+        ).bindparams(bindparam("names", expanding=True))
+        with self._engine.connect() as conn:
+            rows = conn.execute(sql, {"schema": schema_name, "names": table_names}).fetchall()
+
+        now = datetime.now(timezone.utc)
+        results: list[tuple[str, Any]] = []
+        with self._marker_lock:
+            for table_name, writes in rows:
+                key = (schema_name, table_name)
+                previous = self._change_markers.get(key)
+                if previous is None or writes < previous[0]:
+                    # First sighting or stats reset — no baseline to date a change.
+                    self._change_markers[key] = (writes, None)
+                elif writes != previous[0]:
+                    self._change_markers[key] = (writes, now)
+                results.append((table_name, self._change_markers[key][1]))
+        return results
+
+    def _max_timestamps(
+        self, chunk: Sequence[tuple[str, str, str | None]]
+    ) -> dict[tuple[str, str], datetime | None]:
+        """One UNION ALL statement returning MAX(column) for every table in the chunk."""
+        cast_to = _BATCH_TIMESTAMP_TYPES.get(self.dialect)
+        parts = []
+        for i, (schema_name, table_name, column) in enumerate(chunk):
+            latest = f"MAX({self._quote(column)})"
+            if cast_to:
+                latest = f"CAST({latest} AS {cast_to})"
+            parts.append(
+                f"SELECT {i} AS idx, {latest} AS last_update "  # noqa: S608
+                f"FROM {self._table_ref(schema_name, table_name)}"
+            )
+        with self._engine.connect() as conn:
+            if cast_to == "TIMESTAMPTZ":
+                # Promote naive columns as UTC, not as the session's TimeZone.
+                conn.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+            rows = conn.execute(text(" UNION ALL ".join(parts))).fetchall()
+        return {
+            (chunk[idx][0], chunk[idx][1]): _coerce_timestamp(value)
+            for idx, value in rows
+        }
+
+    def _probe_isolated(
+        self,
+        results: dict[tuple[str, str], datetime | None],
+        schema_name: str,
+        table_name: str,
+        column: str | None,
+    ) -> None:
+        try:
+            results[(schema_name, table_name)] = self.fetch_last_update_time(
+                schema_name, table_name, column
+            )
+        except Exception:
+            logger.exception("Failed to check freshness for %s.%s", schema_name, table_name)
 
     SYSTEM_SCHEMAS = frozenset({
         "information_schema", "pg_catalog", "pg_toast", "pg_temp_1",
@@ -100,13 +385,14 @@ class WarehouseConnector:
         sql = text("SELECT schema_name FROM information_schema.schemata ORDER BY schema_name")
         with self._engine.connect() as conn:
             rows = conn.execute(sql).fetchall()
-        return [
-            row[0]
-            for row in rows
-            if row[0] not in self.SYSTEM_SCHEMAS
-            and not row[0].lower().startswith("pg_")
-            and not row[0].lower().startswith("snowflake")
-        ]
+        return [row[0] for row in rows if not self._is_system_schema(row[0])]
+
+    def _is_system_schema(self, schema_name: str) -> bool:
+        return (
+            schema_name in self.SYSTEM_SCHEMAS
+            or schema_name.lower().startswith("pg_")
+            or schema_name.lower().startswith("snowflake")
+        )
 
     def list_tables(self, schema_name: str) -> list[dict[str, str]]:
         """List all tables and views in a schema."""
@@ -123,16 +409,221 @@ class WarehouseConnector:
             for row in rows
         ]
 
+    def pool_stats(self) -> dict[str, Any]:
+        """Snapshot of the engine's connection pool counters."""
+        pool = self._engine.pool
+        stats: dict[str, Any] = {"pool_status": pool.status()}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            counter = getattr(pool, name, None)
+            if callable(counter):
+                stats[name] = counter()
+        return stats
+
     def dispose(self):
         """Dispose of the engine connection pool."""
         self._engine.dispose()
 
 
+@dataclass
+class _RegistryEntry:
+    connector: WarehouseConnector
+    uri_hash: str
+    created_at: float = field(default_factory=time.monotonic)
+    last_used_at: float = field(default_factory=time.monotonic)
+    checkouts: int = 0
+    in_use: int = 0
+
+
+class ConnectorRegistry:
+    """Long-lived WarehouseConnector cache shared by scans, lineage and the API.
+
+    Entries are keyed by connection id and a hash of the connection URI, so an
+    edited URI transparently rebuilds the engine. Engines idle for longer than
+    ``idle_timeout_seconds`` are disposed on the next registry access, unless
+    a caller still holds them: every ``get()`` must be paired with a
+    ``release()``, or use ``checkout()`` which does both.
+    """
+
+    def __init__(self, idle_timeout_seconds: float | None = None):
+        self._idle_timeout = idle_timeout_seconds
+        self._entries: dict[int, _RegistryEntry] = {}
+        # Entries dropped (URI edit, invalidate) while still checked out;
+        # disposed by the last release().
+        self._retired: list[_RegistryEntry] = []
+        # Postgres change markers per connection, kept here so an idle
+        # eviction does not reset every table's last-changed baseline.
+        self._change_markers: dict[int, dict[tuple[str, str], tuple[int, datetime | None]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def idle_timeout(self) -> float:
+        if self._idle_timeout is not None:
+            return self._idle_timeout
+        from aegis.config import settings
+
+        return settings.connector_idle_timeout_seconds
+
+    @staticmethod
+    def _hash_uri(connection_uri: str, dialect: str) -> str:
+        return hashlib.sha256(f"{dialect}|{connection_uri.strip()}".encode()).hexdigest()[:16]
+
+    def get(self, connection_id: int, connection_uri: str, dialect: str) -> WarehouseConnector:
+        """Check out a pooled connector for a connection, building one if needed.
+
+        The connector is not evicted until it is handed back with ``release()``.
+        """
+        uri_hash = self._hash_uri(connection_uri, dialect)
+        stale: list[WarehouseConnector] = []
+
+        with self._lock:
+            stale.extend(self._pop_idle())
+            entry = self._entries.get(connection_id)
+            if entry is not None and entry.uri_hash != uri_hash:
+                logger.info("Connection %d URI changed — rebuilding engine", connection_id)
+                stale.extend(self._retire(connection_id))
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                markers = self._change_markers.setdefault(connection_id, {})
+                entry = _RegistryEntry(
+                    connector=WarehouseConnector(connection_uri, dialect, change_markers=markers),
+                    uri_hash=uri_hash,
+                )
+                self._entries[connection_id] = entry
+            else:
+                self.hits += 1
+
+            entry.last_used_at = time.monotonic()
+            entry.checkouts += 1
+            entry.in_use += 1
+            connector = entry.connector
+
+        for old in stale:
+            old.dispose()
+        return connector
+
+    def release(self, connection_id: int, connector: WarehouseConnector) -> None:
+        """Hand back a connector obtained from ``get()``."""
+        disposable: WarehouseConnector | None = None
+        with self._lock:
+            entry = self._entries.get(connection_id)
+            if entry is not None and entry.connector is connector:
+                entry.in_use = max(0, entry.in_use - 1)
+                entry.last_used_at = time.monotonic()
+                return
+            for retired in self._retired:
+                if retired.connector is connector:
+                    retired.in_use -= 1
+                    if retired.in_use <= 0:
+                        self._retired.remove(retired)
+                        disposable = connector
+                    break
+        if disposable is not None:
+            disposable.dispose()
+
+    @contextmanager
+    def checkout(
+        self, connection_id: int, connection_uri: str, dialect: str
+    ) -> Iterator[WarehouseConnector]:
+        """``get()`` a connector for the duration of a ``with`` block."""
+        connector = self.get(connection_id, connection_uri, dialect)
+        try:
+            yield connector
+        finally:
+            self.release(connection_id, connector)
+
+    def invalidate(self, connection_id: int) -> None:
+        """Drop and dispose the engine for a connection (e.g. after edit or delete).
+
+        An engine still checked out is disposed once its last holder releases it.
+        """
+        with self._lock:
+            stale = self._retire(connection_id)
+        for connector in stale:
+            connector.dispose()
+
+    def evict_idle(self) -> int:
+        """Dispose engines idle past the timeout. Returns the number evicted."""
+        with self._lock:
+            stale = self._pop_idle()
+        for connector in stale:
+            connector.dispose()
+        return len(stale)
+
+    def close_all(self) -> None:
+        """Dispose every pooled engine (application shutdown)."""
+        with self._lock:
+            entries = list(self._entries.values()) + self._retired
+            self._entries.clear()
+            self._retired = []
+            self._change_markers.clear()
+        for entry in entries:
+            entry.connector.dispose()
+
+    def stats(self) -> dict[str, Any]:
+        """Registry counters plus per-connection engine pool status."""
+        now = time.monotonic()
+        with self._lock:
+            connections = [
+                {
+                    "connection_id": connection_id,
+                    "dialect": entry.connector.dialect,
+                    "uri_hash": entry.uri_hash,
+                    "age_seconds": round(now - entry.created_at, 1),
+                    "idle_seconds": round(now - entry.last_used_at, 1),
+                    "checkouts": entry.checkouts,
+                    "in_use": entry.in_use,
+                    **entry.connector.pool_stats(),
+                }
+                for connection_id, entry in sorted(self._entries.items())
+            ]
+            return {
+                "engines": len(connections),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "idle_timeout_seconds": self.idle_timeout,
+                "connections": connections,
+            }
+
+    def _retire(self, connection_id: int) -> list[WarehouseConnector]:
+        """Drop a connection's entry and markers. Caller must hold the lock.
+
+        Returns the connector to dispose now, or nothing if it is still
+        checked out (it then waits in ``_retired`` for its last release).
+        """
+        self._change_markers.pop(connection_id, None)
+        entry = self._entries.pop(connection_id, None)
+        if entry is None:
+            return []
+        if entry.in_use > 0:
+            self._retired.append(entry)
+            return []
+        return [entry.connector]
+
+    def _pop_idle(self) -> list[WarehouseConnector]:
+        """Remove idle entries. Caller must hold the lock and dispose the result."""
+        cutoff = time.monotonic() - self.idle_timeout
+        idle_ids = [
+            cid for cid, e in self._entries.items() if e.in_use == 0 and e.last_used_at < cutoff
+        ]
+        self.evictions += len(idle_ids)
+        return [self._entries.pop(cid).connector for cid in idle_ids]
+
+
+# Singleton instance
+connector_registry = ConnectorRegistry()
+
+
 class QueryLogExtractor(Protocol):
     """Protocol for dialect-specific query log extraction."""
 
     def extract(self, since: datetime, limit: int = 10000) -> list[dict[str, Any]]:
-        """Fetch recent query history from the warehouse."""
+        """Fetch query history executed at or after ``since``, oldest first."""
         ...
 
 
@@ -148,7 +639,7 @@ class SnowflakeExtractor:
             "FROM snowflake.account_usage.query_history "
             "WHERE query_type IN ('INSERT', 'CREATE_TABLE_AS_SELECT', 'MERGE') "
             "AND start_time >= :since "
-            "ORDER BY start_time DESC "
+            "ORDER BY start_time ASC "
             "LIMIT :limit"
         )
         with self._connector._engine.connect() as conn:
@@ -195,7 +686,7 @@ class BigQueryExtractor:
             "FROM `region-us`.INFORMATION_SCHEMA.JOBS "
             "WHERE statement_type IN ('INSERT', 'CREATE_TABLE_AS_SELECT', 'MERGE') "
             "AND creation_time >= :since "
-            "ORDER BY creation_time DESC "
+            "ORDER BY creation_time ASC "
             "LIMIT :limit"
         )
         with self._connector._engine.connect() as conn:
@@ -0,0 +1,189 @@
+"""Cache of LLM diagnoses keyed by an anomaly fingerprint."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from aegis.core.models import Diagnosis
+
+# Detail keys that differ on every occurrence of the same breach.
+_VOLATILE_KEYS = {"last_update", "minutes_overdue", "detected_at"}
+
+
+def anomaly_fingerprint(
+    anomaly_type: str,
+    severity: str,
+    detail: Any,
+    upstream: Iterable[str],
+    downstream_count: int,
+) -> str:
+    """Canonical hash of what the Architect prompt depends on, minus the table itself.
+
+    The change set is normalized (volatile keys dropped, entries sorted), and
+    the lineage neighborhood is the set of upstream tables plus how many
+    tables sit downstream. Sibling tables fed by the same sources with the
+    same drift therefore share a fingerprint, as does a table breaching the
+    same SLA night after night.
+    """
+    changes = detail if isinstance(detail, list) else [detail]
+    normalized = sorted(
+        json.dumps(
+            {k: v for k, v in change.items() if k not in _VOLATILE_KEYS}
+            if isinstance(change, dict) else change,
+            sort_keys=True,
+        )
+        for change in changes
+    )
+    canonical = json.dumps(
+        {
+            "type": anomaly_type,
+            "severity": severity,
+            "changes": normalized,
+            "upstream": sorted(set(upstream)),
+            "downstream_count": downstream_count,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+@dataclass
+class _Entry:
+    diagnosis: Diagnosis
+    table: str  # the table the diagnosis was written for
+    neighborhood: frozenset[str]
+    expires_at: float
+
+
+class DiagnosisCache:
+    """Bounded LRU of diagnoses with a TTL.
+
+    Entries remember the tables in their lineage neighborhood, and
+    ``invalidate_tables`` drops every entry whose neighborhood touches a
+    table whose edges changed.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = None,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._maxsize = maxsize
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        if self._maxsize is not None:
+            return self._maxsize
+        from aegis.config import settings
+
+        return settings.diagnosis_cache_size
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is not None:
+            return self._ttl
+        from aegis.config import settings
+
+        return settings.diagnosis_cache_ttl_seconds
+
+    def get(self, fingerprint: str, table: str) -> Diagnosis | None:
+        """A copy of the cached diagnosis rewritten for ``table`` and marked cached."""
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+            if entry is not None and entry.expires_at <= self._clock():
+                del self._entries[fingerprint]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(fingerprint)
+            self.hits += 1
+
+        diagnosis = entry.diagnosis.model_copy(deep=True)
+        if entry.table != table:
+            _retarget(diagnosis, entry.table, table)
+        diagnosis.cached = True
+        return diagnosis
+
+    def put(
+        self, fingerprint: str, table: str, diagnosis: Diagnosis, neighborhood: Iterable[str]
+    ) -> None:
+        if self.maxsize <= 0:
+            return
+        entry = _Entry(
+            diagnosis=diagnosis.model_copy(deep=True),
+            table=table,
+            neighborhood=frozenset(neighborhood) | {table},
+            expires_at=self._clock() + self.ttl,
+        )
+        with self._lock:
+            self._entries[fingerprint] = entry
+            self._entries.move_to_end(fingerprint)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """Drop entries whose lineage neighborhood includes any of ``tables``."""
+        tables = set(tables)
+        if not tables:
+            return 0
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if e.neighborhood & tables]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def _retarget(diagnosis: Diagnosis, old: str, new: str) -> None:
+    """Point a diagnosis written for table ``old`` at table ``new``, in place.
+
+    Only whole qualified names are replaced: ``raw.orders`` is left alone in
+    ``raw.orders_archive`` or ``x.raw.orders``, but ``raw.orders.id`` becomes
+    a column of the new table.
+    """
+    pattern = re.compile(rf"(?<![\w.]){re.escape(old)}(?!\w)", re.IGNORECASE)
+
+    def rewrite(text: str) -> str:
+        return pattern.sub(lambda _: new, text)
+
+    diagnosis.root_cause = rewrite(diagnosis.root_cause)
+    if diagnosis.root_cause_table == old:
+        diagnosis.root_cause_table = new
+    for recommendation in diagnosis.recommendations:
+        recommendation.description = rewrite(recommendation.description)
+        if recommendation.sql is not None:
+            recommendation.sql = rewrite(recommendation.sql)
+
+
+diagnosis_cache = DiagnosisCache()
@@ -3,28 +3,407 @@
 from __future__ import annotations
 
 import hashlib
+import heapq
+import json
 import logging
+import math
+import threading
+import time
 from collections import deque
+from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime, timedelta, timezone
+from functools import partial
 from typing import Any
 
-from sqlalchemy import select, update
+from sqlalchemy import (
+    Integer,
+    String,
+    and_,
+    delete,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    tuple_,
+)
 from sqlalchemy.orm import Session
 
+from aegis.config import settings
 from aegis.core.connectors import WarehouseConnector, get_extractor
-from aegis.core.models import LineageEdgeModel
-from aegis.utils.sql_parser import extract_lineage_edges
+from aegis.core.diagnosis_cache import diagnosis_cache
+from aegis.core.models import (
+    ColumnLineageEdgeModel,
+    LineageCursorModel,
+    LineageEdgeModel,
+    LineageReachabilityModel,
+)
+from aegis.core.parse_cache import (
+    column_parse_cache,
+    extract_columns,
+    extract_tables_and_columns,
+    parse_cache,
+)
+from aegis.core.parse_pool import parse_statements
+from aegis.utils.sql_parser import ColumnEdge, ParsedEdge
 
 logger = logging.getLogger("aegis.lineage")
 
 STALE_DAYS = 30
+BLAST_RADIUS_DEPTH = 10
+
+
+class LineageIndex:
+    """In-memory forward/reverse adjacency over ``lineage_edges``.
+
+    Built from a single query and swapped in atomically, so readers on other
+    threads always see a complete snapshot. Each adjacency keeps the edge's
+    ``last_seen_at`` so stale edges are filtered at traversal time exactly as
+    the SQL path does. ``LineageRefresher`` rebuilds the shared
+    ``lineage_index`` after every commit; writes from another process (the
+    snapshot CLI, a second server) are caught by ``ensure_built``, which
+    compares a marker of the table against the one taken at build time.
+    """
+
+    def __init__(self):
+        self._maps: tuple[_Adjacency, _Adjacency] | None = None
+        self._csr: Any = None
+        self._lock = threading.Lock()
+        # Bumped on every rebuild/invalidate, so a CSR built from an older
+        # snapshot is never stored over a newer one.
+        self._generation = 0
+        self._marker: tuple[Any, ...] | None = None
+        self._checked_at = 0.0
+        self.built_at: datetime | None = None
+        self.edge_count = 0
+
+    @property
+    def is_built(self) -> bool:
+        return self._maps is not None
+
+    def rebuild(self, db: Session) -> None:
+        """Reload every edge from the metadata DB in one query."""
+        marker = _edge_marker(db)
+        stmt = select(
+            LineageEdgeModel.source_table,
+            LineageEdgeModel.target_table,
+            LineageEdgeModel.confidence,
+            LineageEdgeModel.last_seen_at,
+        ).order_by(LineageEdgeModel.id)
+
+        forward: _Adjacency = {}
+        reverse: _Adjacency = {}
+        count = 0
+        for source, target, confidence, last_seen_at in db.execute(stmt):
+            seen = _as_utc(last_seen_at)
+            forward.setdefault(source, []).append((target, confidence, seen))
+            reverse.setdefault(target, []).append((source, confidence, seen))
+            count += 1
+
+        with self._lock:
+            self._maps = (forward, reverse)
+            self._csr = None
+            self._generation += 1
+            self._marker = marker
+            self._checked_at = time.monotonic()
+            self.built_at = datetime.now(timezone.utc)
+            self.edge_count = count
+        logger.debug("Lineage index rebuilt with %d edges", count)
+
+    def ensure_built(self, db: Session) -> LineageIndex:
+        """Build on first use; rebuild if ``lineage_edges`` changed since.
+
+        The change check is one aggregate query, run at most every
+        ``lineage_index_check_seconds``.
+        """
+        if self._maps is None:
+            self.rebuild(db)
+        elif time.monotonic() - self._checked_at >= settings.lineage_index_check_seconds:
+            self._checked_at = time.monotonic()
+            if _edge_marker(db) != self._marker:
+                logger.info("lineage_edges changed since the index was built; rebuilding")
+                self.rebuild(db)
+        return self
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._maps = None
+            self._csr = None
+            self._generation += 1
+
+    def csr(self, db: Session) -> Any:
+        """Array-backed snapshot for ``lineage_traversal_mode = "csr"``.
+
+        Built lazily from ``db`` and dropped whenever the index is rebuilt.
+        Raises ImportError when numpy is not installed.
+        """
+        self.ensure_built(db)
+        with self._lock:
+            snapshot, generation = self._csr, self._generation
+        if snapshot is None:
+            from aegis.core.lineage_csr import CSRLineage
+
+            snapshot = CSRLineage.from_db(db)
+            with self._lock:
+                # A rebuild that finished meanwhile owns the newer edges.
+                if self._generation == generation:
+                    self._csr = snapshot
+        return snapshot
+
+    def neighbors(
+        self, table: str, direction: str, cutoff: datetime
+    ) -> list[tuple[str, float]]:
+        """Adjacent tables seen since ``cutoff``, in edge insertion order."""
+        return [(n, c) for n, c, _seen in self.adjacent(table, direction, cutoff)]
+
+    def adjacent(
+        self, table: str, direction: str, cutoff: datetime
+    ) -> list[tuple[str, float, datetime | None]]:
+        """Like ``neighbors`` but including each edge's ``last_seen_at``."""
+        maps = self._maps
+        if maps is None:
+            return []
+        adjacency = maps[0] if direction == "downstream" else maps[1]
+        return [
+            entry for entry in adjacency.get(table, ())
+            if entry[2] is None or entry[2] >= cutoff
+        ]
+
+    def sources(self) -> list[str]:
+        maps = self._maps
+        return list(maps[0]) if maps is not None else []
+
+
+_Adjacency = dict[str, list[tuple[str, float, "datetime | None"]]]
+
+
+def _edge_marker(db: Session) -> tuple[Any, ...]:
+    """Changes whenever an edge is added, removed, re-seen or re-weighted."""
+    return tuple(db.execute(
+        select(
+            func.count(),
+            func.max(LineageEdgeModel.id),
+            func.max(LineageEdgeModel.last_seen_at),
+            func.sum(LineageEdgeModel.confidence),
+        )
+    ).one())
+
+lineage_index = LineageIndex()
+
+
+class ReachabilityStore:
+    """Materialized blast radius in ``lineage_reachability``.
+
+    Holds one row per (source, downstream table) within ``BLAST_RADIUS_DEPTH``
+    hops, at the minimum depth with the best confidence among edges from the
+    previous level. Each row carries ``expires_at``: when the oldest edge on
+    its path crosses the stale cutoff. ``sync`` recomputes only sources with
+    an expired row plus the ancestors of edges that were added, strengthened
+    or revived, so blast radius becomes a single indexed lookup.
+    """
+
+    def __init__(self, db: Session, index: LineageIndex | None = None):
+        self.db = db
+        self._index = index
+
+    def lookup(self, table: str) -> list[dict[str, Any]] | None:
+        """Materialized downstream of ``table``, or None if it must be walked live."""
+        now = datetime.now(timezone.utc)
+        rows = self.db.execute(
+            select(
+                LineageReachabilityModel.target_table,
+                LineageReachabilityModel.depth,
+                LineageReachabilityModel.confidence,
+                LineageReachabilityModel.expires_at,
+            )
+            .where(LineageReachabilityModel.source_table == table)
+            .order_by(LineageReachabilityModel.depth, LineageReachabilityModel.target_table)
+        ).all()
+
+        if not rows:
+            # No closure yet (a leaf, or a source whose first edges await the
+            # next sync) — a live walk answers both correctly.
+            return None
+        if any(_as_utc(expires_at) < now for *_, expires_at in rows):
+            return None  # awaiting the next sync
+        return [
+            {"table": target, "depth": depth, "confidence": confidence}
+            for target, depth, confidence, _ in rows
+        ]
+
+    def sync(self, changed_sources: Iterable[str] = ()) -> int:
+        """Bring the closure up to date. Returns the number of sources recomputed."""
+        index = self._get_index()
+        now = datetime.now(timezone.utc)
+
+        if self.db.execute(select(LineageReachabilityModel.source_table).limit(1)).first() is None:
+            return self.rebuild()
+
+        expired = self.db.execute(
+            select(LineageReachabilityModel.source_table)
+            .where(LineageReachabilityModel.expires_at < now)
+            .distinct()
+        ).scalars().all()
+
+        cutoff = now - timedelta(days=STALE_DAYS)
+        roots: set[str] = set(expired)
+        for source in changed_sources:
+            if source in roots:
+                continue
+            roots.add(source)
+            ancestors = _walk(index, source, "upstream", cutoff, BLAST_RADIUS_DEPTH - 1)
+            roots.update(ancestors)
+
+        self._recompute(sorted(roots), index, now)
+        self.db.commit()
+        return len(roots)
+
+    def rebuild(self) -> int:
+        """Recompute the closure of every table with outgoing edges."""
+        index = self._get_index()
+        self.db.execute(delete(LineageReachabilityModel))
+        sources = index.sources()
+        self._recompute(sources, index, datetime.now(timezone.utc))
+        self.db.commit()
+        logger.info("Rebuilt lineage reachability for %d sources", len(sources))
+        return len(sources)
+
+    def _get_index(self) -> LineageIndex:
+        if self._index is None:
+            self._index = LineageIndex()
+        return self._index.ensure_built(self.db)
+
+    def _recompute(self, sources: list[str], index: LineageIndex, now: datetime) -> None:
+        cutoff = now - timedelta(days=STALE_DAYS)
+        batch_size = max(1, settings.lineage_upsert_batch_size)
+        for start in range(0, len(sources), batch_size):
+            batch = sources[start:start + batch_size]
+            self.db.execute(
+                delete(LineageReachabilityModel).where(
+                    LineageReachabilityModel.source_table.in_(batch)
+                )
+            )
+            rows = [
+                {
+                    "source_table": source,
+                    "target_table": target,
+                    "depth": depth,
+                    "confidence": confidence,
+                    "expires_at": expires_at,
+                }
+                for source in batch
+                for target, (depth, confidence, expires_at)
+                in _closure(index, source, cutoff).items()
+            ]
+            if rows:
+                self.db.execute(insert(LineageReachabilityModel), rows)
+
+
+def _closure(
+    index: LineageIndex, source: str, cutoff: datetime
+) -> dict[str, tuple[int, float, datetime]]:
+    """Level-by-level BFS recording depth, confidence and path expiry per table."""
+    stale_after = timedelta(days=STALE_DAYS)
+    result: dict[str, tuple[int, float, datetime]] = {}
+    visited = {source}
+    frontier: dict[str, datetime] = {source: datetime.max.replace(tzinfo=timezone.utc)}
+
+    for depth in range(1, BLAST_RADIUS_DEPTH + 1):
+        level: dict[str, tuple[float, datetime]] = {}
+        for node, node_expires in frontier.items():
+            for neighbor, confidence, seen in index.adjacent(node, "downstream", cutoff):
+                if neighbor in visited:
+                    continue
+                expires = min(node_expires, seen + stale_after) if seen else node_expires
+                best = level.get(neighbor)
+                if best is None or (confidence, expires) > best:
+                    level[neighbor] = (confidence, expires)
+        if not level:
+            break
+        visited.update(level)
+        for neighbor, (confidence, expires) in level.items():
+            result[neighbor] = (depth, confidence, expires)
+        frontier = {neighbor: expires for neighbor, (_c, expires) in level.items()}
+
+    return result
+
+
+def _unwind(parent: dict[str, str | None], node: str) -> list[str]:
+    """Rebuild the path to ``node`` from BFS/Dijkstra parent pointers."""
+    path: list[str] = []
+    current: str | None = node
+    while current is not None:
+        path.append(current)
+        current = parent[current]
+    path.reverse()
+    return path
+
+
+def _dijkstra(
+    source: str,
+    target: str,
+    edges_from: Callable[[str], dict[str, float]],
+    banned_edges: set[tuple[str, str]],
+    banned_nodes: set[str],
+) -> tuple[float, list[str]] | None:
+    """Cheapest path by summed edge weight, or None if ``target`` is unreachable."""
+    dist = {source: 0.0}
+    parent: dict[str, str | None] = {source: None}
+    heap: list[tuple[float, str]] = [(0.0, source)]
+
+    while heap:
+        cost, node = heapq.heappop(heap)
+        if cost > dist[node]:
+            continue
+        if node == target:
+            return cost, _unwind(parent, node)
+        for neighbor, weight in edges_from(node).items():
+            if neighbor in banned_nodes or (node, neighbor) in banned_edges:
+                continue
+            candidate = cost + weight
+            if candidate < dist.get(neighbor, math.inf):
+                dist[neighbor] = candidate
+                parent[neighbor] = node
+                heapq.heappush(heap, (candidate, neighbor))
+
+    return None
+
+
+def _walk(
+    index: LineageIndex, start: str, direction: str, cutoff: datetime, depth: int
+) -> set[str]:
+    """Tables within ``depth`` hops of ``start``."""
+    seen: set[str] = set()
+    frontier = {start}
+    for _ in range(depth):
+        frontier = {
+            neighbor
+            for node in frontier
+            for neighbor, _c in index.neighbors(node, direction, cutoff)
+            if neighbor not in seen and neighbor != start
+        }
+        if not frontier:
+            break
+        seen.update(frontier)
+    return seen
 
 
 class LineageGraph:
-    """DAG traversal over lineage_edges for blast-radius and path queries."""
+    """DAG traversal over lineage_edges for blast-radius and path queries.
 
-    def __init__(self, db: Session):
+    With ``lineage_traversal_mode = "index"`` traversals run against a
+    ``LineageIndex``: the one passed in (normally the shared ``lineage_index``)
+    or a private one built from ``db`` on first use. ``"csr"`` runs the same
+    traversals over NumPy arrays (``aegis.core.lineage_csr``) and falls back
+    to ``"index"`` when numpy is missing. ``"cte"`` runs upstream,
+    downstream and blast-radius walks as a single recursive query, for graphs
+    too large to hold in memory. ``"sql"`` queries the metadata DB once per
+    visited node.
+    """
+
+    def __init__(self, db: Session, index: LineageIndex | None = None):
         self.db = db
+        self._index = index
 
     def get_upstream(self, table: str, depth: int = 3) -> list[dict[str, Any]]:
         """BFS upstream — what feeds INTO this table."""
@@ -36,7 +415,11 @@ class LineageGraph:
 
     def get_blast_radius(self, table: str) -> dict[str, Any]:
         """Full downstream impact assessment."""
-        downstream = self.get_downstream(table, depth=10)
+        downstream = None
+        if settings.lineage_reachability_enabled:
+            downstream = ReachabilityStore(self.db).lookup(table)
+        if downstream is None:
+            downstream = self.get_downstream(table, depth=BLAST_RADIUS_DEPTH)
         return {
             "table": table,
             "affected_tables": downstream,
@@ -44,125 +427,387 @@ class LineageGraph:
             "max_depth": max((n["depth"] for n in downstream), default=0),
         }
 
+    def get_column_blast_radius(
+        self, table: str, column: str, depth: int = BLAST_RADIUS_DEPTH
+    ) -> dict[str, Any]:
+        """Downstream columns derived from ``table.column``.
+
+        Walks ``column_lineage_edges`` a whole frontier at a time, so the cost
+        is one indexed query per level rather than per column.
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(days=STALE_DAYS)
+        visited = {(table, column)}
+        frontier = [(table, column)]
+        affected: list[dict[str, Any]] = []
+
+        for level in range(1, depth + 1):
+            stmt = (
+                select(
+                    ColumnLineageEdgeModel.source_table,
+                    ColumnLineageEdgeModel.source_column,
+                    ColumnLineageEdgeModel.target_table,
+                    ColumnLineageEdgeModel.target_column,
+                    ColumnLineageEdgeModel.confidence,
+                )
+                .where(
+                    tuple_(
+                        ColumnLineageEdgeModel.source_table, ColumnLineageEdgeModel.source_column
+                    ).in_(frontier),
+                    ColumnLineageEdgeModel.last_seen_at >= cutoff,
+                )
+                .order_by(ColumnLineageEdgeModel.id)
+            )
+            # Order the level's rows by the frontier so discovery order is BFS order.
+            position = {node: i for i, node in enumerate(frontier)}
+            rows = sorted(self.db.execute(stmt), key=lambda r: position[(r[0], r[1])])
+
+            frontier = []
+            for _src_table, _src_column, dst_table, dst_column, confidence in rows:
+                node = (dst_table, dst_column)
+                if node in visited:
+                    continue
+                visited.add(node)
+                frontier.append(node)
+                affected.append({
+                    "table": dst_table,
+                    "column": dst_column,
+                    "depth": level,
+                    "confidence": confidence,
+                })
+            if not frontier:
+                break
+
+        return {
+            "table": table,
+            "column": column,
+            "affected_columns": affected,
+            "affected_tables": sorted({node["table"] for node in affected}),
+            "total_affected": len(affected),
+            "max_depth": max((node["depth"] for node in affected), default=0),
+        }
+
     def get_path(self, source: str, target: str) -> list[str] | None:
         """Shortest dependency path between two tables using BFS."""
         cutoff = datetime.now(timezone.utc) - timedelta(days=STALE_DAYS)
+        csr = self._csr_snapshot()
+        if csr is not None:
+            return csr.path(source, target, cutoff)
 
-        visited: set[str] = {source}
-        queue: deque[tuple[str, list[str]]] = deque([(source, [source])])
+        parent: dict[str, str | None] = {source: None}
+        queue: deque[str] = deque([source])
 
         while queue:
-            current, path = queue.popleft()
+            current = queue.popleft()
 
-            stmt = (
-                select(LineageEdgeModel.target_table)
-                .where(LineageEdgeModel.source_table == current)
-                .where(LineageEdgeModel.last_seen_at >= cutoff)
-            )
-            neighbors = [row[0] for row in self.db.execute(stmt).all()]
-
-            for neighbor in neighbors:
+            for neighbor, _confidence in self._neighbors(current, "downstream", cutoff):
                 if neighbor == target:
-                    return path + [neighbor]
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append((neighbor, path + [neighbor]))
+                    return _unwind(parent, current) + [neighbor]
+                if neighbor not in parent:
+                    parent[neighbor] = current
+                    queue.append(neighbor)
 
         return None
 
-    def get_full_graph(self, connection_id: int | None = None) -> dict[str, Any]:
-        """Return all nodes and edges for visualization, optionally filtered by connection."""
-        from aegis.core.models import MonitoredTableModel
+    def get_top_paths(self, source: str, target: str, k: int = 3) -> list[dict[str, Any]]:
+        """The ``k`` most confident downstream paths from ``source`` to ``target``.
 
+        A path's confidence is the product of its edge confidences, so paths
+        are ranked with Dijkstra over ``-log(confidence)`` and Yen's algorithm
+        supplies the runners-up. Parallel edges collapse to the strongest.
+        """
+        if source == target or k < 1:
+            return []
         cutoff = datetime.now(timezone.utc) - timedelta(days=STALE_DAYS)
+        weights: dict[str, dict[str, float]] = {}
 
-        stmt = select(LineageEdgeModel).where(LineageEdgeModel.last_seen_at >= cutoff)
-        edges = self.db.execute(stmt).scalars().all()
+        def edges_from(node: str) -> dict[str, float]:
+            if node not in weights:
+                best: dict[str, float] = {}
+                for neighbor, confidence in self._neighbors(node, "downstream", cutoff):
+                    if confidence > 0:
+                        best[neighbor] = min(best.get(neighbor, math.inf), -math.log(confidence))
+                weights[node] = best
+            return weights[node]
 
-        # If filtering by connection, get that connection's table names
-        allowed_tables: set[str] | None = None
-        if connection_id is not None:
-            table_stmt = (
-                select(MonitoredTableModel.fully_qualified_name)
-                .where(MonitoredTableModel.connection_id == connection_id)
-            )
-            allowed_tables = {
-                row[0] for row in self.db.execute(table_stmt).all()
-            }
+        first = _dijkstra(source, target, edges_from, set(), set())
+        if first is None:
+            return []
 
-        nodes: set[str] = set()
-        edge_list: list[dict[str, Any]] = []
+        found: list[tuple[float, list[str]]] = [first]
+        candidates: list[tuple[float, int, list[str]]] = []
+        queued: set[tuple[str, ...]] = {tuple(first[1])}
 
-        for edge in edges:
-            if allowed_tables is not None:
-                if edge.source_table not in allowed_tables and edge.target_table not in allowed_tables:
+        while len(found) < k:
+            previous = found[-1][1]
+            for i in range(len(previous) - 1):
+                root = previous[:i + 1]
+                banned_edges = {
+                    (path[i], path[i + 1]) for _cost, path in found if path[:i + 1] == root
+                }
+                spur = _dijkstra(root[-1], target, edges_from, banned_edges, set(root[:-1]))
+                if spur is None:
+                    continue
+                path = root[:-1] + spur[1]
+                if tuple(path) in queued:
                     continue
-            nodes.add(edge.source_table)
-            nodes.add(edge.target_table)
+                queued.add(tuple(path))
+                root_cost = sum(edges_from(a)[b] for a, b in zip(root, root[1:]))
+                heapq.heappush(candidates, (root_cost + spur[0], len(queued), path))
+            if not candidates:
+                break
+            cost, _order, path = heapq.heappop(candidates)
+            found.append((cost, path))
+
+        return [
+            {"path": path, "confidence": math.exp(-cost), "hops": len(path) - 1}
+            for cost, path in found
+        ]
+
+    def get_full_graph(
+        self,
+        connection_id: int | None = None,
+        focus: str | None = None,
+        depth: int = 2,
+        cursor: int | None = None,
+        limit: int | None = None,
+    ) -> dict[str, Any]:
+        """Return nodes and edges for visualization.
+
+        Filtering happens in SQL: by connection (either endpoint belongs to
+        it) and, with ``focus``, to edges among tables within ``depth`` hops
+        of that table. ``cursor``/``limit`` page through edges by id; the
+        response's ``next_cursor`` is None on the last page.
+        """
+        page_size = limit + 1 if limit else None
+        rows = list(self._graph_rows(connection_id, focus, depth, cursor, page_size))
+        next_cursor = None
+        if limit and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1][0]
+
+        nodes: set[str] = set()
+        edge_list: list[dict[str, Any]] = []
+        for _id, source, target, relationship, confidence in rows:
+            nodes.add(source)
+            nodes.add(target)
             edge_list.append({
-                "source": edge.source_table,
-                "target": edge.target_table,
-                "relationship": edge.relationship_type,
-                "confidence": edge.confidence,
+                "source": source,
+                "target": target,
+                "relationship": relationship,
+                "confidence": confidence,
             })
 
         return {
             "nodes": [{"id": n, "label": n} for n in sorted(nodes)],
             "edges": edge_list,
+            "next_cursor": next_cursor,
         }
 
+    def iter_full_graph(
+        self,
+        connection_id: int | None = None,
+        focus: str | None = None,
+        depth: int = 2,
+        cursor: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Stream the same graph as records: each node before the first edge using it."""
+        seen: set[str] = set()
+        for _id, source, target, relationship, confidence in self._graph_rows(
+            connection_id, focus, depth, cursor, None
+        ):
+            for table in (source, target):
+                if table not in seen:
+                    seen.add(table)
+                    yield {"type": "node", "id": table, "label": table}
+            yield {
+                "type": "edge",
+                "source": source,
+                "target": target,
+                "relationship": relationship,
+                "confidence": confidence,
+            }
+
+    def _graph_rows(
+        self,
+        connection_id: int | None,
+        focus: str | None,
+        depth: int,
+        cursor: int | None,
+        limit: int | None,
+    ) -> Iterator[tuple[int, str, str, str, float]]:
+        from aegis.core.models import MonitoredTableModel
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=STALE_DAYS)
+        stmt = (
+            select(
+                LineageEdgeModel.id,
+                LineageEdgeModel.source_table,
+                LineageEdgeModel.target_table,
+                LineageEdgeModel.relationship_type,
+                LineageEdgeModel.confidence,
+            )
+            .where(LineageEdgeModel.last_seen_at >= cutoff)
+            .order_by(LineageEdgeModel.id)
+        )
+
+        if connection_id is not None:
+            tables = (
+                select(MonitoredTableModel.fully_qualified_name)
+                .where(MonitoredTableModel.connection_id == connection_id)
+                .scalar_subquery()
+            )
+            stmt = stmt.where(or_(
+                LineageEdgeModel.source_table.in_(tables),
+                LineageEdgeModel.target_table.in_(tables),
+            ))
+        if focus is not None:
+            around = {focus}
+            around.update(n["table"] for n in self.get_upstream(focus, depth=depth))
+            around.update(n["table"] for n in self.get_downstream(focus, depth=depth))
+            stmt = stmt.where(
+                LineageEdgeModel.source_table.in_(around),
+                LineageEdgeModel.target_table.in_(around),
+            )
+        if cursor is not None:
+            stmt = stmt.where(LineageEdgeModel.id > cursor)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        yield from self.db.execute(stmt.execution_options(yield_per=1000))
+
     def _bfs(self, start: str, depth: int, direction: str) -> list[dict[str, Any]]:
         """Generic BFS traversal in either direction."""
         cutoff = datetime.now(timezone.utc) - timedelta(days=STALE_DAYS)
+        if settings.lineage_traversal_mode == "cte":
+            return self._bfs_cte(start, depth, direction, cutoff)
+        csr = self._csr_snapshot()
+        if csr is not None:
+            return csr.bfs(start, depth, direction, cutoff)
+
+        # Level by level, so each table gets its minimum depth and the best
+        # confidence among edges from the previous level — the same rule as
+        # the CTE, CSR and materialized (_closure) traversals.
         results: list[dict[str, Any]] = []
         visited: set[str] = {start}
-        queue: deque[tuple[str, int]] = deque([(start, 0)])
+        frontier = [start]
 
-        while queue:
-            current, current_depth = queue.popleft()
-            if current_depth >= depth:
-                continue
+        for level in range(1, depth + 1):
+            best: dict[str, float] = {}
+            for current in frontier:
+                for neighbor, confidence in self._neighbors(current, direction, cutoff):
+                    if neighbor not in visited and confidence > best.get(neighbor, -1.0):
+                        best[neighbor] = confidence
+            if not best:
+                break
+            visited.update(best)
+            results.extend(
+                {"table": table, "depth": level, "confidence": confidence}
+                for table, confidence in best.items()
+            )
+            frontier = list(best)
 
-            if direction == "downstream":
-                stmt = (
-                    select(LineageEdgeModel)
-                    .where(LineageEdgeModel.source_table == current)
-                    .where(LineageEdgeModel.last_seen_at >= cutoff)
-                )
-            else:
-                stmt = (
-                    select(LineageEdgeModel)
-                    .where(LineageEdgeModel.target_table == current)
-                    .where(LineageEdgeModel.last_seen_at >= cutoff)
-                )
+        return results
 
-            edges = self.db.execute(stmt).scalars().all()
+    def _bfs_cte(
+        self, start: str, depth: int, direction: str, cutoff: datetime
+    ) -> list[dict[str, Any]]:
+        """The same BFS pushed into one ``WITH RECURSIVE`` query.
 
-            for edge in edges:
-                neighbor = (
-                    edge.target_table if direction == "downstream" else edge.source_table
-                )
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    node = {
-                        "table": neighbor,
-                        "depth": current_depth + 1,
-                        "confidence": edge.confidence,
-                    }
-                    results.append(node)
-                    queue.append((neighbor, current_depth + 1))
+        ``walk`` enumerates (table, depth) pairs up to ``depth`` hops; UNION
+        dedups them, so cycles terminate. Each table is reported at its minimum
+        depth with the best confidence among edges from the previous level.
+        Ties at a level are ordered by table name rather than edge order.
+        """
+        edges = LineageEdgeModel.__table__
+        if direction == "downstream":
+            near, far = edges.c.source_table, edges.c.target_table
+        else:
+            near, far = edges.c.target_table, edges.c.source_table
 
-        return results
+        walk = select(
+            literal(start, String).label("tbl"), literal(0, Integer).label("depth")
+        ).cte("walk", recursive=True)
+        walk = walk.union(
+            select(far.label("tbl"), (walk.c.depth + 1).label("depth"))
+            .join_from(edges, walk, near == walk.c.tbl)
+            .where(walk.c.depth < depth, edges.c.last_seen_at >= cutoff)
+        )
+        reached = (
+            select(walk.c.tbl, func.min(walk.c.depth).label("depth"))
+            .where(walk.c.tbl != start)
+            .group_by(walk.c.tbl)
+            .subquery("reached")
+        )
+        parent = walk.alias("parent")
+        stmt = (
+            select(reached.c.tbl, reached.c.depth, func.max(edges.c.confidence))
+            .join_from(reached, edges, far == reached.c.tbl)
+            .join(parent, and_(parent.c.tbl == near, parent.c.depth == reached.c.depth - 1))
+            .where(edges.c.last_seen_at >= cutoff)
+            .group_by(reached.c.tbl, reached.c.depth)
+            .order_by(reached.c.depth, reached.c.tbl)
+        )
+        return [
+            {"table": table, "depth": hops, "confidence": confidence}
+            for table, hops, confidence in self.db.execute(stmt).all()
+        ]
+
+    def _csr_snapshot(self) -> Any:
+        if settings.lineage_traversal_mode != "csr":
+            return None
+        if self._index is None:
+            self._index = LineageIndex()
+        try:
+            return self._index.csr(self.db)
+        except ImportError:
+            logger.warning("lineage_traversal_mode=csr needs numpy; using the index backend")
+            return None
+
+    def _neighbors(
+        self, table: str, direction: str, cutoff: datetime
+    ) -> list[tuple[str, float]]:
+        """(neighbor, confidence) pairs one hop away in ``direction``."""
+        if settings.lineage_traversal_mode in ("index", "csr"):
+            if self._index is None:
+                self._index = LineageIndex()
+            return self._index.ensure_built(self.db).neighbors(table, direction, cutoff)
+
+        if direction == "downstream":
+            stmt = (
+                select(LineageEdgeModel.target_table, LineageEdgeModel.confidence)
+                .where(LineageEdgeModel.source_table == table)
+                .where(LineageEdgeModel.last_seen_at >= cutoff)
+                .order_by(LineageEdgeModel.id)
+            )
+        else:
+            stmt = (
+                select(LineageEdgeModel.source_table, LineageEdgeModel.confidence)
+                .where(LineageEdgeModel.target_table == table)
+                .where(LineageEdgeModel.last_seen_at >= cutoff)
+                .order_by(LineageEdgeModel.id)
+            )
+        return [(row[0], row[1]) for row in self.db.execute(stmt).all()]
 
 
 class LineageRefresher:
-    """Parses warehouse query logs to discover and update lineage edges."""
+    """Parses warehouse query logs to discover and update lineage edges.
+
+    When given a ``connection_id`` the refresher keeps a per-connection cursor
+    in ``lineage_cursors``. Each refresh re-reads ``lineage_ingest_latency_minutes``
+    behind the newest entry it has processed, because query histories such as
+    Snowflake's ``ACCOUNT_USAGE`` publish rows late and a long-running query
+    lands behind queries that started after it. Entries inside that window
+    are remembered by key, so the overlap never parses anything twice.
+    """
 
     def __init__(self, db: Session):
         self.db = db
 
     def refresh(
-        self, connector: WarehouseConnector, since: datetime | None = None
+        self,
+        connector: WarehouseConnector,
+        since: datetime | None = None,
+        connection_id: int | None = None,
     ) -> int:
         """Extract query logs and upsert lineage edges. Returns edge count."""
         extractor = get_extractor(connector)
@@ -170,61 +815,381 @@ class LineageRefresher:
             logger.warning("No query log extractor for dialect: %s", connector.dialect)
             return 0
 
+        cursor = self._get_cursor(connection_id) if connection_id is not None else None
+        high_water, window_keys = _cursor_boundary(cursor)
         if since is None:
-            since = datetime.now(timezone.utc) - timedelta(hours=2)
+            if high_water is not None:
+                since = high_water - timedelta(minutes=settings.lineage_ingest_latency_minutes)
+            else:
+                since = datetime.now(timezone.utc) - timedelta(
+                    hours=settings.lineage_initial_lookback_hours
+                )
+        since = _clamp_backfill(_as_utc(since))
 
         try:
-            logs = extractor.extract(since)
+            logs, high_water, window_keys = self._extract_new(
+                extractor, since, high_water, window_keys
+            )
         except Exception:
             logger.exception("Failed to extract query logs")
             return 0
 
         edge_count = 0
         now = datetime.now(timezone.utc)
+        # (source, target) -> (max confidence, hash of the latest statement)
+        pending: dict[tuple[str, str], tuple[float, str]] = {}
 
-        for entry in logs:
-            sql = entry.get("sql", "")
-            if not sql:
-                continue
+        statements = [entry["sql"] for entry in logs if entry.get("sql")]
+        # Column edges from statements parsed in this refresh, so column
+        # lineage reuses their AST instead of parsing them a second time.
+        primed: dict[str, list[ColumnEdge]] = {}
+        parsed = parse_cache.get_many(
+            statements,
+            connector.dialect,
+            self.db if settings.parse_cache_persist else None,
+            parse=partial(_parse_tables, primed=primed)
+            if settings.column_lineage_enabled
+            else parse_statements,
+        )
 
-            parsed_edges = extract_lineage_edges(sql, connector.dialect)
+        for sql, parsed_edges in zip(statements, parsed):
+            query_hash = _query_hash(sql)
             for pe in parsed_edges:
-                self._upsert_edge(pe.source, pe.target, pe.confidence, sql, now)
+                seen = pending.get((pe.source, pe.target))
+                confidence = max(seen[0], pe.confidence) if seen else pe.confidence
+                pending[(pe.source, pe.target)] = (confidence, query_hash)
                 edge_count += 1
 
+        changed_sources = self._changed_sources(pending, now)
+        self._write_edges(pending, now)
+        if settings.column_lineage_enabled:
+            # Only statements that wrote a table can carry column lineage.
+            writes = [sql for sql, edges in zip(statements, parsed) if edges]
+            self._write_column_edges(
+                self._parse_columns(writes, connector.dialect, primed), now
+            )
+
+        if cursor is not None and logs:
+            cursor.last_executed_at = high_water
+            cursor.boundary_keys = json.dumps(
+                {key: at.isoformat() for key, at in sorted(window_keys.items())}
+            )
+
         self.db.commit()
+        lineage_index.rebuild(self.db)
+        if settings.lineage_reachability_enabled:
+            ReachabilityStore(self.db, lineage_index).sync(changed_sources)
+        diagnosis_cache.invalidate_tables(
+            table for edge in pending if edge[0] in changed_sources for table in edge
+        )
         logger.info("Refreshed %d lineage edges from %d query log entries", edge_count, len(logs))
         return edge_count
 
-    def _upsert_edge(
+    def backfill(
+        self, connector: WarehouseConnector, connection_id: int, since: datetime
+    ) -> int:
+        """Rewind the connection's cursor to ``since`` and re-read from there.
+
+        Edges are upserted, so replaying a window that was already parsed only
+        refreshes ``last_seen_at``; the window is still capped by
+        ``lineage_max_backfill_hours``.
+        """
+        cursor = self._get_cursor(connection_id)
+        cursor.last_executed_at = None
+        cursor.boundary_keys = "{}"
+        return self.refresh(connector, since=since, connection_id=connection_id)
+
+    def _get_cursor(self, connection_id: int) -> LineageCursorModel:
+        cursor = self.db.get(LineageCursorModel, connection_id)
+        if cursor is None:
+            cursor = LineageCursorModel(connection_id=connection_id, boundary_keys="{}")
+            self.db.add(cursor)
+        return cursor
+
+    def _extract_new(
         self,
-        source: str,
-        target: str,
-        confidence: float,
-        sql: str,
-        now: datetime,
+        extractor: Any,
+        since: datetime,
+        high_water: datetime | None,
+        seen: dict[str, datetime],
+    ) -> tuple[list[dict[str, Any]], datetime | None, dict[str, datetime]]:
+        """Page through the query log from ``since``, skipping entries already seen.
+
+        ``seen`` maps entry keys to their execution time. Returns the new
+        entries plus the advanced high-water mark and the keys still inside
+        the ingest-latency window behind it.
+        """
+        page_size = settings.lineage_extract_page_size
+        entries: list[dict[str, Any]] = []
+        page_since = since
+
+        for _ in range(settings.lineage_max_pages):
+            page = extractor.extract(page_since, limit=page_size)
+            newest: datetime | None = None
+
+            for entry in page:
+                executed_at = _as_utc(entry.get("executed_at"))
+                if executed_at is not None:
+                    newest = executed_at if newest is None else max(newest, executed_at)
+                    key = _entry_key(entry)
+                    if key in seen:
+                        continue
+                    seen[key] = executed_at
+                    high_water = executed_at if high_water is None else max(high_water, executed_at)
+                entries.append(entry)
+
+            if len(page) < page_size:
+                break
+            if newest is None or newest <= page_since:
+                # A full page sharing one timestamp; paging further would loop.
+                logger.warning(
+                    "Query log page of %d entries did not advance past %s", len(page), page_since
+                )
+                break
+            page_since = newest
+        else:
+            logger.warning(
+                "Stopped after %d query log pages; remaining entries follow on the next refresh",
+                settings.lineage_max_pages,
+            )
+
+        if high_water is not None:
+            floor = high_water - timedelta(minutes=settings.lineage_ingest_latency_minutes)
+            seen = {key: at for key, at in seen.items() if at >= floor}
+        return entries, high_water, seen
+
+    def _changed_sources(
+        self, pending: dict[tuple[str, str], tuple[float, str]], now: datetime
+    ) -> set[str]:
+        """Sources of edges that are new, stronger, or back from being stale.
+
+        Only these can grow a closure; shrinkage is caught by row expiry.
+        """
+        cutoff = now - timedelta(days=STALE_DAYS)
+        existing: dict[tuple[str, str], tuple[float, datetime | None]] = {}
+        sources = sorted({source for source, _target in pending})
+        batch_size = max(1, settings.lineage_upsert_batch_size)
+        for start in range(0, len(sources), batch_size):
+            stmt = select(
+                LineageEdgeModel.source_table,
+                LineageEdgeModel.target_table,
+                LineageEdgeModel.confidence,
+                LineageEdgeModel.last_seen_at,
+            ).where(LineageEdgeModel.source_table.in_(sources[start:start + batch_size]))
+            for source, target, confidence, last_seen_at in self.db.execute(stmt):
+                existing[(source, target)] = (confidence, _as_utc(last_seen_at))
+
+        changed: set[str] = set()
+        for key, (confidence, _hash) in pending.items():
+            old = existing.get(key)
+            if old is None or confidence > old[0] or old[1] is None or old[1] < cutoff:
+                changed.add(key[0])
+        return changed
+
+    def _write_edges(
+        self, pending: dict[tuple[str, str], tuple[float, str]], now: datetime
     ) -> None:
-        """Insert or update a lineage edge."""
-        query_hash = hashlib.sha256(sql.encode()).hexdigest()[:16]
+        """Upsert aggregated edges in set-based batches on ``uq_lineage_edge``."""
+        if not pending:
+            return
 
+        rows = [
+            {
+                "source_table": source,
+                "target_table": target,
+                "relationship_type": "direct",
+                "query_hash": query_hash,
+                "confidence": confidence,
+                "first_seen_at": now,
+                "last_seen_at": now,
+            }
+            for (source, target), (confidence, query_hash) in pending.items()
+        ]
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+            greatest = func.max
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+            greatest = func.greatest
+        else:
+            for row in rows:
+                self._upsert_edge(row)
+            return
+
+        batch_size = max(1, settings.lineage_upsert_batch_size)
+        for start in range(0, len(rows), batch_size):
+            stmt = upsert(LineageEdgeModel).values(rows[start:start + batch_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["source_table", "target_table"],
+                set_={
+                    "confidence": greatest(LineageEdgeModel.confidence, stmt.excluded.confidence),
+                    "query_hash": stmt.excluded.query_hash,
+                    "last_seen_at": stmt.excluded.last_seen_at,
+                },
+            )
+            self.db.execute(stmt)
+
+    def _parse_columns(
+        self, statements: list[str], dialect: str, primed: dict[str, list[ColumnEdge]]
+    ) -> dict[tuple[str, str, str, str], float]:
+        """Column edges keyed by (source table, column, target table, column)."""
+        pending: dict[tuple[str, str, str, str], float] = {}
+        parsed = column_parse_cache.get_many(
+            statements,
+            dialect,
+            self.db if settings.parse_cache_persist else None,
+            parse=partial(_parse_columns, primed=primed),
+        )
+        for column_edges in parsed:
+            for ce in column_edges:
+                key = (ce.source_table, ce.source_column, ce.target_table, ce.target_column)
+                pending[key] = max(pending.get(key, 0.0), ce.confidence)
+        return pending
+
+    def _write_column_edges(
+        self, pending: dict[tuple[str, str, str, str], float], now: datetime
+    ) -> None:
+        """Upsert column edges in batches on ``uq_column_lineage_edge``."""
+        if not pending:
+            return
+
+        rows = [
+            {
+                "source_table": source_table,
+                "source_column": source_column,
+                "target_table": target_table,
+                "target_column": target_column,
+                "confidence": confidence,
+                "first_seen_at": now,
+                "last_seen_at": now,
+            }
+            for (source_table, source_column, target_table, target_column), confidence
+            in pending.items()
+        ]
+
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+            greatest = func.max
+        elif dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+            greatest = func.greatest
+        else:
+            for row in rows:
+                self._upsert_column_edge(row)
+            return
+
+        batch_size = max(1, settings.lineage_upsert_batch_size)
+        for start in range(0, len(rows), batch_size):
+            stmt = upsert(ColumnLineageEdgeModel).values(rows[start:start + batch_size])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["source_table", "source_column", "target_table", "target_column"],
+                set_={
+                    "confidence": greatest(
+                        ColumnLineageEdgeModel.confidence, stmt.excluded.confidence
+                    ),
+                    "last_seen_at": stmt.excluded.last_seen_at,
+                },
+            )
+            self.db.execute(stmt)
+
+    def _upsert_column_edge(self, row: dict[str, Any]) -> None:
+        stmt = select(ColumnLineageEdgeModel).where(
+            ColumnLineageEdgeModel.source_table == row["source_table"],
+            ColumnLineageEdgeModel.source_column == row["source_column"],
+            ColumnLineageEdgeModel.target_table == row["target_table"],
+            ColumnLineageEdgeModel.target_column == row["target_column"],
+        )
+        existing = self.db.execute(stmt).scalar_one_or_none()
+        if existing:
+            existing.last_seen_at = row["last_seen_at"]
+            existing.confidence = max(existing.confidence, row["confidence"])
+        else:
+            self.db.add(ColumnLineageEdgeModel(**row))
+
+    def _upsert_edge(self, row: dict[str, Any]) -> None:
+        """Per-edge fallback for metadata databases without ON CONFLICT support."""
         stmt = select(LineageEdgeModel).where(
-            LineageEdgeModel.source_table == source,
-            LineageEdgeModel.target_table == target,
+            LineageEdgeModel.source_table == row["source_table"],
+            LineageEdgeModel.target_table == row["target_table"],
         )
         existing = self.db.execute(stmt).scalar_one_or_none()
 
         if existing:
-            existing.last_seen_at = now
-            existing.confidence = max(existing.confidence, confidence)
-            existing.query_hash = query_hash
+            existing.last_seen_at = row["last_seen_at"]
+            existing.confidence = max(existing.confidence, row["confidence"])
+            existing.query_hash = row["query_hash"]
         else:
-            edge = LineageEdgeModel(
-                source_table=source,
-                target_table=target,
-                relationship_type="direct",
-                query_hash=query_hash,
-                confidence=confidence,
-                first_seen_at=now,
-                last_seen_at=now,
-            )
-            self.db.add(edge)
+            self.db.add(LineageEdgeModel(**row))
+
+
+def _parse_tables(
+    statements: list[str], dialect: str, primed: dict[str, list[ColumnEdge]]
+) -> list[list[ParsedEdge]]:
+    """Table edges for a batch of cache misses, keeping their column edges in ``primed``."""
+    results = parse_statements(statements, dialect, parser=extract_tables_and_columns)
+    tables: list[list[ParsedEdge]] = []
+    for sql, (table_edges, column_edges) in zip(statements, results):
+        primed[sql] = column_edges
+        tables.append(table_edges)
+    return tables
+
+
+def _parse_columns(
+    statements: list[str], dialect: str, primed: dict[str, list[ColumnEdge]]
+) -> list[list[ColumnEdge]]:
+    """Column edges for a batch of cache misses, parsing only those not in ``primed``."""
+    unparsed = [sql for sql in statements if sql not in primed]
+    parsed = dict(zip(unparsed, parse_statements(unparsed, dialect, parser=extract_columns)))
+    return [primed[sql] if sql in primed else parsed[sql] for sql in statements]
+
+
+def _query_hash(sql: str) -> str:
+    return hashlib.sha256(sql.encode()).hexdigest()[:16]
+
+
+def _as_utc(value: Any) -> datetime | None:
+    """Normalise a timestamp to aware UTC; naive values are assumed UTC."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _entry_key(entry: dict[str, Any]) -> str:
+    """Stable identity for a query log entry."""
+    executed_at = _as_utc(entry.get("executed_at"))
+    raw = "|".join((
+        executed_at.isoformat() if executed_at else "",
+        str(entry.get("user") or ""),
+        entry.get("sql") or "",
+    ))
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _cursor_boundary(
+    cursor: LineageCursorModel | None,
+) -> tuple[datetime | None, dict[str, datetime]]:
+    """High-water mark and the ``{key: executed_at}`` entries seen in the overlap window."""
+    if cursor is None or cursor.last_executed_at is None:
+        return None, {}
+    high_water = _as_utc(cursor.last_executed_at)
+    stored = json.loads(cursor.boundary_keys or "{}")
+    if isinstance(stored, list):
+        # Cursors written before the overlap window hold bare keys at the mark.
+        return high_water, dict.fromkeys(stored, high_water)
+    return high_water, {key: _as_utc(datetime.fromisoformat(at)) for key, at in stored.items()}
+
+
+def _clamp_backfill(since: datetime) -> datetime:
+    earliest = datetime.now(timezone.utc) - timedelta(hours=settings.lineage_max_backfill_hours)
+    if since < earliest:
+        logger.warning(
+            "Lineage backfill from %s exceeds %dh limit; starting at %s",
+            since, settings.lineage_max_backfill_hours, earliest,
+        )
+        return earliest
+    return since
@@ -0,0 +1,204 @@
+"""Retention compaction for lineage edges and the persisted parse cache."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, func, insert, literal, select, text
+from sqlalchemy.orm import Session
+
+from aegis.config import settings
+from aegis.core.lineage import STALE_DAYS, lineage_index
+from aegis.core.models import (
+    ColumnLineageEdgeArchiveModel,
+    ColumnLineageEdgeModel,
+    LineageEdgeArchiveModel,
+    LineageEdgeModel,
+    ParsedQueryModel,
+)
+
+logger = logging.getLogger("aegis.lineage_compaction")
+
+BATCH_SIZE = 1000
+
+# Most recent report, surfaced by GET /status.
+last_report: dict[str, Any] | None = None
+
+_ARCHIVED_COLUMNS = (
+    "id",
+    "source_table",
+    "target_table",
+    "relationship_type",
+    "query_hash",
+    "confidence",
+    "first_seen_at",
+    "last_seen_at",
+)
+
+_ARCHIVED_COLUMN_EDGE_COLUMNS = (
+    "id",
+    "source_table",
+    "source_column",
+    "target_table",
+    "target_column",
+    "confidence",
+    "first_seen_at",
+    "last_seen_at",
+)
+
+
+def compact_lineage(db: Session, now: datetime | None = None) -> dict[str, Any]:
+    """Archive or delete edges unseen for ``lineage_retention_days``.
+
+    Traversals already ignore edges older than ``STALE_DAYS``; this removes
+    them from the table and its indexes so scans stop paying for dead rows.
+    Column edges are compacted with the same cutoff and mode, and the
+    ``parsed_queries`` parse cache is pruned to its own retention and row
+    cap. Returns rows removed plus SQLite page counts before and after.
+    """
+    global last_report
+
+    now = now or datetime.now(timezone.utc)
+    retention_days = max(settings.lineage_retention_days, STALE_DAYS)
+    cutoff = now - timedelta(days=retention_days)
+    archive = settings.lineage_compaction_mode == "archive"
+    pages_before = _page_stats(db)
+
+    removed = _compact(
+        db, LineageEdgeModel, LineageEdgeArchiveModel, _ARCHIVED_COLUMNS, cutoff, now, archive
+    )
+    column_removed = _compact(
+        db,
+        ColumnLineageEdgeModel,
+        ColumnLineageEdgeArchiveModel,
+        _ARCHIVED_COLUMN_EDGE_COLUMNS,
+        cutoff,
+        now,
+        archive,
+    )
+    parses_removed = _prune_parsed_queries(db, now)
+
+    if removed or column_removed or parses_removed:
+        _reclaim(db)
+    if removed:
+        lineage_index.rebuild(db)
+    pages_after = _page_stats(db)
+
+    report = {
+        "ran_at": now.isoformat(),
+        "cutoff": cutoff.isoformat(),
+        "mode": "archive" if archive else "delete",
+        "rows_removed": removed,
+        "column_rows_removed": column_removed,
+        "parsed_queries_removed": parses_removed,
+        "pages_before": pages_before,
+        "pages_after": pages_after,
+        "pages_reclaimed": _pages_reclaimed(pages_before, pages_after),
+    }
+    last_report = report
+    logger.info(
+        "Lineage compaction removed %d edges and %d column edges older than %s (%s) "
+        "and %d cached parses, %s pages reclaimed",
+        removed, column_removed, cutoff.date(), report["mode"], parses_removed,
+        report["pages_reclaimed"],
+    )
+    return report
+
+
+def _compact(
+    db: Session,
+    model: Any,
+    archive_model: Any,
+    columns: tuple[str, ...],
+    cutoff: datetime,
+    now: datetime,
+    archive: bool,
+) -> int:
+    """Move rows of ``model`` last seen before ``cutoff`` out in batches."""
+    removed = 0
+    while True:
+        ids = db.execute(
+            select(model.id)
+            .where(model.last_seen_at < cutoff)
+            .order_by(model.id)
+            .limit(BATCH_SIZE)
+        ).scalars().all()
+        if not ids:
+            return removed
+
+        if archive:
+            db.execute(
+                insert(archive_model).from_select(
+                    [*columns, "archived_at"],
+                    select(
+                        *(getattr(model, name) for name in columns),
+                        literal(now, archive_model.archived_at.type),
+                    ).where(model.id.in_(ids)),
+                )
+            )
+        db.execute(delete(model).where(model.id.in_(ids)))
+        db.commit()
+        removed += len(ids)
+
+
+def _prune_parsed_queries(db: Session, now: datetime) -> int:
+    """Drop persisted parses past ``parse_cache_retention_days`` or the row cap.
+
+    A statement that is still being run is simply parsed and stored again.
+    """
+    cutoff = now - timedelta(days=settings.parse_cache_retention_days)
+    removed = 0
+    while True:
+        keys = db.execute(
+            select(ParsedQueryModel.query_key)
+            .where(ParsedQueryModel.created_at < cutoff)
+            .limit(BATCH_SIZE)
+        ).scalars().all()
+        if not keys:
+            break
+        db.execute(delete(ParsedQueryModel).where(ParsedQueryModel.query_key.in_(keys)))
+        db.commit()
+        removed += len(keys)
+
+    excess = db.execute(select(func.count()).select_from(ParsedQueryModel)).scalar_one()
+    excess -= max(0, settings.parse_cache_max_rows)
+    while excess > 0:
+        keys = db.execute(
+            select(ParsedQueryModel.query_key)
+            .order_by(ParsedQueryModel.created_at, ParsedQueryModel.query_key)
+            .limit(min(excess, BATCH_SIZE))
+        ).scalars().all()
+        db.execute(delete(ParsedQueryModel).where(ParsedQueryModel.query_key.in_(keys)))
+        db.commit()
+        removed += len(keys)
+        excess -= len(keys)
+    return removed
+
+
+def _page_stats(db: Session) -> dict[str, int] | None:
+    if db.get_bind().dialect.name != "sqlite":
+        return None
+    return {
+        "page_count": db.execute(text("PRAGMA page_count")).scalar_one(),
+        "freelist_count": db.execute(text("PRAGMA freelist_count")).scalar_one(),
+    }
+
+
+def _reclaim(db: Session) -> None:
+    """Return freed pages to the OS when the database allows incremental vacuum."""
+    if db.get_bind().dialect.name != "sqlite":
+        return
+    if db.execute(text("PRAGMA auto_vacuum")).scalar_one() == 2:
+        db.execute(text("PRAGMA incremental_vacuum"))
+        db.commit()
+
+
+def _pages_reclaimed(before: dict[str, int] | None, after: dict[str, int] | None) -> int | None:
+    """Pages freed for reuse (freelist growth) plus pages returned to the OS."""
+    if before is None or after is None:
+        return None
+    returned = before["page_count"] - after["page_count"]
+    freed = after["freelist_count"] - before["freelist_count"]
+    return max(0, returned) + max(0, freed)
@@ -0,0 +1,243 @@
+"""Vectorized lineage backend — CSR/CSC arrays over interned table ids.
+
+Requires the optional ``numpy`` dependency (``pip install aegis[analytics]``).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from aegis.core.models import LineageEdgeModel
+
+
+class _Adjacency:
+    """One direction of the graph: ``indptr``/``neighbor`` plus per-edge columns."""
+
+    def __init__(self, owner: np.ndarray, neighbor: np.ndarray, order: np.ndarray, n: int):
+        # Stable sort keeps each row's edges in lineage_edges id order, which
+        # is what the dict-based BFS iterates in.
+        perm = np.argsort(owner, kind="stable")
+        self.neighbor = neighbor[perm]
+        self.edge = order[perm]
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owner, minlength=n), out=self.indptr[1:])
+
+    def expand(self, nodes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Edge slots leaving ``nodes``, in frontier order, and their source node."""
+        starts = self.indptr[nodes]
+        counts = self.indptr[nodes + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        slots = np.arange(total, dtype=np.int64) - offsets + np.repeat(starts, counts)
+        return slots, np.repeat(nodes, counts)
+
+
+class CSRLineage:
+    """Immutable lineage snapshot stored as NumPy arrays.
+
+    Table names are interned to integer ids; edges live in a CSR (forward) and
+    a CSC (reverse) layout with confidence and ``last_seen_at`` columns.
+    Traversals expand a whole frontier per step with array operations and
+    return the same dicts as ``LineageGraph``.
+    """
+
+    def __init__(
+        self,
+        names: list[str],
+        source: np.ndarray,
+        target: np.ndarray,
+        confidence: np.ndarray,
+        last_seen: np.ndarray,
+    ):
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.confidence = confidence
+        self.last_seen = last_seen  # epoch seconds; +inf when unknown
+        order = np.arange(len(source), dtype=np.int64)
+        self._forward = _Adjacency(source, target, order, len(names))
+        self._reverse = _Adjacency(target, source, order, len(names))
+
+    @classmethod
+    def from_db(cls, db: Session) -> CSRLineage:
+        """Load every edge in one query, interning names as they appear."""
+        stmt = select(
+            LineageEdgeModel.source_table,
+            LineageEdgeModel.target_table,
+            LineageEdgeModel.confidence,
+            LineageEdgeModel.last_seen_at,
+        ).order_by(LineageEdgeModel.id)
+
+        ids: dict[str, int] = {}
+        source: list[int] = []
+        target: list[int] = []
+        confidence: list[float] = []
+        last_seen: list[float] = []
+        for src, dst, conf, seen in db.execute(stmt):
+            source.append(ids.setdefault(src, len(ids)))
+            target.append(ids.setdefault(dst, len(ids)))
+            confidence.append(conf)
+            last_seen.append(_epoch(seen))
+
+        return cls(
+            list(ids),
+            np.asarray(source, dtype=np.int64),
+            np.asarray(target, dtype=np.int64),
+            np.asarray(confidence, dtype=np.float64),
+            np.asarray(last_seen, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_snapshot(cls, snapshot: Any) -> CSRLineage:
+        """Build from a memory-mapped ``LineageSnapshot`` without per-edge Python work.
+
+        Relationship strings share the snapshot's string table, so ids are
+        remapped to the dense table-name space.
+        """
+        cols = snapshot.columns
+        source = np.frombuffer(cols["source"], dtype="<u4").astype(np.int64)
+        target = np.frombuffer(cols["target"], dtype="<u4").astype(np.int64)
+        used, dense = np.unique(np.concatenate([source, target]), return_inverse=True)
+        names = [snapshot.string(int(i)) for i in used]
+        return cls(
+            names,
+            dense[: len(source)],
+            dense[len(source):],
+            np.frombuffer(cols["confidence"], dtype="<f4").astype(np.float64).round(6),
+            np.frombuffer(cols["last_seen"], dtype="<i8").astype(np.float64) / 1e6,
+        )
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.confidence)
+
+    def bfs(
+        self, start: str, depth: int, direction: str, cutoff: datetime
+    ) -> list[dict[str, Any]]:
+        """Frontier-at-a-time BFS; each table reported once, in discovery order."""
+        origin = self.ids.get(start)
+        if origin is None:
+            return []
+        adjacency = self._forward if direction == "downstream" else self._reverse
+        live = self.last_seen >= _epoch(cutoff)
+
+        visited = np.zeros(len(self.names), dtype=bool)
+        visited[origin] = True
+        frontier = np.array([origin], dtype=np.int64)
+        results: list[dict[str, Any]] = []
+
+        for level in range(1, depth + 1):
+            slots, _parents = adjacency.expand(frontier)
+            slots = slots[live[adjacency.edge[slots]]]
+            neighbors = adjacency.neighbor[slots]
+            fresh = ~visited[neighbors]
+            slots, neighbors = slots[fresh], neighbors[fresh]
+            if not len(neighbors):
+                break
+            # Discovery order, with the best confidence among this level's
+            # edges into each table, matching the dict BFS.
+            unique, first, inverse = np.unique(
+                neighbors, return_index=True, return_inverse=True
+            )
+            best = np.full(len(unique), -np.inf)
+            np.maximum.at(best, inverse, self.confidence[adjacency.edge[slots]])
+            order = np.argsort(first)
+            frontier = unique[order]
+            visited[frontier] = True
+            confidences = best[order]
+            results.extend(
+                {"table": self.names[node], "depth": level, "confidence": float(conf)}
+                for node, conf in zip(frontier.tolist(), confidences.tolist())
+            )
+
+        return results
+
+    def path(self, source: str, target: str, cutoff: datetime) -> list[str] | None:
+        """Shortest downstream path via parent pointers."""
+        origin, goal = self.ids.get(source), self.ids.get(target)
+        if origin is None or goal is None:
+            return None
+        live = self.last_seen >= _epoch(cutoff)
+
+        parent = np.full(len(self.names), -1, dtype=np.int64)
+        parent[origin] = origin
+        frontier = np.array([origin], dtype=np.int64)
+        while len(frontier):
+            slots, parents = self._forward.expand(frontier)
+            keep = live[self._forward.edge[slots]]
+            neighbors, parents = self._forward.neighbor[slots][keep], parents[keep]
+            if goal in neighbors:
+                hops = [goal, int(parents[np.flatnonzero(neighbors == goal)[0]])]
+                while hops[-1] != origin:
+                    hops.append(int(parent[hops[-1]]))
+                return [self.names[node] for node in reversed(hops)]
+            fresh = parent[neighbors] < 0
+            neighbors, parents = neighbors[fresh], parents[fresh]
+            _, first = np.unique(neighbors, return_index=True)
+            first.sort()
+            frontier = neighbors[first]
+            parent[frontier] = parents[first]
+        return None
+
+    def reach_counts(self, cutoff: datetime, depth: int) -> dict[str, int]:
+        """Number of downstream tables within ``depth`` hops, per table with edges."""
+        live = self.last_seen >= _epoch(cutoff)
+        counts: dict[str, int] = {}
+        has_out = np.flatnonzero(np.diff(self._forward.indptr) > 0)
+        for origin in has_out.tolist():
+            visited = np.zeros(len(self.names), dtype=bool)
+            visited[origin] = True
+            frontier = np.array([origin], dtype=np.int64)
+            for _ in range(depth):
+                slots, _parents = self._forward.expand(frontier)
+                neighbors = self._forward.neighbor[slots[live[self._forward.edge[slots]]]]
+                frontier = np.unique(neighbors[~visited[neighbors]])
+                if not len(frontier):
+                    break
+                visited[frontier] = True
+            counts[self.names[origin]] = int(visited.sum()) - 1
+        return counts
+
+    def propagate(
+        self, start: str, cutoff: datetime, depth: int, direction: str = "downstream"
+    ) -> dict[str, float]:
+        """Best path confidence (product of edge confidences) to every reachable table."""
+        origin = self.ids.get(start)
+        if origin is None:
+            return {}
+        adjacency = self._forward if direction == "downstream" else self._reverse
+        live = self.last_seen >= _epoch(cutoff)
+
+        score = np.zeros(len(self.names), dtype=np.float64)
+        score[origin] = 1.0
+        frontier = np.array([origin], dtype=np.int64)
+        for _ in range(depth):
+            slots, parents = adjacency.expand(frontier)
+            keep = live[adjacency.edge[slots]]
+            slots, parents = slots[keep], parents[keep]
+            neighbors = adjacency.neighbor[slots]
+            candidate = score[parents] * self.confidence[adjacency.edge[slots]]
+            before = score.copy()
+            np.maximum.at(score, neighbors, candidate)
+            frontier = np.flatnonzero(score > before)
+            if not len(frontier):
+                break
+
+        score[origin] = 0.0
+        reached = np.flatnonzero(score > 0)
+        return {self.names[node]: float(score[node]) for node in reached.tolist()}
+
+
+def _epoch(value: datetime | None) -> float:
+    if value is None:
+        return float("inf")
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
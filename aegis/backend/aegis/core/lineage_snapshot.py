@@ -0,0 +1,310 @@
+"""Binary export/import of the lineage graph.
+
+Snapshot layout (little-endian, every section 8-byte aligned)::
+
+    header    magic "AEGL", u16 version, u16 reserved, u32 string_count,
+              u64 edge_count, u64 string_bytes
+    strings   u64 offsets[string_count + 1], then UTF-8 bytes
+    edges     u32 source[n], u32 target[n], u32 relationship[n],
+              f32 confidence[n], u64 query_hash[n],
+              i64 first_seen[n], i64 last_seen[n]
+
+Table names and relationship types share the interned string table; edge
+columns index into it. Timestamps are UTC epoch microseconds and a zero
+query hash means none. ``LineageSnapshot`` memory-maps a file and exposes the
+columns as zero-copy ``memoryview`` slices.
+
+Usage::
+
+    python -m aegis.core.lineage_snapshot export lineage.aegl
+    python -m aegis.core.lineage_snapshot import lineage.aegl [--replace]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from aegis.core.diagnosis_cache import diagnosis_cache
+from aegis.core.lineage import ReachabilityStore, lineage_index
+from aegis.core.models import LineageEdgeModel
+
+logger = logging.getLogger("aegis.lineage_snapshot")
+
+MAGIC = b"AEGL"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHIQQ")
+# (name, array typecode, memoryview format)
+_COLUMNS = (
+    ("source", "I", "I"),
+    ("target", "I", "I"),
+    ("relationship", "I", "I"),
+    ("confidence", "f", "f"),
+    ("query_hash", "Q", "Q"),
+    ("first_seen", "q", "q"),
+    ("last_seen", "q", "q"),
+)
+IMPORT_BATCH_SIZE = 2000  # rows per upsert; stays under SQLite's bound-parameter limit
+_UPSERT_DIALECTS = ("sqlite", "postgresql")
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class SnapshotError(ValueError):
+    """The file is not a readable lineage snapshot."""
+
+
+def export_snapshot(db: Session, path: str | Path) -> dict[str, Any]:
+    """Write every lineage edge to ``path``. Returns node/edge counts and size."""
+    strings: dict[str, int] = {}
+    columns = {name: array(code) for name, code, _fmt in _COLUMNS}
+
+    stmt = select(
+        LineageEdgeModel.source_table,
+        LineageEdgeModel.target_table,
+        LineageEdgeModel.relationship_type,
+        LineageEdgeModel.confidence,
+        LineageEdgeModel.query_hash,
+        LineageEdgeModel.first_seen_at,
+        LineageEdgeModel.last_seen_at,
+    ).order_by(LineageEdgeModel.id)
+
+    for source, target, relationship, confidence, query_hash, first, last in db.execute(
+        stmt.execution_options(yield_per=10000)
+    ):
+        columns["source"].append(strings.setdefault(source, len(strings)))
+        columns["target"].append(strings.setdefault(target, len(strings)))
+        columns["relationship"].append(strings.setdefault(relationship, len(strings)))
+        columns["confidence"].append(confidence)
+        columns["query_hash"].append(int(query_hash, 16) if query_hash else 0)
+        columns["first_seen"].append(_epoch(first))
+        columns["last_seen"].append(_epoch(last))
+
+    encoded = [name.encode() for name in strings]
+    offsets = array("Q", [0])
+    for blob in encoded:
+        offsets.append(offsets[-1] + len(blob))
+    edge_count = len(columns["source"])
+
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as out:
+        _write_section(out, _HEADER.pack(MAGIC, VERSION, 0, len(encoded), edge_count, offsets[-1]))
+        _write_section(out, _le(offsets).tobytes())
+        _write_section(out, b"".join(encoded))
+        for name, _code, _fmt in _COLUMNS:
+            _write_section(out, _le(columns[name]).tobytes())
+    os.replace(tmp, path)
+
+    stats = {"nodes": len(encoded), "edges": edge_count, "bytes": path.stat().st_size}
+    logger.info("Exported lineage snapshot %s: %s", path, stats)
+    return stats
+
+
+class LineageSnapshot:
+    """Read-only, memory-mapped view of a snapshot file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self) -> None:
+        view = self._view = memoryview(self._mmap)
+        if len(view) < _HEADER.size:
+            raise SnapshotError(f"{self.path} is too short to be a lineage snapshot")
+        magic, version, _reserved, string_count, edge_count, string_bytes = (
+            _HEADER.unpack_from(view)
+        )
+        if magic != MAGIC:
+            raise SnapshotError(f"{self.path} is not a lineage snapshot")
+        if version != VERSION:
+            raise SnapshotError(f"Unsupported lineage snapshot version {version}")
+
+        self.string_count = string_count
+        self.edge_count = edge_count
+        offset = _align(_HEADER.size)
+        self._offsets, offset = _column(view, offset, "Q", string_count + 1)
+        self._blob = view[offset:offset + string_bytes]
+        offset = _align(offset + string_bytes)
+        self.columns: dict[str, memoryview] = {}
+        for name, _code, fmt in _COLUMNS:
+            self.columns[name], offset = _column(view, offset, fmt, edge_count)
+        if offset > len(view):
+            raise SnapshotError(f"{self.path} is truncated")
+
+    def string(self, index: int) -> str:
+        return bytes(self._blob[self._offsets[index]:self._offsets[index + 1]]).decode()
+
+    def strings(self) -> list[str]:
+        return [self.string(i) for i in range(self.string_count)]
+
+    def iter_edges(self) -> Iterator[dict[str, Any]]:
+        """Edges as ``lineage_edges`` row dicts."""
+        names = self.strings()
+        cols = self.columns
+        for i in range(self.edge_count):
+            query_hash = cols["query_hash"][i]
+            yield {
+                "source_table": names[cols["source"][i]],
+                "target_table": names[cols["target"][i]],
+                "relationship_type": names[cols["relationship"][i]],
+                "confidence": round(cols["confidence"][i], 6),
+                "query_hash": f"{query_hash:016x}" if query_hash else None,
+                "first_seen_at": _from_epoch(cols["first_seen"][i]),
+                "last_seen_at": _from_epoch(cols["last_seen"][i]),
+            }
+
+    def close(self) -> None:
+        # Views must be released before the map can close.
+        for view in getattr(self, "columns", {}).values():
+            view.release()
+        for attr in ("_offsets", "_blob", "_view"):
+            if hasattr(self, attr):
+                getattr(self, attr).release()
+        self._mmap.close()
+
+    def __enter__(self) -> LineageSnapshot:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def import_snapshot(db: Session, path: str | Path, replace: bool = False) -> dict[str, Any]:
+    """Load a snapshot into ``lineage_edges``.
+
+    By default edges are merged: existing rows keep the higher confidence, the
+    earlier ``first_seen_at`` and the later ``last_seen_at``. ``replace``
+    clears the table first. The in-memory index and reachability table are
+    rebuilt afterwards.
+    """
+    from aegis.config import settings
+
+    dialect = db.get_bind().dialect.name
+    if dialect not in _UPSERT_DIALECTS:
+        raise ValueError(
+            f"Snapshot import is not supported on {dialect}; "
+            f"supported dialects: {', '.join(_UPSERT_DIALECTS)}"
+        )
+
+    if replace:
+        db.execute(delete(LineageEdgeModel))
+
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+        greatest, least = func.max, func.min
+    else:
+        from sqlalchemy.dialects.postgresql import insert as upsert
+        greatest, least = func.greatest, func.least
+
+    def flush(rows: list[dict[str, Any]]) -> None:
+        stmt = upsert(LineageEdgeModel).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["source_table", "target_table"],
+            set_={
+                "confidence": greatest(LineageEdgeModel.confidence, stmt.excluded.confidence),
+                "first_seen_at": least(LineageEdgeModel.first_seen_at, stmt.excluded.first_seen_at),
+                "last_seen_at": greatest(LineageEdgeModel.last_seen_at, stmt.excluded.last_seen_at),
+                "query_hash": stmt.excluded.query_hash,
+            },
+        )
+        db.execute(stmt)
+
+    with LineageSnapshot(path) as snapshot:
+        batch: list[dict[str, Any]] = []
+        for row in snapshot.iter_edges():
+            batch.append(row)
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        stats = {"nodes": snapshot.string_count, "edges": snapshot.edge_count, "replaced": replace}
+    db.commit()
+
+    lineage_index.rebuild(db)
+    if settings.lineage_reachability_enabled:
+        ReachabilityStore(db, lineage_index).rebuild()
+    diagnosis_cache.clear()
+    logger.info("Imported lineage snapshot %s: %s", path, stats)
+    return stats
+
+
+def _le(values: array) -> array:
+    """Little-endian copy of ``values`` (a no-op on little-endian hosts)."""
+    if sys.byteorder == "little":
+        return values
+    swapped = array(values.typecode, values)
+    swapped.byteswap()
+    return swapped
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _write_section(out: Any, data: bytes) -> None:
+    out.write(data)
+    out.write(b"\0" * (_align(out.tell()) - out.tell()))
+
+
+def _column(view: memoryview, offset: int, fmt: str, count: int) -> tuple[memoryview, int]:
+    size = struct.calcsize(fmt) * count
+    if offset + size > len(view):
+        raise SnapshotError("Lineage snapshot is truncated")
+    if sys.byteorder != "little":
+        raise SnapshotError("Memory-mapped snapshots require a little-endian host")
+    return view[offset:offset + size].cast(fmt), _align(offset + size)
+
+
+def _epoch(value: datetime | None) -> int:
+    """Epoch microseconds, computed exactly rather than through a float."""
+    if value is None:
+        return 0
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_epoch(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=micros)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Export or import an Aegis lineage snapshot.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path")
+    parser.add_argument("--replace", action="store_true", help="import: clear existing edges first")
+    args = parser.parse_args(argv)
+
+    from aegis.core.database import SyncSessionLocal
+
+    with SyncSessionLocal() as db:
+        if args.command == "export":
+            stats = export_snapshot(db, args.path)
+        else:
+            stats = import_snapshot(db, args.path, replace=args.replace)
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
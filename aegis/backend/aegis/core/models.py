@@ -65,6 +65,8 @@ class MonitoredTableModel(Base):
         Text, default='["schema", "freshness"]', nullable=False
     )
     freshness_sla_minutes: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    timestamp_column: Mapped[str | None] = mapped_column(String, nullable=True)
+    freshness_strategy: Mapped[str] = mapped_column(String, default="column", nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), nullable=False
     )
@@ -104,6 +106,7 @@ class AnomalyModel(Base):
     __tablename__ = "anomalies"
     __table_args__ = (
         Index("idx_anomalies_table_type", "table_id", "type", "detected_at"),
+        Index("idx_anomalies_correlated_incident", "correlated_incident_id"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
@@ -116,9 +119,18 @@ class AnomalyModel(Base):
     detected_at: Mapped[datetime] = mapped_column(
         DateTime, server_default=func.now(), nullable=False
     )
+    # Set when the anomaly was attached to an upstream table's open incident
+    # instead of opening its own.
+    correlated_incident_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("incidents.id", ondelete="SET NULL", use_alter=True),
+        nullable=True,
+    )
 
     table: Mapped[MonitoredTableModel] = relationship(back_populates="anomalies")
-    incident: Mapped[IncidentModel | None] = relationship(back_populates="anomaly")
+    incident: Mapped[IncidentModel | None] = relationship(
+        back_populates="anomaly", foreign_keys="IncidentModel.anomaly_id"
+    )
 
 
 class IncidentModel(Base):
@@ -147,14 +159,23 @@ class IncidentModel(Base):
         DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
-    anomaly: Mapped[AnomalyModel] = relationship(back_populates="incident")
+    anomaly: Mapped[AnomalyModel] = relationship(
+        back_populates="incident", foreign_keys=[anomaly_id]
+    )
 
 
 class LineageEdgeModel(Base):
     __tablename__ = "lineage_edges"
     __table_args__ = (
-        Index("idx_lineage_source", "source_table"),
-        Index("idx_lineage_target", "target_table"),
+        # Covering indexes: one-hop traversals filter on an endpoint plus
+        # last_seen_at and read only the other endpoint and confidence.
+        Index(
+            "idx_lineage_source_live", "source_table", "last_seen_at", "target_table", "confidence"
+        ),
+        Index(
+            "idx_lineage_target_live", "target_table", "last_seen_at", "source_table", "confidence"
+        ),
+        Index("idx_lineage_last_seen", "last_seen_at"),
         Index("uq_lineage_edge", "source_table", "target_table", unique=True),
     )
 
@@ -172,6 +193,133 @@ class LineageEdgeModel(Base):
     )
 
 
+class IncidentJobModel(Base):
+    """Diagnosis, remediation and report work for a new incident, run off the scan loop."""
+    __tablename__ = "incident_jobs"
+    __table_args__ = (Index("idx_incident_jobs_claim", "status", "available_at"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    incident_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("incidents.id", ondelete="CASCADE"), nullable=False
+    )
+    anomaly_id: Mapped[int] = mapped_column(Integer, ForeignKey("anomalies.id"), nullable=False)
+    status: Mapped[str] = mapped_column(String, default="pending", nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    available_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    locked_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class ColumnLineageEdgeModel(Base):
+    """Column-to-column lineage; table names match lineage_edges."""
+    __tablename__ = "column_lineage_edges"
+    __table_args__ = (
+        Index(
+            "idx_column_lineage_source_live",
+            "source_table", "source_column", "last_seen_at", "target_table", "target_column",
+        ),
+        Index(
+            "uq_column_lineage_edge",
+            "source_table", "source_column", "target_table", "target_column",
+            unique=True,
+        ),
+        Index("idx_column_lineage_last_seen", "last_seen_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    source_table: Mapped[str] = mapped_column(String, nullable=False)
+    source_column: Mapped[str] = mapped_column(String, nullable=False)
+    target_table: Mapped[str] = mapped_column(String, nullable=False)
+    target_column: Mapped[str] = mapped_column(String, nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, default=1.0, nullable=False)
+    first_seen_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False
+    )
+    last_seen_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False
+    )
+
+
+class LineageEdgeArchiveModel(Base):
+    """Lineage edges removed from lineage_edges by retention compaction."""
+    __tablename__ = "lineage_edges_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)  # original lineage_edges id
+    source_table: Mapped[str] = mapped_column(String, nullable=False)
+    target_table: Mapped[str] = mapped_column(String, nullable=False)
+    relationship_type: Mapped[str] = mapped_column(String, nullable=False)
+    query_hash: Mapped[str | None] = mapped_column(String, nullable=True)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class ColumnLineageEdgeArchiveModel(Base):
+    """Column edges removed from column_lineage_edges by retention compaction."""
+    __tablename__ = "column_lineage_edges_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)  # original column edge id
+    source_table: Mapped[str] = mapped_column(String, nullable=False)
+    source_column: Mapped[str] = mapped_column(String, nullable=False)
+    target_table: Mapped[str] = mapped_column(String, nullable=False)
+    target_column: Mapped[str] = mapped_column(String, nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    first_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_seen_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class LineageReachabilityModel(Base):
+    """Materialized downstream closure of lineage_edges, one row per reachable pair."""
+    __tablename__ = "lineage_reachability"
+    __table_args__ = (Index("idx_reachability_source_depth", "source_table", "depth"),)
+
+    source_table: Mapped[str] = mapped_column(String, primary_key=True)
+    target_table: Mapped[str] = mapped_column(String, primary_key=True)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    # When the oldest edge on the recorded path crosses the stale cutoff.
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+
+class LineageCursorModel(Base):
+    """High-water mark of query-log entries already parsed for a connection."""
+    __tablename__ = "lineage_cursors"
+
+    connection_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("connections.id", ondelete="CASCADE"), primary_key=True
+    )
+    last_executed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # JSON {entry key: executed_at} for entries already processed within the
+    # ingest-latency window behind last_executed_at, so re-reading that
+    # window never re-parses them.
+    boundary_keys: Mapped[str] = mapped_column(Text, default="{}", nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class ParsedQueryModel(Base):
+    """Persistent tier of the lineage parse cache (see ``aegis.core.parse_cache``)."""
+    __tablename__ = "parsed_queries"
+    __table_args__ = (Index("idx_parsed_queries_created_at", "created_at"),)
+
+    query_key: Mapped[str] = mapped_column(String, primary_key=True)
+    dialect: Mapped[str] = mapped_column(String, nullable=False)
+    # JSON [[src, tgt, conf]]
+    edges: Mapped[str] = mapped_column(Text, default="[]", nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now(), nullable=False
+    )
+
+
 # ---------------------------------------------------------------------------
 # Pydantic Schemas (API request/response)
 # ---------------------------------------------------------------------------
@@ -207,11 +355,15 @@ class TableCreate(BaseModel):
     table_name: str
     check_types: list[str] = Field(default=["schema", "freshness"])
     freshness_sla_minutes: int | None = None
+    timestamp_column: str | None = None
+    freshness_strategy: str = "column"
 
 
 class TableUpdate(BaseModel):
     check_types: list[str] | None = None
     freshness_sla_minutes: int | None = None
+    timestamp_column: str | None = None
+    freshness_strategy: str | None = None
 
 
 class TableResponse(BaseModel):
@@ -222,6 +374,8 @@ class TableResponse(BaseModel):
     fully_qualified_name: str
     check_types: list[str]
     freshness_sla_minutes: int | None
+    timestamp_column: str | None = None
+    freshness_strategy: str = "column"
     created_at: datetime
     updated_at: datetime
 
@@ -237,6 +391,8 @@ class TableResponse(BaseModel):
             fully_qualified_name=obj.fully_qualified_name,
             check_types=json.loads(obj.check_types),
             freshness_sla_minutes=obj.freshness_sla_minutes,
+            timestamp_column=obj.timestamp_column,
+            freshness_strategy=obj.freshness_strategy,
             created_at=obj.created_at,
             updated_at=obj.updated_at,
         )
@@ -247,8 +403,9 @@ class AnomalyResponse(BaseModel):
     table_id: int
     type: str
     severity: str
-    detail: dict[str, Any]
+    detail: dict[str, Any] | list[Any]  # schema drift records a list of changes
     detected_at: datetime
+    correlated_incident_id: int | None = None
 
     model_config = {"from_attributes": True}
 
@@ -261,6 +418,7 @@ class AnomalyResponse(BaseModel):
             severity=obj.severity,
             detail=json.loads(obj.detail),
             detected_at=obj.detected_at,
+            correlated_incident_id=obj.correlated_incident_id,
         )
 
 
@@ -322,6 +480,7 @@ class Diagnosis(BaseModel):
     severity: str
     confidence: float
     recommendations: list[Recommendation]
+    cached: bool = False  # reused from an earlier diagnosis with the same fingerprint
 
 
 class Remediation(BaseModel):
@@ -361,6 +520,7 @@ class TableProposal(BaseModel):
     suggested_sla_minutes: int | None
     reasoning: str
     skip: bool
+    timestamp_column: str | None = None
 
 
 class TableDelta(BaseModel):
@@ -389,6 +549,7 @@ class TableSelectionItem(BaseModel):
     table_name: str
     check_types: list[str] = Field(default=["schema", "freshness"])
     freshness_sla_minutes: int | None = None
+    timestamp_column: str | None = None
 
 
 class DiscoveryConfirm(BaseModel):
@@ -412,6 +573,7 @@ class RootCauseDetail(BaseModel):
     explanation: str
     source_table: str
     confidence: float
+    cached: bool = False
 
 
 class BlastRadiusDetail(BaseModel):
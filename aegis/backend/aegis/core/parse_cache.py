@@ -0,0 +1,241 @@
+"""Cache of parsed lineage edges keyed by normalized query text."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import astuple
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from aegis.core.models import ParsedQueryModel
+from aegis.utils.sql_parser import (
+    ColumnEdge,
+    ParsedEdge,
+    extract_column_edges,
+    extract_edges,
+    extract_lineage_edges,
+    may_have_lineage,
+    sqlglot_dialect,
+)
+
+logger = logging.getLogger("aegis.parse_cache")
+
+# Comments ahead of the statement (e.g. dbt/Airflow query tags carrying run ids).
+_LEADING_COMMENTS = re.compile(r"^(?:\s*(?:/\*.*?\*/|--[^\n]*(?:\n|$)))+", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql: str) -> str:
+    """Canonical form used for cache keys: no leading comments, single spaces."""
+    sql = _LEADING_COMMENTS.sub("", sql)
+    return _WHITESPACE.sub(" ", sql).strip().rstrip(";").rstrip()
+
+
+def query_key(sql: str, dialect: str, namespace: str = "") -> str:
+    raw = f"{namespace}{sqlglot_dialect(dialect)}|{normalize_sql(sql)}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ParseCache:
+    """Bounded LRU of per-statement parse results (``extract_lineage_edges`` by default).
+
+    Scheduled ETL re-issues the same statements every run, so the refresher
+    looks parses up here first. When a session is passed to ``get_edges`` the
+    ``parsed_queries`` table acts as a second, persistent tier that survives
+    restarts.
+
+    Misses are first run through the tokenizer-level ``may_have_lineage``
+    check (``lineage_prefilter_enabled``); statements that cannot yield edges,
+    such as ``INSERT ... VALUES`` or temp-table DDL, resolve to no edges
+    without a full parse and count as ``prefiltered``.
+
+    ``parser``/``record`` swap in another per-statement extractor (column
+    lineage uses ``extract_column_edges``); ``namespace`` keeps its keys apart
+    from table-level parses in the shared table.
+    """
+
+    def __init__(
+        self,
+        maxsize: int | None = None,
+        parser: Callable[[str, str], list[Any]] | None = None,
+        record: type = ParsedEdge,
+        namespace: str = "",
+        prefilter: bool = True,
+    ):
+        self._maxsize = maxsize
+        self.parser = parser
+        self.record = record
+        self.namespace = namespace
+        self.prefilter = prefilter
+        self._entries: OrderedDict[str, list[Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.prefiltered = 0
+
+    @property
+    def maxsize(self) -> int:
+        if self._maxsize is not None:
+            return self._maxsize
+        from aegis.config import settings
+
+        return settings.parse_cache_size
+
+    def get_edges(self, sql: str, dialect: str, db: Session | None = None) -> list[Any]:
+        """Return lineage edges for ``sql``, parsing only on a cache miss."""
+        return self.get_many([sql], dialect, db)[0]
+
+    def get_many(
+        self,
+        statements: Sequence[str],
+        dialect: str,
+        db: Session | None = None,
+        parse: Callable[[list[str], str], list[list[Any]]] | None = None,
+    ) -> list[list[Any]]:
+        """Resolve edges for many statements, in order.
+
+        Each distinct statement that misses both tiers is handed to ``parse``
+        once, together with the other misses, so callers can batch the
+        CPU-bound work (see ``aegis.core.parse_pool``).
+        """
+        from aegis.config import settings
+
+        keys = [query_key(sql, dialect, self.namespace) for sql in statements]
+        found: dict[str, list[Any]] = {}
+        missing: dict[str, str] = {}
+        prefilter = self.prefilter and settings.lineage_prefilter_enabled
+
+        for sql, key in zip(statements, keys):
+            if key in found or key in missing:
+                with self._lock:
+                    self.hits += 1
+                continue
+            edges = self._lookup(key, db)
+            if edges is not None:
+                found[key] = edges
+            elif prefilter and not may_have_lineage(sql, dialect):
+                found[key] = []
+                self._remember(key, [])
+                with self._lock:
+                    self.prefiltered += 1
+            else:
+                missing[key] = sql
+
+        if missing:
+            batch = list(missing.values())
+            if parse is None:
+                parser = self.parser or extract_lineage_edges
+                parsed = [parser(sql, dialect) for sql in batch]
+            else:
+                parsed = parse(batch, dialect)
+            for (key, _sql), edges in zip(missing.items(), parsed):
+                found[key] = edges
+                self._remember(key, edges)
+                if db is not None:
+                    self._store(db, key, dialect, edges)
+
+        return [list(found[key]) for key in keys]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.persistent_hits = self.misses = self.prefiltered = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.persistent_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_rate": round((lookups - self.misses) / lookups, 3) if lookups else 0.0,
+                "prefiltered": self.prefiltered,
+                # Share of misses that never reached the full parser.
+                "skip_rate": round(self.prefiltered / self.misses, 3) if self.misses else 0.0,
+            }
+
+    def _lookup(self, key: str, db: Session | None) -> list[Any] | None:
+        with self._lock:
+            edges = self._entries.get(key)
+            if edges is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return edges
+
+        edges = self._load(db, key) if db is not None else None
+        with self._lock:
+            if edges is None:
+                self.misses += 1
+            else:
+                self.persistent_hits += 1
+        if edges is not None:
+            self._remember(key, edges)
+        return edges
+
+    def _remember(self, key: str, edges: list[Any]) -> None:
+        maxsize = self.maxsize
+        if maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = edges
+            self._entries.move_to_end(key)
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+
+    def _load(self, db: Session, key: str) -> list[Any] | None:
+        row = db.get(ParsedQueryModel, key)
+        if row is None:
+            return None
+        return [self.record(*fields) for fields in json.loads(row.edges)]
+
+    @staticmethod
+    def _store(db: Session, key: str, dialect: str, edges: list[Any]) -> None:
+        payload = json.dumps([astuple(e) for e in edges])
+        db.merge(ParsedQueryModel(query_key=key, dialect=sqlglot_dialect(dialect), edges=payload))
+
+
+def extract_columns(sql: str, dialect: str) -> list[ColumnEdge]:
+    """``extract_column_edges`` under the configured per-statement budget."""
+    from aegis.config import settings
+
+    return extract_column_edges(
+        sql,
+        dialect,
+        max_nodes=settings.column_lineage_max_nodes,
+        timeout_ms=settings.column_lineage_timeout_ms,
+        max_chars=settings.column_lineage_max_chars,
+    )
+
+
+def extract_tables_and_columns(
+    sql: str, dialect: str
+) -> tuple[list[ParsedEdge], list[ColumnEdge]]:
+    """``extract_edges`` under the configured column lineage budget."""
+    from aegis.config import settings
+
+    return extract_edges(
+        sql,
+        dialect,
+        max_nodes=settings.column_lineage_max_nodes,
+        timeout_ms=settings.column_lineage_timeout_ms,
+        max_chars=settings.column_lineage_max_chars,
+    )
+
+
+parse_cache = ParseCache()
+column_parse_cache = ParseCache(
+    parser=extract_columns,
+    record=ColumnEdge,
+    namespace="column|",
+    prefilter=False,  # only fed statements that already produced table edges
+)
@@ -0,0 +1,94 @@
+"""Process pool that shards CPU-bound lineage SQL parsing off the API process."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from typing import TypeVar
+
+from aegis.config import settings
+from aegis.utils.sql_parser import extract_lineage_edges
+
+logger = logging.getLogger("aegis.parse_pool")
+
+_executor: ProcessPoolExecutor | None = None
+_executor_workers = 0
+_lock = threading.Lock()
+
+T = TypeVar("T")
+
+
+def parse_statements(
+    statements: list[str],
+    dialect: str,
+    parser: Callable[[str, str], T] = extract_lineage_edges,
+) -> list[T]:
+    """Parse statements into lineage edges, one result per statement, in order.
+
+    Batches of at least ``lineage_parse_min_batch`` statements are split into
+    chunks of ``lineage_parse_chunk_size`` and parsed on a process pool, which
+    keeps sqlglot off the GIL shared with the asyncio API loop. Smaller
+    batches, or a pool failure, parse in-process. ``parser`` must be a
+    module-level function so it can be pickled to the workers.
+    """
+    workers = settings.lineage_parse_workers
+    if workers <= 1 or len(statements) < max(1, settings.lineage_parse_min_batch):
+        return _parse_chunk(statements, dialect, parser)
+
+    size = max(1, settings.lineage_parse_chunk_size)
+    chunks = [statements[i:i + size] for i in range(0, len(statements), size)]
+    try:
+        # Executor.map yields in submission order, so output is deterministic.
+        results = list(
+            _get_executor(workers).map(_parse_chunk, chunks, repeat(dialect), repeat(parser))
+        )
+    except BrokenProcessPool:
+        logger.exception(
+            "Lineage parse pool broke; parsing %d statements in-process", len(statements)
+        )
+        shutdown_parse_pool()
+        return _parse_chunk(statements, dialect, parser)
+
+    logger.debug(
+        "Parsed %d statements in %d chunks across %d workers",
+        len(statements), len(chunks), workers,
+    )
+    return [edges for chunk in results for edges in chunk]
+
+
+def shutdown_parse_pool() -> None:
+    """Stop the worker processes, if any were started."""
+    global _executor, _executor_workers
+    with _lock:
+        executor, _executor, _executor_workers = _executor, None, 0
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor, _executor_workers
+    with _lock:
+        if _executor is not None and _executor_workers == workers:
+            return _executor
+        stale, _executor = _executor, ProcessPoolExecutor(
+            max_workers=workers,
+            # Fork is unsafe from a process running scanner and API threads.
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        _executor_workers = workers
+        if stale is not None:
+            stale.shutdown(wait=False)  # does not block on running chunks
+        return _executor
+
+
+def _parse_chunk(
+    statements: list[str],
+    dialect: str,
+    parser: Callable[[str, str], T] = extract_lineage_edges,
+) -> list[T]:
+    return [parser(sql, dialect) for sql in statements]
@@ -35,11 +35,23 @@ async def lifespan(app: FastAPI):
     scanner_task = await start_scanner()
     logger.info("Background scanner started")
 
+    from aegis.services.incident_queue import incident_workers
+
+    if settings.incident_queue_enabled:
+        incident_workers.start()
+
     yield
 
     # Shutdown
     if scanner_task:
         scanner_task.cancel()
+
+    from aegis.core.connectors import connector_registry
+    from aegis.core.parse_pool import shutdown_parse_pool
+
+    incident_workers.stop()
+    connector_registry.close_all()
+    shutdown_parse_pool()
     logger.info("Aegis shutting down")
 
 
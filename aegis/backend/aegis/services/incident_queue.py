@@ -0,0 +1,337 @@
+"""Durable incident work queue and the worker pool that drains it."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from aegis.agents.architect import DiagnosisUnavailableError
+from aegis.config import settings
+from aegis.core.models import AnomalyModel, IncidentJobModel, IncidentModel
+
+logger = logging.getLogger("aegis.incident_queue")
+
+# Extra candidates read per claim, so jobs lost to other workers can be replaced.
+CLAIM_OVERFETCH = 4
+
+
+class IncidentQueue:
+    """Incident jobs stored in ``incident_jobs``.
+
+    Jobs are claimed with a conditional UPDATE, so concurrent workers never
+    run the same job. A job left ``running`` past the visibility timeout —
+    its worker or the whole process died — is claimed again, which makes the
+    queue survive restarts. A claim counts as an attempt, so a job that keeps
+    killing its worker is failed once its attempts run out.
+    """
+
+    def enqueue(
+        self, db: Session, incident: IncidentModel, anomaly: AnomalyModel
+    ) -> IncidentJobModel:
+        job = IncidentJobModel(
+            incident_id=incident.id,
+            anomaly_id=anomaly.id,
+            status="pending",
+            attempts=0,
+            available_at=datetime.now(timezone.utc),
+        )
+        db.add(job)
+        return job
+
+    def claim(self, db: Session, limit: int = 1) -> list[IncidentJobModel]:
+        """Mark up to ``limit`` of the oldest runnable jobs as running, committing the claim."""
+        now = datetime.now(timezone.utc)
+        max_attempts = settings.incident_job_max_attempts
+        expired = and_(
+            IncidentJobModel.status == "running",
+            IncidentJobModel.locked_at
+            < now - timedelta(seconds=settings.incident_job_visibility_timeout_seconds),
+        )
+        exhausted = db.execute(
+            update(IncidentJobModel)
+            .where(expired, IncidentJobModel.attempts >= max_attempts)
+            .values(
+                status="failed",
+                locked_at=None,
+                last_error="LeaseExpired: worker did not finish the job",
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if exhausted.rowcount:
+            logger.error(
+                "%d incident job(s) failed: lease expired on the last attempt",
+                exhausted.rowcount,
+            )
+        runnable = or_(
+            and_(IncidentJobModel.status == "pending", IncidentJobModel.available_at <= now),
+            and_(expired, IncidentJobModel.attempts < max_attempts),
+        )
+        candidates = db.execute(
+            select(IncidentJobModel.id)
+            .where(runnable)
+            .order_by(IncidentJobModel.available_at, IncidentJobModel.id)
+            .limit(limit + CLAIM_OVERFETCH)
+        ).scalars().all()
+
+        claimed_ids = []
+        for job_id in candidates:
+            # Re-check the predicate: another worker may have claimed it first.
+            claimed = db.execute(
+                update(IncidentJobModel)
+                .where(IncidentJobModel.id == job_id, runnable)
+                .values(
+                    status="running",
+                    locked_at=now,
+                    attempts=IncidentJobModel.attempts + 1,
+                    updated_at=now,
+                )
+            )
+            if claimed.rowcount == 1:
+                claimed_ids.append(job_id)
+                if len(claimed_ids) == limit:
+                    break
+        db.commit()
+        return [db.get(IncidentJobModel, job_id, populate_existing=True) for job_id in claimed_ids]
+
+    def complete(self, db: Session, job: IncidentJobModel) -> None:
+        job.status = "done"
+        job.locked_at = None
+        job.last_error = None
+
+    def fail(
+        self, db: Session, job: IncidentJobModel, error: BaseException, retry: bool = True
+    ) -> None:
+        """Schedule a retry with exponential backoff, or give up after the last attempt."""
+        job.locked_at = None
+        job.last_error = f"{type(error).__name__}: {error}"
+        if not retry or job.attempts >= settings.incident_job_max_attempts:
+            job.status = "failed"
+            logger.error("Incident job %d failed after %d attempts", job.id, job.attempts)
+            return
+        delay = settings.incident_job_retry_seconds * 2 ** (job.attempts - 1)
+        job.status = "pending"
+        job.available_at = datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+    def heartbeat(self, db: Session, job_ids: list[int]) -> int:
+        """Extend the lease on whichever of ``job_ids`` are still running."""
+        result = db.execute(
+            update(IncidentJobModel)
+            .where(IncidentJobModel.id.in_(job_ids), IncidentJobModel.status == "running")
+            .values(locked_at=datetime.now(timezone.utc))
+        )
+        return result.rowcount
+
+    def counts(self, db: Session) -> dict[str, int]:
+        rows = db.execute(
+            select(IncidentJobModel.status, func.count()).group_by(IncidentJobModel.status)
+        )
+        return {status: count for status, count in rows}
+
+
+def _default_orchestrator(db: Session) -> Any:
+    from aegis.agents.architect import Architect
+    from aegis.agents.executor import Executor
+    from aegis.agents.orchestrator import Orchestrator
+    from aegis.core.lineage import LineageGraph, lineage_index
+    from aegis.services.notifier import notifier
+
+    architect = Architect(lineage_graph=LineageGraph(db, index=lineage_index))
+    return Orchestrator(architect, Executor(), notifier=notifier)
+
+
+class IncidentWorkerPool:
+    """Bounded set of threads that claim incident jobs and run them.
+
+    Each batch of jobs gets its own session; the LLM calls inside the
+    Architect happen here rather than in the scan loop. ``wake`` lets the
+    scanner signal fresh work instead of waiting for the next poll.
+    """
+
+    def __init__(
+        self,
+        queue: IncidentQueue,
+        session_factory: Callable[[], Session] | None = None,
+        orchestrator_factory: Callable[[Session], Any] = _default_orchestrator,
+    ):
+        self.queue = queue
+        self._session_factory = session_factory
+        self._orchestrator_factory = orchestrator_factory
+        self._threads: list[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.failed = 0
+
+    def start(self, workers: int | None = None) -> None:
+        workers = max(1, workers if workers is not None else settings.incident_workers)
+        if self._threads:
+            return
+        self._stop.clear()
+        for i in range(workers):
+            thread = threading.Thread(
+                target=self._run, name=f"aegis-incident-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        logger.info("Started %d incident workers", workers)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def run_once(self) -> bool:
+        """Claim and process a batch of jobs. Returns False when the queue is empty.
+
+        Jobs queued by the same scan are claimed together so the Architect
+        can diagnose related anomalies in one LLM call. Each job then commits
+        on its own, and the batch's lease is renewed while it runs. Until a
+        job's last attempt, a failed LLM diagnosis fails the job so it is
+        retried rather than settling for the rule-based fallback.
+        """
+        with self._new_session() as db:
+            jobs = self.queue.claim(db, limit=max(1, settings.incident_job_batch_size))
+            if not jobs:
+                return False
+
+            with self._lease([job.id for job in jobs]):
+                try:
+                    orchestrator = self._orchestrator_factory(db)
+                except Exception as exc:
+                    logger.exception("Could not set up incident processing")
+                    for job in jobs:
+                        self._fail(db, job.id, exc)
+                    return True
+
+                work = []
+                for job in jobs:
+                    incident = db.get(IncidentModel, job.incident_id)
+                    anomaly = db.get(AnomalyModel, job.anomaly_id)
+                    if incident is None or anomaly is None:
+                        self._fail(
+                            db, job.id, LookupError("incident or anomaly no longer exists"),
+                            retry=False,
+                        )
+                    else:
+                        work.append((job, incident, anomaly))
+
+                diagnoses: dict[int, Any] = {}
+                if len(work) > 1:
+                    diagnoses = orchestrator.diagnose_many([a for _, _, a in work], db)
+                for job, incident, anomaly in work:
+                    self._process(db, orchestrator, job, incident, anomaly, diagnoses)
+            return True
+
+    def _process(
+        self,
+        db: Session,
+        orchestrator: Any,
+        job: IncidentJobModel,
+        incident: IncidentModel,
+        anomaly: AnomalyModel,
+        diagnoses: dict[int, Any],
+    ) -> None:
+        job_id = job.id
+        final = job.attempts >= settings.incident_job_max_attempts
+        try:
+            if anomaly.id in diagnoses and diagnoses[anomaly.id] is None and not final:
+                raise DiagnosisUnavailableError(f"No LLM diagnosis for anomaly {anomaly.id}")
+            orchestrator.process_incident(
+                incident, anomaly, db, diagnosis=diagnoses.get(anomaly.id), strict=not final
+            )
+            self.queue.complete(db, job)
+            db.commit()
+        except Exception as exc:
+            # An unavailable LLM is routine; anything else gets a traceback.
+            logger.warning(
+                "Incident job %d failed: %s", job_id, exc,
+                exc_info=not isinstance(exc, DiagnosisUnavailableError),
+            )
+            db.rollback()
+            self._fail(db, job_id, exc)
+            return
+
+        with self._lock:
+            self.processed += 1
+        if orchestrator.notifier:
+            orchestrator.notifier.broadcast(
+                "incident.updated",
+                {"incident_id": incident.id, "severity": incident.severity},
+            )
+
+    def _fail(self, db: Session, job_id: int, error: BaseException, retry: bool = True) -> None:
+        self.queue.fail(db, db.get(IncidentJobModel, job_id), error, retry=retry)
+        db.commit()
+        with self._lock:
+            self.failed += 1
+
+    @contextmanager
+    def _lease(self, job_ids: list[int]) -> Iterator[None]:
+        """Renew the claim on ``job_ids`` from a side thread until the block exits.
+
+        A batch can make many slow LLM calls; without renewal another worker
+        would see its jobs as abandoned after the visibility timeout.
+        """
+        stop = threading.Event()
+        interval = settings.incident_job_visibility_timeout_seconds / 3
+
+        def renew() -> None:
+            while not stop.wait(interval):
+                try:
+                    with self._new_session() as db:
+                        self.queue.heartbeat(db, job_ids)
+                        db.commit()
+                except Exception:
+                    logger.warning("Could not renew incident job lease", exc_info=True)
+
+        thread = threading.Thread(target=renew, name="aegis-incident-lease", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": sum(t.is_alive() for t in self._threads),
+                "processed": self.processed,
+                "failed": self.failed,
+            }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                busy = self.run_once()
+            except Exception:
+                logger.exception("Incident worker error")
+                busy = False
+            if not busy:
+                self._wake.wait(settings.incident_queue_poll_seconds)
+                self._wake.clear()
+
+    def _new_session(self) -> Session:
+        if self._session_factory is not None:
+            return self._session_factory()
+        from aegis.core.database import SyncSessionLocal
+
+        return SyncSessionLocal()
+
+
+incident_queue = IncidentQueue()
+incident_workers = IncidentWorkerPool(incident_queue)
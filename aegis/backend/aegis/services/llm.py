@@ -2,12 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import random
+import re
+import threading
 import time
+from collections.abc import Callable, Mapping, Sequence
 from typing import Any
 
-from openai import OpenAI, APIError, APITimeoutError, RateLimitError
+from openai import AsyncOpenAI, OpenAI, APIError, APITimeoutError, RateLimitError
 
 from aegis.config import settings
 
@@ -53,6 +58,13 @@ Always respond with structured JSON matching the Diagnosis schema.
 Consider: What upstream change could have caused this? How far does the \
 impact reach downstream? What's the simplest fix?"""
 
+BATCH_SYSTEM_PROMPT = """You are Aegis Architect, a data reliability agent. You analyze \
+several related data anomalies at once. They were detected in the same scan and \
+share upstream lineage, so look for a single upstream change that explains them.
+
+Respond with JSON of the form {"diagnoses": [...]}, holding one object per \
+anomaly: its "anomaly_id" plus every field of the Diagnosis schema."""
+
 
 class LLMClient:
     """Wrapper around OpenAI with retry and structured output."""
@@ -66,14 +78,21 @@ class LLMClient:
             api_key = settings.openai_api_key
             if not api_key:
                 raise ValueError("OPENAI_API_KEY is not configured")
-            self._client = OpenAI(api_key=api_key)
+            self._client = OpenAI(api_key=api_key, base_url=settings.openai_base_url or None)
         return self._client
 
-    def diagnose(self, prompt: str) -> dict[str, Any] | None:
+    def diagnose(
+        self, prompt: str, system_prompt: str = SYSTEM_PROMPT
+    ) -> dict[str, Any] | None:
         """Call GPT-4 with structured output for root-cause analysis.
 
-        Returns parsed diagnosis dict or None if all retries fail.
+        Returns parsed diagnosis dict or None if all retries fail. With
+        ``llm_mode = "async"`` the call is routed through ``async_llm_client``
+        so every caller shares its rate limiter and concurrency bound.
         """
+        if settings.llm_mode == "async":
+            return async_llm_client.diagnose_blocking(prompt, system_prompt)
+
         backoff_delays = [2, 4, 8]
 
         for attempt, delay in enumerate(backoff_delays):
@@ -81,7 +100,7 @@ class LLMClient:
                 response = self.client.chat.completions.create(
                     model="gpt-4",
                     messages=[
-                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "system", "content": system_prompt},
                         {"role": "user", "content": prompt},
                     ],
                     response_format={"type": "json_object"},
@@ -119,5 +138,276 @@ class LLMClient:
         logger.error("All LLM retries exhausted")
         return None
 
+    def diagnose_many(
+        self, requests: Sequence[tuple[str, str]]
+    ) -> list[dict[str, Any] | None]:
+        """Diagnose several ``(prompt, system_prompt)`` pairs, results in order.
+
+        With ``llm_mode = "async"`` they are in flight together on
+        ``async_llm_client``; otherwise they run one after another.
+        """
+        if settings.llm_mode == "async":
+            return async_llm_client.diagnose_many_blocking(requests)
+        return [self.diagnose(prompt, system_prompt) for prompt, system_prompt in requests]
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_SCALE = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def _parse_duration(value: str | None) -> float | None:
+    """Seconds from a rate-limit reset header such as ``"6m0s"``, ``"1.5s"`` or ``"20ms"``."""
+    if not value:
+        return None
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(amount) * _DURATION_SCALE[unit] for amount, unit in parts)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> int | None:
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _retry_after(headers: Mapping[str, str]) -> float | None:
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    return _parse_duration(headers.get("retry-after"))
+
+
+class TokenBucket:
+    """Request limiter shared by all concurrent LLM calls.
+
+    Starts from ``llm_requests_per_minute`` and then follows the
+    ``x-ratelimit-*`` headers of each response: the limit sets capacity,
+    ``remaining`` caps the tokens on hand and the reset window sets the refill
+    rate. A 429 or an exhausted token budget pauses every caller until the
+    server says to resume, instead of letting them all retry into the limit.
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.capacity = max(1.0, capacity)
+        self.rate = max(refill_per_second, 1e-6)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock: asyncio.Lock | None = None
+
+    async def acquire(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:  # FIFO: waiters are served in arrival order
+            while True:
+                now = self._refill()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait)
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Adopt the server's view of the request budget."""
+        now = self._refill()
+        limit = _header_int(headers, "x-ratelimit-limit-requests")
+        remaining = _header_int(headers, "x-ratelimit-remaining-requests")
+        reset = _parse_duration(headers.get("x-ratelimit-reset-requests"))
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+            if limit and reset and remaining < limit:
+                self.rate = (limit - remaining) / reset
+        if _header_int(headers, "x-ratelimit-remaining-tokens") == 0:
+            tokens_reset = _parse_duration(headers.get("x-ratelimit-reset-tokens"))
+            if tokens_reset:
+                self._paused_until = max(self._paused_until, now + tokens_reset)
+
+    def pause(self, seconds: float) -> None:
+        now = self._refill()
+        self.tokens = 0.0
+        self._paused_until = max(self._paused_until, now + seconds)
+
+    def _refill(self) -> float:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return now
+
+
+class AsyncLLMClient:
+    """Async counterpart of ``LLMClient`` for diagnosing many incidents at once.
+
+    Every call runs on the client's own background loop, so the semaphore
+    and the bucket's lock belong to that one loop whichever loop or thread
+    the caller is on. At most ``llm_max_concurrency`` requests are in
+    flight, all of them drawing from one ``TokenBucket``. Retries wait with
+    full-jitter exponential backoff on the event loop, never on a thread.
+    Point ``openai_base_url`` at a stub server to exercise it locally.
+    """
+
+    def __init__(self, client: AsyncOpenAI | None = None, bucket: TokenBucket | None = None):
+        self._client = client
+        self._bucket = bucket
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        if self._client is None:
+            api_key = settings.openai_api_key
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY is not configured")
+            self._client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=settings.openai_base_url or None,
+                max_retries=0,  # retries are ours, so they respect the bucket
+            )
+        return self._client
+
+    @property
+    def bucket(self) -> TokenBucket:
+        if self._bucket is None:
+            rpm = settings.llm_requests_per_minute
+            self._bucket = TokenBucket(capacity=rpm, refill_per_second=rpm / 60)
+        return self._bucket
+
+    async def diagnose(
+        self, prompt: str, system_prompt: str = SYSTEM_PROMPT
+    ) -> dict[str, Any] | None:
+        """Same contract as ``LLMClient.diagnose``; awaitable from any event loop."""
+        return await asyncio.wrap_future(
+            asyncio.run_coroutine_threadsafe(
+                self._diagnose(prompt, system_prompt), self._get_loop()
+            )
+        )
+
+    def diagnose_blocking(
+        self, prompt: str, system_prompt: str = SYSTEM_PROMPT
+    ) -> dict[str, Any] | None:
+        """Run ``diagnose`` on the client's background loop from a worker thread."""
+        return asyncio.run_coroutine_threadsafe(
+            self._diagnose(prompt, system_prompt), self._get_loop()
+        ).result()
+
+    def diagnose_many_blocking(
+        self, requests: Sequence[tuple[str, str]]
+    ) -> list[dict[str, Any] | None]:
+        """Diagnose ``(prompt, system_prompt)`` pairs concurrently from a worker thread.
+
+        All of them are gathered on the background loop at once, so only
+        the semaphore and the bucket decide how many are in flight.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self._diagnose_all(requests), self._get_loop()
+        ).result()
+
+    async def _diagnose_all(
+        self, requests: Sequence[tuple[str, str]]
+    ) -> list[dict[str, Any] | None]:
+        return list(await asyncio.gather(
+            *(self._diagnose(prompt, system_prompt) for prompt, system_prompt in requests)
+        ))
+
+    async def _diagnose(self, prompt: str, system_prompt: str) -> dict[str, Any] | None:
+        """Runs on ``_get_loop()`` only.
+
+        Rate-limit pauses do not use up one of ``llm_max_attempts``; the
+        bucket already holds every caller until the server allows more. A
+        429 for an exhausted quota will not clear by waiting, so it counts.
+        ``llm_diagnosis_timeout_seconds`` bounds the whole call, waits
+        included, so a limit that never lifts still ends in None.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, settings.llm_max_concurrency))
+        try:
+            async with asyncio.timeout(settings.llm_diagnosis_timeout_seconds):
+                return await self._with_retries(prompt, system_prompt)
+        except TimeoutError:
+            logger.error(
+                "LLM diagnosis gave up after %s seconds", settings.llm_diagnosis_timeout_seconds
+            )
+            return None
+
+    async def _with_retries(self, prompt: str, system_prompt: str) -> dict[str, Any] | None:
+        attempts = max(1, settings.llm_max_attempts)
+
+        attempt = 0
+        while attempt < attempts:
+            await self.bucket.acquire()
+            try:
+                async with self._semaphore:
+                    raw = await self.client.chat.completions.with_raw_response.create(
+                        model="gpt-4",
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": prompt},
+                        ],
+                        response_format={"type": "json_object"},
+                        timeout=30,
+                    )
+                self.bucket.observe(raw.headers)
+                content = raw.parse().choices[0].message.content
+                if content is None:
+                    logger.warning("Empty response from LLM (attempt %d)", attempt + 1)
+                else:
+                    return json.loads(content)
+
+            except RateLimitError as exc:
+                headers = exc.response.headers
+                self.bucket.observe(headers)
+                if exc.code == "insufficient_quota":
+                    logger.warning("LLM quota exhausted (attempt %d/%d)", attempt + 1, attempts)
+                else:
+                    wait = _retry_after(headers) or _backoff(attempt)
+                    logger.warning("Rate limited, pausing LLM calls for %.1f seconds", wait)
+                    self.bucket.pause(wait)
+                    continue  # the pause already spaces the retry
+
+            except (APITimeoutError, APIError) as exc:
+                logger.warning("LLM call failed (attempt %d/%d): %s", attempt + 1, attempts, exc)
+
+            except (json.JSONDecodeError, KeyError) as exc:
+                logger.warning("Invalid LLM response (attempt %d): %s", attempt + 1, exc)
+
+            if attempt < attempts - 1:
+                await asyncio.sleep(_backoff(attempt))
+            attempt += 1
+
+        logger.error("All LLM retries exhausted")
+        return None
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name="aegis-llm", daemon=True
+                ).start()
+            return self._loop
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff: uniform over [0, 2 * 2**attempt) seconds."""
+    return random.uniform(0, 2.0 * 2**attempt)
+
 
 llm_client = LLMClient()
+async_llm_client = AsyncLLMClient()
@@ -0,0 +1,76 @@
+"""Bounded worker pool that fans warehouse probes out across connections."""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict, deque
+from collections.abc import Callable, Hashable, Iterator, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger("aegis.scan_pool")
+
+
+@dataclass
+class ScanJob:
+    """A single warehouse probe. ``key`` groups jobs that share a connection."""
+    key: Hashable
+    fn: Callable[[], Any]
+    payload: Any = None
+
+
+@dataclass
+class ScanResult:
+    job: ScanJob
+    value: Any = None
+    error: BaseException | None = None
+
+
+class ScanPool:
+    """Runs warehouse probes on a bounded thread pool.
+
+    At most ``max_workers`` probes run at once overall, and at most
+    ``max_per_connection`` of them against any single connection. Probes only
+    touch the warehouse; results are yielded back to the calling thread in
+    submission order so metadata DB writes stay on one session, in order.
+    """
+
+    def __init__(self, max_workers: int = 8, max_per_connection: int = 2):
+        self.max_workers = max(1, max_workers)
+        self.max_per_connection = max(1, max_per_connection)
+
+    def run(self, jobs: Sequence[ScanJob]) -> Iterator[ScanResult]:
+        """Execute all jobs and yield their results in the order given."""
+        if not jobs:
+            return
+
+        futures: list[Future] = [Future() for _ in jobs]
+        queues: dict[Hashable, deque[int]] = defaultdict(deque)
+        for index, job in enumerate(jobs):
+            queues[job.key].append(index)
+
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="aegis-scan"
+        ) as pool:
+            # One drain loop per permitted slot on each connection; the loops
+            # share that connection's queue, which enforces the per-connection cap.
+            for queue in queues.values():
+                for _ in range(min(self.max_per_connection, len(queue))):
+                    pool.submit(self._drain, queue, jobs, futures)
+
+            for job, future in zip(jobs, futures):
+                value, error = future.result()
+                yield ScanResult(job=job, value=value, error=error)
+
+    @staticmethod
+    def _drain(queue: deque[int], jobs: Sequence[ScanJob], futures: list[Future]) -> None:
+        while True:
+            try:
+                index = queue.popleft()
+            except IndexError:
+                return
+            try:
+                futures[index].set_result((jobs[index].fn(), None))
+            except Exception as exc:
+                futures[index].set_result((None, exc))
@@ -5,19 +5,37 @@ from __future__ import annotations
 import asyncio
 import json
 import logging
+from contextlib import ExitStack
+from datetime import datetime
+from functools import partial
 
 from sqlalchemy import select
+from sqlalchemy.orm import Session
 
 from aegis.agents.architect import Architect
 from aegis.agents.executor import Executor
 from aegis.agents.investigator import Investigator
 from aegis.agents.orchestrator import Orchestrator
-from aegis.agents.sentinel import FreshnessSentinel, SchemaSentinel
+from aegis.agents.sentinel import (
+    FreshnessSentinel,
+    SchemaSentinel,
+    unresolved_timestamp_columns,
+)
 from aegis.config import settings
-from aegis.core.connectors import WarehouseConnector
+from aegis.core.connectors import (
+    WarehouseConnector,
+    connector_registry,
+    resolve_timestamp_column,
+)
 from aegis.core.database import SyncSessionLocal
-from aegis.core.lineage import LineageGraph, LineageRefresher
-from aegis.core.models import ConnectionModel, MonitoredTableModel
+from aegis.core.lineage import LineageGraph, LineageRefresher, lineage_index
+from aegis.core.models import (
+    AnomalyModel,
+    ConnectionModel,
+    MonitoredTableModel,
+    SchemaSnapshotModel,
+)
+from aegis.services.scan_pool import ScanJob, ScanPool
 
 logger = logging.getLogger("aegis.scanner")
 
@@ -34,6 +52,7 @@ async def _scan_loop():
     lineage_interval = settings.lineage_refresh_seconds
     last_lineage_refresh = 0.0
     last_rediscovery = 0.0
+    last_compaction = 0.0
 
     while True:
         try:
@@ -60,6 +79,18 @@ async def _scan_loop():
             except Exception:
                 logger.exception("Rediscovery failed")
 
+        # Lineage retention on its own cadence
+        if now - last_compaction >= settings.lineage_compaction_interval_seconds:
+            try:
+                await asyncio.to_thread(_run_lineage_compaction)
+                last_compaction = now
+            except Exception:
+                logger.exception("Lineage compaction failed")
+
+        evicted = connector_registry.evict_idle()
+        if evicted:
+            logger.info("Disposed %d idle warehouse engines", evicted)
+
         await asyncio.sleep(interval)
 
 
@@ -69,24 +100,75 @@ def _run_scan_cycle():
     freshness_sentinel = FreshnessSentinel()
 
     with SyncSessionLocal() as db:
-        lineage_graph = LineageGraph(db)
+        lineage_graph = LineageGraph(db, index=lineage_index)
         architect = Architect(lineage_graph=lineage_graph)
         executor = Executor()
 
+        from aegis.services.incident_queue import incident_queue
         from aegis.services.notifier import notifier
 
-        orchestrator = Orchestrator(architect, executor, notifier=notifier)
+        orchestrator = Orchestrator(
+            architect,
+            executor,
+            notifier=notifier,
+            work_queue=incident_queue if settings.incident_queue_enabled else None,
+            lineage_graph=lineage_graph,
+        )
 
         connections = db.execute(
             select(ConnectionModel).where(ConnectionModel.is_active.is_(True))
         ).scalars().all()
 
-        total_anomalies = 0
-        total_tables = 0
+        if settings.scan_mode == "concurrent":
+            total_tables, total_anomalies = _scan_concurrent(
+                connections, db, orchestrator, schema_sentinel, freshness_sentinel
+            )
+        else:
+            total_tables, total_anomalies = _scan_sequential(
+                connections, db, orchestrator, schema_sentinel, freshness_sentinel
+            )
+
+        db.commit()
+        if settings.incident_queue_enabled and total_anomalies:
+            from aegis.services.incident_queue import incident_workers
+
+            incident_workers.wake()
+
+        logger.info(
+            "Scan cycle complete: %d tables scanned, %d anomalies found",
+            total_tables,
+            total_anomalies,
+        )
 
+        # Broadcast scan completion
+        from aegis.services.notifier import notifier
+
+        notifier.broadcast(
+            "scan.completed",
+            {
+                "tables_scanned": total_tables,
+                "anomalies_found": total_anomalies,
+            },
+        )
+
+
+def _scan_sequential(
+    connections: list[ConnectionModel],
+    db: Session,
+    orchestrator: Orchestrator,
+    schema_sentinel: SchemaSentinel,
+    freshness_sentinel: FreshnessSentinel,
+) -> tuple[int, int]:
+    """Probe every table one after another. Returns (tables, anomalies)."""
+    detected: list[AnomalyModel] = []
+    total_tables = 0
+
+    with ExitStack() as checkouts:
         for conn_model in connections:
             try:
-                connector = WarehouseConnector(conn_model.connection_uri, conn_model.dialect)
+                connector = checkouts.enter_context(connector_registry.checkout(
+                    conn_model.id, conn_model.connection_uri, conn_model.dialect
+                ))
             except Exception:
                 logger.exception("Failed to connect to %s", conn_model.name)
                 continue
@@ -97,42 +179,284 @@ def _run_scan_cycle():
                 )
             ).scalars().all()
 
+            prefetched = _prefetch_schemas(connector, conn_model, _schema_tables(tables))
+            freshness_tables = _freshness_tables(tables)
+            last_updates = _prefetch_freshness(
+                connector,
+                conn_model,
+                _freshness_targets(freshness_tables, db),
+                _metadata_tables(freshness_tables),
+            )
+
             for table in tables:
                 total_tables += 1
                 check_types = json.loads(table.check_types)
 
                 if "schema" in check_types:
-                    anomaly = schema_sentinel.inspect(table, connector, db)
+                    anomaly = schema_sentinel.inspect(table, connector, db, prefetched=prefetched)
                     if anomaly:
-                        total_anomalies += 1
-                        orchestrator.handle_anomaly(anomaly, db)
+                        detected.append(anomaly)
 
                 if "freshness" in check_types:
-                    anomaly = freshness_sentinel.inspect(table, connector, db)
+                    anomaly = freshness_sentinel.inspect(
+                        table, connector, db, last_updates=last_updates
+                    )
                     if anomaly:
-                        total_anomalies += 1
-                        orchestrator.handle_anomaly(anomaly, db)
+                        detected.append(anomaly)
 
-            connector.dispose()
+    orchestrator.handle_anomalies(detected, db)
+    return total_tables, len(detected)
 
-        db.commit()
 
-        logger.info(
-            "Scan cycle complete: %d tables scanned, %d anomalies found",
-            total_tables,
-            total_anomalies,
-        )
+def _scan_concurrent(
+    connections: list[ConnectionModel],
+    db: Session,
+    orchestrator: Orchestrator,
+    schema_sentinel: SchemaSentinel,
+    freshness_sentinel: FreshnessSentinel,
+) -> tuple[int, int]:
+    """Fan warehouse probes out over a ScanPool. Returns (tables, anomalies).
 
-        # Broadcast scan completion
-        from aegis.services.notifier import notifier
+    Only the warehouse round trips run on worker threads. Sentinel evaluation,
+    anomaly persistence and incident handling stay on this thread's session and
+    happen in job order.
+    """
+    jobs: list[ScanJob] = []
+    total_tables = 0
 
-        notifier.broadcast(
-            "scan.completed",
-            {
-                "tables_scanned": total_tables,
-                "anomalies_found": total_anomalies,
-            },
+    with ExitStack() as checkouts:
+        for conn_model in connections:
+            try:
+                connector = checkouts.enter_context(connector_registry.checkout(
+                    conn_model.id, conn_model.connection_uri, conn_model.dialect
+                ))
+            except Exception:
+                logger.exception("Failed to connect to %s", conn_model.name)
+                continue
+
+            tables = db.execute(
+                select(MonitoredTableModel).where(
+                    MonitoredTableModel.connection_id == conn_model.id
+                )
+            ).scalars().all()
+            total_tables += len(tables)
+
+            # Bind plain values into the probes — worker threads must not touch ORM state.
+            schema_tables = _schema_tables(tables)
+            if schema_tables:
+                jobs.append(ScanJob(
+                    key=conn_model.id,
+                    fn=partial(connector.fetch_schemas, {t.schema_name for t in schema_tables}),
+                    payload=("schema", schema_tables, connector),
+                ))
+
+            freshness_tables = _freshness_tables(tables)
+            batch_size = max(1, settings.freshness_batch_size)
+            for start in range(0, len(freshness_tables), batch_size):
+                chunk = freshness_tables[start:start + batch_size]
+                jobs.append(ScanJob(
+                    key=conn_model.id,
+                    fn=partial(
+                        connector.fetch_last_update_times,
+                        _freshness_targets(chunk, db),
+                        batch_size,
+                        _metadata_tables(chunk),
+                    ),
+                    payload=("freshness", chunk, connector),
+                ))
+
+        pool = ScanPool(
+            max_workers=settings.scan_max_workers,
+            max_per_connection=settings.scan_max_workers_per_connection,
         )
+        detected: list[AnomalyModel] = []
+        # Per-table schema fetches and freshness probes for tables the batched
+        # jobs did not cover, run through the pool as a second round rather
+        # than on this thread.
+        fallback: list[ScanJob] = []
+
+        for result in pool.run(jobs):
+            check, tables, connector = result.job.payload
+            anomalies: list[AnomalyModel | None] = []
+
+            if check == "schema":
+                if result.error is not None:
+                    logger.warning(
+                        "Bulk schema fetch failed — falling back to per-table fetches",
+                        exc_info=result.error,
+                    )
+                prefetched = result.value or {}
+                for table in tables:
+                    key = (table.schema_name, table.table_name)
+                    if key in prefetched:
+                        anomalies.append(
+                            schema_sentinel.evaluate(table, prefetched[key], db)
+                        )
+                    else:
+                        fallback.append(ScanJob(
+                            key=result.job.key,
+                            fn=partial(connector.fetch_schema, *key),
+                            payload=("schema", [table], connector),
+                        ))
+            elif result.error is not None:
+                logger.warning(
+                    "Batched freshness probe failed — falling back to per-table probes",
+                    exc_info=result.error,
+                )
+                fallback.extend(
+                    ScanJob(
+                        key=result.job.key,
+                        fn=partial(
+                            connector.fetch_last_update_time,
+                            table.schema_name,
+                            table.table_name,
+                            table.timestamp_column,
+                        ),
+                        payload=("freshness", [table], connector),
+                    )
+                    for table in tables
+                )
+            else:
+                anomalies = [
+                    freshness_sentinel.inspect(table, connector, db, last_updates=result.value)
+                    for table in tables
+                ]
+
+            detected.extend(anomaly for anomaly in anomalies if anomaly)
+
+        for result in pool.run(fallback):
+            check, [table], _connector = result.job.payload
+            if result.error is not None:
+                logger.error(
+                    "Failed to %s for %s",
+                    "fetch schema" if check == "schema" else "check freshness",
+                    table.fully_qualified_name,
+                    exc_info=result.error,
+                )
+                continue
+            if check == "schema":
+                anomaly = schema_sentinel.evaluate(table, result.value, db)
+            else:
+                anomaly = freshness_sentinel.evaluate(table, result.value, db)
+            if anomaly:
+                detected.append(anomaly)
+
+    orchestrator.handle_anomalies(detected, db)
+    return total_tables, len(detected)
+
+
+def _schema_tables(tables: list[MonitoredTableModel]) -> list[MonitoredTableModel]:
+    return [t for t in tables if "schema" in json.loads(t.check_types)]
+
+
+def _freshness_tables(tables: list[MonitoredTableModel]) -> list[MonitoredTableModel]:
+    return [
+        t for t in tables
+        if "freshness" in json.loads(t.check_types) and t.freshness_sla_minutes
+    ]
+
+
+def _freshness_targets(
+    tables: list[MonitoredTableModel], db: Session
+) -> list[tuple[str, str, str | None]]:
+    """(schema, table, timestamp_column) probe targets for freshness checks.
+
+    Tables enrolled without a timestamp column get one resolved from their
+    latest schema snapshot. If that snapshot has no candidate column, the
+    table is left out rather than probed with failing MAX() queries every
+    cycle — unless it reads freshness from catalog metadata, where the
+    candidate probe is only a fallback. Tables with no snapshot yet fall back
+    to the candidate probe. Both misses are remembered in
+    ``unresolved_timestamp_columns`` until the table's schema snapshot changes,
+    so the snapshot is not re-read every cycle.
+    """
+    targets: list[tuple[str, str, str | None]] = []
+    for table in tables:
+        if table.timestamp_column is None:
+            has_snapshot = unresolved_timestamp_columns.get(table.id)
+            if has_snapshot is None:
+                has_snapshot = _resolve_from_snapshot(table, db)
+            if has_snapshot and table.freshness_strategy != "metadata":
+                logger.debug(
+                    "No timestamp column on %s — skipping freshness probe",
+                    table.fully_qualified_name,
+                )
+                continue
+        targets.append((table.schema_name, table.table_name, table.timestamp_column))
+    return targets
+
+
+def _resolve_from_snapshot(table: MonitoredTableModel, db: Session) -> bool | None:
+    """Set ``table.timestamp_column`` from its latest snapshot.
+
+    Returns None when a column was resolved; otherwise records and returns
+    whether a snapshot existed.
+    """
+    snapshot = db.execute(
+        select(SchemaSnapshotModel)
+        .where(SchemaSnapshotModel.table_id == table.id)
+        .order_by(SchemaSnapshotModel.captured_at.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+    if snapshot is not None:
+        table.timestamp_column = resolve_timestamp_column(json.loads(snapshot.columns))
+        if table.timestamp_column is not None:
+            return None
+    unresolved_timestamp_columns[table.id] = snapshot is not None
+    return snapshot is not None
+
+
+def _metadata_tables(tables: list[MonitoredTableModel]) -> set[tuple[str, str]]:
+    return {
+        (t.schema_name, t.table_name) for t in tables if t.freshness_strategy == "metadata"
+    }
+
+
+def _prefetch_freshness(
+    connector: WarehouseConnector,
+    conn_model: ConnectionModel,
+    targets: list[tuple[str, str, str | None]],
+    metadata_tables: set[tuple[str, str]],
+) -> dict[tuple[str, str], datetime | None] | None:
+    """Batched MAX(timestamp) probe for all freshness-checked tables.
+
+    Returns None when the batch fails outright, in which case the
+    FreshnessSentinel probes each table itself.
+    """
+    try:
+        return connector.fetch_last_update_times(
+            targets, settings.freshness_batch_size, metadata_tables
+        )
+    except Exception:
+        logger.warning(
+            "Batched freshness probe failed for %s — falling back to per-table probes",
+            conn_model.name,
+            exc_info=True,
+        )
+        return None
+
+
+def _prefetch_schemas(
+    connector: WarehouseConnector,
+    conn_model: ConnectionModel,
+    tables: list[MonitoredTableModel],
+) -> dict[tuple[str, str], list[dict]] | None:
+    """Fetch column metadata for all schema-checked tables in one query.
+
+    Returns None when there is nothing to fetch or the bulk query fails, in
+    which case the SchemaSentinel falls back to per-table fetches.
+    """
+    if not tables:
+        return None
+    try:
+        return connector.fetch_schemas({t.schema_name for t in tables})
+    except Exception:
+        logger.warning(
+            "Bulk schema fetch failed for %s — falling back to per-table fetches",
+            conn_model.name,
+            exc_info=True,
+        )
+        return None
 
 
 def _run_lineage_refresh():
@@ -145,17 +469,26 @@ def _run_lineage_refresh():
         total_edges = 0
         for conn_model in connections:
             try:
-                connector = WarehouseConnector(conn_model.connection_uri, conn_model.dialect)
-                refresher = LineageRefresher(db)
-                edges = refresher.refresh(connector)
+                with connector_registry.checkout(
+                    conn_model.id, conn_model.connection_uri, conn_model.dialect
+                ) as connector:
+                    refresher = LineageRefresher(db)
+                    edges = refresher.refresh(connector, connection_id=conn_model.id)
                 total_edges += edges
-                connector.dispose()
             except Exception:
                 logger.exception("Lineage refresh failed for %s", conn_model.name)
 
         logger.info("Lineage refresh complete: %d edges updated", total_edges)
 
 
+def _run_lineage_compaction():
+    """Archive or delete lineage edges past retention."""
+    from aegis.core.lineage_compaction import compact_lineage
+
+    with SyncSessionLocal() as db:
+        compact_lineage(db)
+
+
 def _run_rediscovery():
     """Detect new/dropped tables across all active connections."""
     from aegis.services.notifier import notifier
@@ -170,10 +503,11 @@ def _run_rediscovery():
 
         for conn_model in connections:
             try:
-                connector = WarehouseConnector(conn_model.connection_uri, conn_model.dialect)
-                deltas = investigator.rediscover(connector, db, conn_model.id)
+                with connector_registry.checkout(
+                    conn_model.id, conn_model.connection_uri, conn_model.dialect
+                ) as connector:
+                    deltas = investigator.rediscover(connector, db, conn_model.id)
                 total_deltas += len(deltas)
-                connector.dispose()
 
                 if deltas:
                     logger.info(
@@ -2,10 +2,17 @@
 
 from __future__ import annotations
 
+import logging
+import time
+from collections.abc import Iterator
 from dataclasses import dataclass
 
 import sqlglot
 from sqlglot import exp
+from sqlglot.dialects.dialect import Dialect
+from sqlglot.tokens import Token, TokenType
+
+logger = logging.getLogger("aegis.sql_parser")
 
 
 @dataclass
@@ -15,17 +22,168 @@ class ParsedEdge:
     confidence: float
 
 
+@dataclass
+class ColumnEdge:
+    source_table: str
+    source_column: str
+    target_table: str
+    target_column: str
+    confidence: float
+
+
+# Connector dialect names (SQLAlchemy) that sqlglot spells differently.
+_SQLGLOT_DIALECTS = {"postgresql": "postgres"}
+
+
+def sqlglot_dialect(dialect: str) -> str:
+    """Map a connector dialect to the name sqlglot expects."""
+    return _SQLGLOT_DIALECTS.get(dialect, dialect)
+
+
+@dataclass
+class StatementShape:
+    """What the tokenizer alone can tell about one statement."""
+    is_write: bool
+    has_sources: bool
+
+    @property
+    def may_have_lineage(self) -> bool:
+        return self.is_write and self.has_sources
+
+
+_WRITE_TOKENS = {TokenType.INSERT, TokenType.CREATE, TokenType.MERGE, TokenType.REPLACE}
+# Anything that can introduce a table other than the target. REFERENCES, LIKE,
+# CLONE, INHERITS and PARTITION OF count because extract_lineage_edges reports
+# those tables too; TABLE covers the bare ``TABLE <name>`` query form. When in
+# doubt a token belongs here: a false positive only costs a full parse.
+_SOURCE_TOKENS = {
+    TokenType.FROM, TokenType.JOIN, TokenType.USING, TokenType.LIKE, TokenType.REFERENCES,
+    TokenType.TABLE, TokenType.PARTITION,
+}
+_SOURCE_KEYWORDS = {"CLONE", "INHERITS", "OF"}
+_NAME_TOKENS = {TokenType.VAR, TokenType.IDENTIFIER}
+
+
+def classify_statements(sql: str, dialect: str) -> list[StatementShape]:
+    """Classify each statement in ``sql`` from its tokens, without parsing.
+
+    Text that does not tokenize cannot parse either, so it yields no shapes.
+    """
+    try:
+        tokens = Dialect.get_or_raise(sqlglot_dialect(dialect)).tokenize(sql)
+    except sqlglot.errors.TokenError:
+        return []
+
+    shapes: list[StatementShape] = []
+    statement: list[Token] = []
+    for token in [*tokens, None]:
+        if token is None or token.token_type == TokenType.SEMICOLON:
+            if statement:
+                shapes.append(_classify(statement))
+            statement = []
+        else:
+            statement.append(token)
+    return shapes
+
+
+def may_have_lineage(sql: str, dialect: str) -> bool:
+    """Cheap pre-check: False only when ``extract_lineage_edges`` would find nothing."""
+    return any(shape.may_have_lineage for shape in classify_statements(sql, dialect))
+
+
+def _classify(tokens: list[Token]) -> StatementShape:
+    start = 0
+    if tokens[0].token_type == TokenType.WITH:
+        # The write keyword follows the CTE list, at parenthesis depth 0.
+        depth = 0
+        for i, token in enumerate(tokens):
+            if token.token_type == TokenType.L_PAREN:
+                depth += 1
+            elif token.token_type == TokenType.R_PAREN:
+                depth -= 1
+            elif depth == 0 and token.token_type in _WRITE_TOKENS:
+                start = i
+                break
+    if tokens[start].token_type not in _WRITE_TOKENS:
+        return StatementShape(is_write=False, has_sources=False)
+
+    end = _target_end(tokens, start)
+    rest = tokens[_skip_name(tokens, end) if end is not None else start + 1:]
+    has_sources = start > 0 or any(
+        t.token_type in _SOURCE_TOKENS
+        or (t.token_type == TokenType.VAR and t.text.upper() in _SOURCE_KEYWORDS)
+        for t in rest
+    )
+    return StatementShape(is_write=True, has_sources=has_sources)
+
+
+def _target_end(tokens: list[Token], start: int) -> int | None:
+    """Index of the first token of the target name, if one can be found."""
+    anchors = {TokenType.INTO, TokenType.TABLE, TokenType.VIEW}
+    for i in range(start + 1, len(tokens)):
+        if tokens[i].token_type in anchors:
+            i += 1
+            while i < len(tokens) and (
+                tokens[i].token_type in {TokenType.TABLE, TokenType.NOT, TokenType.EXISTS}
+                or tokens[i].text.upper() == "IF"
+            ):
+                i += 1
+            return i if i < len(tokens) else None
+        if tokens[i].token_type in _SOURCE_TOKENS:
+            break
+    return None
+
+
+def _skip_name(tokens: list[Token], start: int) -> int:
+    """Index just past the (possibly dotted) name starting at ``start``."""
+    i = start
+    while i < len(tokens) and tokens[i].token_type in _NAME_TOKENS:
+        if i + 1 < len(tokens) and tokens[i + 1].token_type == TokenType.DOT:
+            i += 2
+        else:
+            return i + 1
+    return i
+
+
 def extract_lineage_edges(sql: str, dialect: str) -> list[ParsedEdge]:
     """Parse a SQL statement and extract source→target table edges.
 
     Returns edges with confidence scores based on the relationship pattern.
     """
-    edges: list[ParsedEdge] = []
+    parsed = _parse(sql, dialect)
+    return _table_edges(parsed) if parsed is not None else []
 
+
+def extract_edges(
+    sql: str,
+    dialect: str,
+    max_nodes: int | None = None,
+    timeout_ms: int | None = None,
+    max_chars: int | None = None,
+) -> tuple[list[ParsedEdge], list[ColumnEdge]]:
+    """Table edges and column edges for ``sql`` from a single parse.
+
+    Column edges are only extracted for statements that yield table edges,
+    under the same budgets as ``extract_column_edges``.
+    """
+    parsed = _parse(sql, dialect)
+    if parsed is None:
+        return [], []
+    edges = _table_edges(parsed)
+    if not edges or (max_chars and len(sql) > max_chars):
+        return edges, []
+    return edges, _column_edges(parsed, max_nodes, timeout_ms)
+
+
+def _parse(sql: str, dialect: str) -> list[exp.Expression | None] | None:
     try:
-        parsed = sqlglot.parse(sql, dialect=dialect)
-    except sqlglot.errors.ParseError:
-        return []
+        return sqlglot.parse(sql, dialect=sqlglot_dialect(dialect))
+    except (sqlglot.errors.ParseError, sqlglot.errors.TokenError):
+        return None
+
+
+def _table_edges(parsed: list[exp.Expression | None]) -> list[ParsedEdge]:
+    edges: list[ParsedEdge] = []
 
     for statement in parsed:
         if statement is None:
@@ -102,3 +260,215 @@ def _table_name(table: exp.Table) -> str:
         parts.append(table.db)
     parts.append(table.name)
     return ".".join(parts)
+
+
+# ---------------------------------------------------------------------------
+# Column-level lineage
+# ---------------------------------------------------------------------------
+
+_MAX_SCOPE_DEPTH = 8
+
+
+class _BudgetExceededError(Exception):
+    pass
+
+
+def extract_column_edges(
+    sql: str,
+    dialect: str,
+    max_nodes: int | None = None,
+    timeout_ms: int | None = None,
+    max_chars: int | None = None,
+) -> list[ColumnEdge]:
+    """Parse a write statement into source column → target column edges.
+
+    Covers INSERT ... SELECT (with or without a column list, including
+    UNIONs), CREATE TABLE AS SELECT and MERGE. Columns are resolved through
+    aliases, joins, derived tables and CTEs; unqualified columns are only
+    attributed when a scope has a single source, and ``SELECT *`` is skipped
+    since there is no schema to expand it. The parse itself cannot be
+    interrupted, so statements longer than ``max_chars`` are skipped before
+    it; statements with more than ``max_nodes`` AST nodes are skipped after
+    it, and resolution stops once ``timeout_ms`` has elapsed, keeping the
+    edges found so far.
+    """
+    if max_chars and len(sql) > max_chars:
+        logger.debug("Skipping column lineage for statement over %d characters", max_chars)
+        return []
+    parsed = _parse(sql, dialect)
+    if parsed is None:
+        return []
+    return _column_edges(parsed, max_nodes, timeout_ms)
+
+
+def _column_edges(
+    parsed: list[exp.Expression | None], max_nodes: int | None, timeout_ms: int | None
+) -> list[ColumnEdge]:
+    deadline = time.perf_counter() + timeout_ms / 1000 if timeout_ms else None
+    edges: dict[tuple[str, str, str, str], float] = {}
+    try:
+        for statement in parsed:
+            if statement is None:
+                continue
+            if max_nodes and _exceeds(statement, max_nodes):
+                logger.debug("Skipping column lineage for statement over %d nodes", max_nodes)
+                continue
+            target = _extract_target(statement)
+            if target is None:
+                continue
+            for target_column, expression, scope in _column_assignments(statement):
+                _check(deadline)
+                direct = isinstance(expression, exp.Column)
+                for table, column, confidence in _resolve(expression, scope, deadline, 0):
+                    confidence = confidence if direct else min(confidence, 0.8)
+                    key = (table, column, target, target_column)
+                    edges[key] = max(edges.get(key, 0.0), confidence)
+    except _BudgetExceededError:
+        logger.warning(
+            "Column lineage parse exceeded %dms; keeping %d edges", timeout_ms, len(edges)
+        )
+
+    return [ColumnEdge(*key, confidence=conf) for key, conf in edges.items()]
+
+
+def _exceeds(statement: exp.Expression, max_nodes: int) -> bool:
+    for count, _node in enumerate(statement.walk(), start=1):
+        if count > max_nodes:
+            return True
+    return False
+
+
+def _check(deadline: float | None) -> None:
+    if deadline is not None and time.perf_counter() > deadline:
+        raise _BudgetExceededError
+
+
+def _column_assignments(
+    statement: exp.Expression,
+) -> Iterator[tuple[str, exp.Expression, exp.Expression]]:
+    """(target column, source expression, scope the expression lives in)."""
+    if isinstance(statement, exp.Merge):
+        yield from _merge_assignments(statement)
+        return
+
+    query = statement.expression
+    if query is None:
+        return
+    names: list[str] | None = None
+    if isinstance(statement, exp.Insert) and isinstance(statement.this, exp.Schema):
+        names = [col.name for col in statement.this.expressions]
+
+    for select in _branches(query):
+        for i, projection in enumerate(select.expressions):
+            if isinstance(projection, exp.Star) or (
+                isinstance(projection, exp.Column) and isinstance(projection.this, exp.Star)
+            ):
+                continue
+            if names is not None:
+                if i >= len(names):
+                    break
+                target_column = names[i]
+            else:
+                target_column = projection.alias_or_name
+            if target_column:
+                yield target_column, _unalias(projection), select
+
+
+def _merge_assignments(
+    statement: exp.Merge,
+) -> Iterator[tuple[str, exp.Expression, exp.Expression]]:
+    whens = statement.args.get("whens")
+    clauses = whens.expressions if whens is not None else statement.expressions
+    for when in clauses:
+        then = when.args.get("then")
+        if isinstance(then, exp.Update):
+            for assignment in then.expressions:
+                if isinstance(assignment, exp.EQ) and isinstance(assignment.this, exp.Column):
+                    yield assignment.this.name, assignment.expression, statement
+        elif isinstance(then, exp.Insert):
+            columns, values = then.this, then.expression
+            if isinstance(columns, exp.Tuple) and isinstance(values, exp.Tuple):
+                for column, value in zip(columns.expressions, values.expressions):
+                    yield column.name, value, statement
+
+
+def _branches(query: exp.Expression) -> list[exp.Select]:
+    if isinstance(query, exp.Subquery):
+        return _branches(query.this)
+    if isinstance(query, exp.Union):
+        return _branches(query.left) + _branches(query.right)
+    if isinstance(query, exp.Select):
+        return [query]
+    return []
+
+
+def _unalias(projection: exp.Expression) -> exp.Expression:
+    return projection.this if isinstance(projection, exp.Alias) else projection
+
+
+def _sources(scope: exp.Expression) -> dict[str, exp.Expression]:
+    """Alias → Table or nested query visible to columns in ``scope``."""
+    sources: dict[str, exp.Expression] = {}
+    if isinstance(scope, exp.Merge):
+        using = scope.args.get("using")
+        if using is not None:
+            sources[using.alias_or_name] = using
+        return sources
+
+    from_ = scope.args.get("from") or scope.args.get("from_")
+    relations = [from_.this] if from_ is not None else []
+    relations += [join.this for join in scope.args.get("joins") or []]
+    ctes = _ctes(scope)
+    for relation in relations:
+        if isinstance(relation, exp.Table) and relation.name in ctes and not relation.db:
+            sources[relation.alias_or_name] = ctes[relation.name]
+        elif isinstance(relation, (exp.Table, exp.Subquery)):
+            sources[relation.alias_or_name] = relation
+    return sources
+
+
+def _ctes(scope: exp.Expression) -> dict[str, exp.Expression]:
+    ctes: dict[str, exp.Expression] = {}
+    node: exp.Expression | None = scope
+    while node is not None:
+        with_ = node.args.get("with") or node.args.get("with_")
+        if with_ is not None:
+            for cte in with_.expressions:
+                ctes.setdefault(cte.alias_or_name, cte.this)
+        node = node.parent
+    return ctes
+
+
+def _resolve(
+    expression: exp.Expression, scope: exp.Expression, deadline: float | None, depth: int
+) -> Iterator[tuple[str, str, float]]:
+    """Physical (table, column, confidence) triples feeding ``expression``."""
+    if depth > _MAX_SCOPE_DEPTH:
+        return
+    sources = _sources(scope)
+    for column in expression.find_all(exp.Column):
+        if isinstance(column.this, exp.Star):
+            continue
+        qualifier = column.table
+        if qualifier:
+            source = sources.get(qualifier)
+        elif len(sources) == 1:
+            source = next(iter(sources.values()))
+        else:
+            continue  # ambiguous without a schema
+        if source is None:
+            continue
+
+        if isinstance(source, exp.Table):
+            yield _table_name(source), column.name, 1.0
+            continue
+
+        _check(deadline)
+        nested = source.this if isinstance(source, exp.Subquery) else source
+        for select in _branches(nested):
+            for projection in select.expressions:
+                if projection.alias_or_name == column.name:
+                    inner = _unalias(projection)
+                    factor = 1.0 if isinstance(inner, exp.Column) else 0.8
+                    for table, name, confidence in _resolve(inner, select, deadline, depth + 1):
+                        yield table, name, min(confidence, factor)
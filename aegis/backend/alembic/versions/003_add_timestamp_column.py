@@ -0,0 +1,22 @@
+"""Add resolved timestamp_column to monitored_tables.
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("monitored_tables", sa.Column("timestamp_column", sa.String, nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("monitored_tables", "timestamp_column")
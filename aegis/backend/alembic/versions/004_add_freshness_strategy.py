@@ -0,0 +1,25 @@
+"""Add per-table freshness_strategy to monitored_tables.
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "monitored_tables",
+        sa.Column("freshness_strategy", sa.String, nullable=False, server_default="column"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("monitored_tables", "freshness_strategy")
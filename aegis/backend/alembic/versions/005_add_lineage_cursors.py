@@ -0,0 +1,33 @@
+"""Add lineage_cursors for incremental query-log processing.
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "lineage_cursors",
+        sa.Column(
+            "connection_id",
+            sa.Integer,
+            sa.ForeignKey("connections.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("last_executed_at", sa.DateTime, nullable=True),
+        sa.Column("boundary_keys", sa.Text, nullable=False, server_default="[]"),
+        sa.Column("updated_at", sa.DateTime, server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("lineage_cursors")
@@ -0,0 +1,28 @@
+"""Add parsed_queries, the persistent tier of the lineage parse cache.
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "parsed_queries",
+        sa.Column("query_key", sa.String, primary_key=True),
+        sa.Column("dialect", sa.String, nullable=False),
+        sa.Column("edges", sa.Text, nullable=False, server_default="[]"),
+        sa.Column("created_at", sa.DateTime, server_default=sa.func.now(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("parsed_queries")
@@ -0,0 +1,33 @@
+"""Add lineage_reachability, the materialized blast-radius closure.
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "lineage_reachability",
+        sa.Column("source_table", sa.String, primary_key=True),
+        sa.Column("target_table", sa.String, primary_key=True),
+        sa.Column("depth", sa.Integer, nullable=False),
+        sa.Column("confidence", sa.Float, nullable=False),
+        sa.Column("expires_at", sa.DateTime, nullable=False),
+    )
+    op.create_index(
+        "idx_reachability_source_depth", "lineage_reachability", ["source_table", "depth"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_reachability_source_depth", "lineage_reachability")
+    op.drop_table("lineage_reachability")
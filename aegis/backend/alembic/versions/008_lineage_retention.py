@@ -0,0 +1,53 @@
+"""Add lineage_edges_archive and covering indexes for live-edge traversal.
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "lineage_edges_archive",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("source_table", sa.String, nullable=False),
+        sa.Column("target_table", sa.String, nullable=False),
+        sa.Column("relationship_type", sa.String, nullable=False),
+        sa.Column("query_hash", sa.String, nullable=True),
+        sa.Column("confidence", sa.Float, nullable=False),
+        sa.Column("first_seen_at", sa.DateTime, nullable=False),
+        sa.Column("last_seen_at", sa.DateTime, nullable=False),
+        sa.Column("archived_at", sa.DateTime, nullable=False),
+    )
+
+    # The covering indexes lead with the same column, so the old ones are redundant.
+    op.drop_index("idx_lineage_source", "lineage_edges")
+    op.drop_index("idx_lineage_target", "lineage_edges")
+    op.create_index(
+        "idx_lineage_source_live",
+        "lineage_edges",
+        ["source_table", "last_seen_at", "target_table", "confidence"],
+    )
+    op.create_index(
+        "idx_lineage_target_live",
+        "lineage_edges",
+        ["target_table", "last_seen_at", "source_table", "confidence"],
+    )
+    op.create_index("idx_lineage_last_seen", "lineage_edges", ["last_seen_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_lineage_last_seen", "lineage_edges")
+    op.drop_index("idx_lineage_target_live", "lineage_edges")
+    op.drop_index("idx_lineage_source_live", "lineage_edges")
+    op.create_index("idx_lineage_source", "lineage_edges", ["source_table"])
+    op.create_index("idx_lineage_target", "lineage_edges", ["target_table"])
+    op.drop_table("lineage_edges_archive")
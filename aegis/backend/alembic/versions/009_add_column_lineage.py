@@ -0,0 +1,45 @@
+"""Add column_lineage_edges for column-level lineage.
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "column_lineage_edges",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column("source_table", sa.String, nullable=False),
+        sa.Column("source_column", sa.String, nullable=False),
+        sa.Column("target_table", sa.String, nullable=False),
+        sa.Column("target_column", sa.String, nullable=False),
+        sa.Column("confidence", sa.Float, nullable=False, server_default="1.0"),
+        sa.Column("first_seen_at", sa.DateTime, server_default=sa.func.now(), nullable=False),
+        sa.Column("last_seen_at", sa.DateTime, server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index(
+        "idx_column_lineage_source_live",
+        "column_lineage_edges",
+        ["source_table", "source_column", "last_seen_at", "target_table", "target_column"],
+    )
+    op.create_index(
+        "uq_column_lineage_edge",
+        "column_lineage_edges",
+        ["source_table", "source_column", "target_table", "target_column"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_column_lineage_edge", "column_lineage_edges")
+    op.drop_index("idx_column_lineage_source_live", "column_lineage_edges")
+    op.drop_table("column_lineage_edges")
@@ -0,0 +1,41 @@
+"""Add incident_jobs, the durable queue behind the incident worker pool.
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "010"
+down_revision = "009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "incident_jobs",
+        sa.Column("id", sa.Integer, primary_key=True, autoincrement=True),
+        sa.Column(
+            "incident_id",
+            sa.Integer,
+            sa.ForeignKey("incidents.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("anomaly_id", sa.Integer, sa.ForeignKey("anomalies.id"), nullable=False),
+        sa.Column("status", sa.String, nullable=False, server_default="pending"),
+        sa.Column("attempts", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text, nullable=True),
+        sa.Column("available_at", sa.DateTime, nullable=False),
+        sa.Column("locked_at", sa.DateTime, nullable=True),
+        sa.Column("created_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime, nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("idx_incident_jobs_claim", "incident_jobs", ["status", "available_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_incident_jobs_claim", "incident_jobs")
+    op.drop_table("incident_jobs")
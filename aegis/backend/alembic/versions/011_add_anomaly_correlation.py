@@ -0,0 +1,37 @@
+"""Add anomalies.correlated_incident_id for lineage-based incident correlation.
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Batch mode so the foreign key is created on SQLite as well.
+    with op.batch_alter_table("anomalies") as batch:
+        batch.add_column(sa.Column("correlated_incident_id", sa.Integer, nullable=True))
+        batch.create_foreign_key(
+            "fk_anomalies_correlated_incident",
+            "incidents",
+            ["correlated_incident_id"],
+            ["id"],
+            ondelete="SET NULL",
+        )
+    op.create_index(
+        "idx_anomalies_correlated_incident", "anomalies", ["correlated_incident_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_anomalies_correlated_incident", "anomalies")
+    with op.batch_alter_table("anomalies") as batch:
+        batch.drop_constraint("fk_anomalies_correlated_incident", type_="foreignkey")
+        batch.drop_column("correlated_incident_id")
@@ -0,0 +1,37 @@
+"""Add column_lineage_edges_archive and a last_seen_at index for retention.
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "012"
+down_revision = "011"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "column_lineage_edges_archive",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("source_table", sa.String, nullable=False),
+        sa.Column("source_column", sa.String, nullable=False),
+        sa.Column("target_table", sa.String, nullable=False),
+        sa.Column("target_column", sa.String, nullable=False),
+        sa.Column("confidence", sa.Float, nullable=False),
+        sa.Column("first_seen_at", sa.DateTime, nullable=False),
+        sa.Column("last_seen_at", sa.DateTime, nullable=False),
+        sa.Column("archived_at", sa.DateTime, nullable=False),
+    )
+    op.create_index(
+        "idx_column_lineage_last_seen", "column_lineage_edges", ["last_seen_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_column_lineage_last_seen", "column_lineage_edges")
+    op.drop_table("column_lineage_edges_archive")
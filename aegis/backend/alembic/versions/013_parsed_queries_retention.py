@@ -0,0 +1,21 @@
+"""Index parsed_queries.created_at for parse cache retention.
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "013"
+down_revision = "012"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_parsed_queries_created_at", "parsed_queries", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_parsed_queries_created_at", "parsed_queries")
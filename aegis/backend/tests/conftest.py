@@ -19,6 +19,24 @@ from aegis.core.models import (
 )
 
 
+@pytest.fixture(autouse=True)
+def _clear_diagnosis_cache():
+    """Cached diagnoses must not leak between tests."""
+    from aegis.core.diagnosis_cache import diagnosis_cache
+
+    diagnosis_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def _clear_timestamp_column_misses():
+    """Table ids restart with every in-memory database."""
+    from aegis.agents.sentinel import unresolved_timestamp_columns
+
+    unresolved_timestamp_columns.clear()
+    yield
+
+
 @pytest.fixture
 def db_engine():
     engine = create_engine("sqlite:///:memory:")
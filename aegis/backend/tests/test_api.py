@@ -115,6 +115,37 @@ class TestTableEndpoints:
         assert list_resp.status_code == 200
         assert len(list_resp.json()) >= 1
 
+    def test_update_rejects_unknown_timestamp_column(self, client):
+        import json
+
+        from aegis.core.database import SyncSessionLocal
+        from aegis.core.models import SchemaSnapshotModel
+
+        conn_id = client.post(
+            "/api/v1/connections",
+            json={"name": "ts-db", "dialect": "postgresql", "connection_uri": "postgresql://x/db"},
+        ).json()["id"]
+        table_id = client.post(
+            "/api/v1/tables",
+            json={"connection_id": conn_id, "schema_name": "public", "table_name": "users"},
+        ).json()["id"]
+        with SyncSessionLocal() as db:
+            db.add(SchemaSnapshotModel(
+                table_id=table_id,
+                columns=json.dumps([{"name": "id"}, {"name": "updated_at"}]),
+                snapshot_hash="h",
+            ))
+            db.commit()
+
+        bad = client.put(
+            f"/api/v1/tables/{table_id}", json={"timestamp_column": "id) FROM t; --"}
+        )
+        good = client.put(f"/api/v1/tables/{table_id}", json={"timestamp_column": "updated_at"})
+
+        assert bad.status_code == 422
+        assert good.status_code == 200
+        assert good.json()["timestamp_column"] == "updated_at"
+
 
 class TestIncidentEndpoints:
     def test_list_incidents_empty(self, client):
@@ -122,6 +153,52 @@ class TestIncidentEndpoints:
         assert response.status_code == 200
         assert response.json() == []
 
+    def test_correlated_anomalies(self, client):
+        import json
+        from datetime import datetime, timezone
+
+        from aegis.core.database import SyncSessionLocal
+        from aegis.core.models import (
+            AnomalyModel,
+            ConnectionModel,
+            IncidentModel,
+            MonitoredTableModel,
+        )
+
+        with SyncSessionLocal() as db:
+            conn = ConnectionModel(name="c", dialect="postgresql", connection_uri="x")
+            db.add(conn)
+            db.flush()
+            table = MonitoredTableModel(
+                connection_id=conn.id, schema_name="raw", table_name="a",
+                fully_qualified_name="raw.a",
+            )
+            db.add(table)
+            db.flush()
+            root, downstream = (
+                AnomalyModel(
+                    table_id=table.id, type="schema_drift", severity="high",
+                    detail=json.dumps([{"change": "column_deleted", "column": "id"}]),
+                    detected_at=datetime.now(timezone.utc),
+                )
+                for _ in range(2)
+            )
+            db.add_all([root, downstream])
+            db.flush()
+            incident = IncidentModel(anomaly_id=root.id, severity="high")
+            db.add(incident)
+            db.flush()
+            downstream.correlated_incident_id = incident.id
+            db.commit()
+            incident_id, downstream_id = incident.id, downstream.id
+
+        response = client.get(f"/api/v1/incidents/{incident_id}/correlated")
+        assert response.status_code == 200
+        [anomaly] = response.json()
+        assert anomaly["id"] == downstream_id
+        assert anomaly["correlated_incident_id"] == incident_id
+        assert client.get("/api/v1/incidents/999/correlated").status_code == 404
+
 
 class TestLineageEndpoints:
     def test_get_full_graph_empty(self, client):
@@ -130,3 +207,42 @@ class TestLineageEndpoints:
         data = response.json()
         assert "nodes" in data
         assert "edges" in data
+
+    def test_get_full_graph_ndjson_stream(self, client):
+        import json
+
+        from aegis.core.database import SyncSessionLocal
+        from aegis.core.models import LineageEdgeModel
+
+        with SyncSessionLocal() as db:
+            db.add_all([
+                LineageEdgeModel(source_table="raw.a", target_table="stg.a"),
+                LineageEdgeModel(source_table="stg.a", target_table="mart.a"),
+            ])
+            db.commit()
+
+        response = client.get("/api/v1/lineage/graph", params={"format": "ndjson"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert [r["type"] for r in records] == ["node", "node", "edge", "node", "edge"]
+
+        page = client.get("/api/v1/lineage/graph", params={"limit": 1}).json()
+        assert len(page["edges"]) == 1
+        rest = client.get(
+            "/api/v1/lineage/graph", params={"cursor": page["next_cursor"], "limit": 1}
+        ).json()
+        assert rest["edges"][0]["source"] == "stg.a"
+        assert rest["next_cursor"] is None
+
+    def test_top_paths(self, client):
+        response = client.get(
+            "/api/v1/lineage/paths", params={"source": "raw.a", "target": "mart.a", "k": 2}
+        )
+        assert response.status_code == 200
+        assert response.json() == {"source": "raw.a", "target": "mart.a", "paths": []}
+
+    def test_column_blast_radius(self, client):
+        response = client.get("/api/v1/lineage/raw.a/columns/id/blast-radius")
+        assert response.status_code == 200
+        assert response.json()["affected_columns"] == []
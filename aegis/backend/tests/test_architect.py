@@ -1,10 +1,12 @@
 """Tests for Architect agent — prompt construction, parsing, fallback."""
 
 import json
+from datetime import datetime, timezone
 from unittest.mock import MagicMock, patch
 
 from aegis.agents.architect import Architect
-from aegis.core.models import AnomalyModel
+from aegis.config import settings
+from aegis.core.models import AnomalyModel, MonitoredTableModel
 
 
 class TestArchitect:
@@ -78,3 +80,177 @@ class TestArchitect:
             diagnosis = architect.analyze(sample_anomaly, db)
 
             assert "analytics.daily_revenue" in diagnosis.blast_radius
+
+    def test_recurring_anomaly_reuses_cached_diagnosis(self, db, sample_table, sample_anomaly):
+        """A second anomaly with the same fingerprint skips the LLM."""
+        llm_response = {
+            "root_cause": "Upstream dropped price",
+            "root_cause_table": "public.orders",
+            "blast_radius": [],
+            "severity": "critical",
+            "confidence": 0.9,
+            "recommendations": [],
+        }
+        repeat = AnomalyModel(
+            table_id=sample_table.id,
+            type=sample_anomaly.type,
+            severity=sample_anomaly.severity,
+            detail=sample_anomaly.detail,
+            detected_at=sample_anomaly.detected_at,
+        )
+        db.add(repeat)
+        db.flush()
+
+        with patch("aegis.agents.architect.llm_client") as mock_llm, \
+                patch.object(settings, "diagnosis_cache_enabled", True):
+            mock_llm.diagnose.return_value = llm_response
+            architect = Architect(lineage_graph=None)
+            first = architect.analyze(sample_anomaly, db)
+            second = architect.analyze(repeat, db)
+
+        assert mock_llm.diagnose.call_count == 1
+        assert first.cached is False
+        assert second.cached is True
+        assert second.root_cause == first.root_cause
+
+
+def _anomaly(db, connection, fqn, kind="schema_drift"):
+    schema, name = fqn.split(".")
+    table = MonitoredTableModel(
+        connection_id=connection.id, schema_name=schema, table_name=name,
+        fully_qualified_name=fqn,
+    )
+    db.add(table)
+    db.flush()
+    anomaly = AnomalyModel(
+        table_id=table.id, type=kind, severity="high",
+        detail=json.dumps([{"change": "column_deleted", "column": name}]),
+        detected_at=datetime.now(timezone.utc),
+    )
+    db.add(anomaly)
+    db.flush()
+    return anomaly
+
+
+def _lineage(upstream):
+    lineage = MagicMock()
+    lineage.get_upstream.side_effect = lambda table, depth: [
+        {"table": t, "depth": 1, "confidence": 1.0} for t in upstream.get(table, [])
+    ]
+    lineage.get_downstream.return_value = []
+    return lineage
+
+
+def _llm_diagnosis(table, **extra):
+    return {
+        "root_cause": f"Column dropped in {table}",
+        "root_cause_table": table,
+        "blast_radius": [],
+        "severity": "high",
+        "confidence": 0.8,
+        "recommendations": [],
+        **extra,
+    }
+
+
+@patch.object(settings, "diagnosis_batch_enabled", True)
+class TestBatchDiagnosis:
+    def test_groups_by_lineage_root(self, db, sample_connection):
+        staging = _anomaly(db, sample_connection, "staging.orders")
+        analytics = _anomaly(db, sample_connection, "analytics.orders")
+        sibling = _anomaly(db, sample_connection, "analytics.refunds")
+        other = _anomaly(db, sample_connection, "crm.contacts")
+        architect = Architect(lineage_graph=_lineage({
+            "staging.orders": ["raw.orders"],
+            "analytics.orders": ["staging.orders", "raw.orders"],
+            "analytics.refunds": ["raw.orders"],
+            "crm.contacts": ["raw.contacts"],
+        }))
+
+        groups = architect._group_by_root([analytics, other, staging, sibling], db)
+
+        assert {root: [a.id for a in group] for root, group in groups} == {
+            "raw.orders": [analytics.id, staging.id, sibling.id],
+            None: [other.id],
+        }
+
+    def test_one_llm_call_per_group(self, db, sample_connection):
+        staging = _anomaly(db, sample_connection, "staging.orders")
+        analytics = _anomaly(db, sample_connection, "analytics.orders")
+        architect = Architect(lineage_graph=_lineage({
+            "analytics.orders": ["staging.orders"],
+        }))
+        response = {"diagnoses": [
+            _llm_diagnosis("staging.orders", anomaly_id=staging.id),
+            _llm_diagnosis("staging.orders", anomaly_id=analytics.id, confidence=0.9),
+        ]}
+
+        with patch("aegis.agents.architect.llm_client") as mock_llm:
+            mock_llm.diagnose_many.return_value = [response]
+            diagnoses = architect.analyze_many([staging, analytics], db)
+
+        mock_llm.diagnose_many.assert_called_once()
+        [(prompt, _)] = mock_llm.diagnose_many.call_args[0][0]
+        assert "Likely root: staging.orders" in prompt
+        assert f"## Anomaly {staging.id}" in prompt and f"## Anomaly {analytics.id}" in prompt
+        assert diagnoses[analytics.id].confidence == 0.9
+        assert diagnoses[staging.id].root_cause_table == "staging.orders"
+
+    def test_groups_are_sent_in_one_round(self, db, sample_connection):
+        anomalies = [
+            _anomaly(db, sample_connection, t)
+            for t in ("staging.orders", "mart.orders", "staging.contacts", "mart.contacts")
+        ]
+        architect = Architect(lineage_graph=_lineage({
+            "mart.orders": ["staging.orders"],
+            "mart.contacts": ["staging.contacts"],
+        }))
+
+        with patch("aegis.agents.architect.llm_client") as mock_llm:
+            response = {"diagnoses": [
+                _llm_diagnosis("staging.orders", anomaly_id=a.id) for a in anomalies
+            ]}
+            mock_llm.diagnose_many.return_value = [response, response]
+            diagnoses = architect.analyze_many(anomalies, db)
+
+        mock_llm.diagnose_many.assert_called_once()
+        assert len(mock_llm.diagnose_many.call_args[0][0]) == 2
+        mock_llm.diagnose.assert_not_called()
+        assert set(diagnoses) == {a.id for a in anomalies}
+
+    def test_anomaly_missing_from_batch_is_diagnosed_alone(self, db, sample_connection):
+        staging = _anomaly(db, sample_connection, "staging.orders")
+        analytics = _anomaly(db, sample_connection, "analytics.orders")
+        architect = Architect(lineage_graph=_lineage({
+            "analytics.orders": ["staging.orders"],
+        }))
+
+        with patch("aegis.agents.architect.llm_client") as mock_llm:
+            mock_llm.diagnose_many.side_effect = [
+                [{"diagnoses": [_llm_diagnosis("staging.orders", anomaly_id=staging.id)]}],
+                [_llm_diagnosis("analytics.orders")],
+            ]
+            diagnoses = architect.analyze_many([staging, analytics], db)
+
+        assert mock_llm.diagnose_many.call_count == 2
+        assert diagnoses[analytics.id].root_cause_table == "analytics.orders"
+
+    def test_batch_results_fill_the_diagnosis_cache(self, db, sample_connection):
+        staging = _anomaly(db, sample_connection, "staging.orders")
+        analytics = _anomaly(db, sample_connection, "analytics.orders")
+        architect = Architect(lineage_graph=_lineage({
+            "analytics.orders": ["staging.orders"],
+        }))
+
+        with patch("aegis.agents.architect.llm_client") as mock_llm, \
+                patch.object(settings, "diagnosis_cache_enabled", True):
+            mock_llm.diagnose_many.return_value = [{"diagnoses": [
+                _llm_diagnosis("staging.orders", anomaly_id=staging.id),
+                _llm_diagnosis("staging.orders", anomaly_id=analytics.id),
+            ]}]
+            architect.analyze_many([staging, analytics], db)
+            again = architect.analyze(staging, db)
+
+        assert mock_llm.diagnose_many.call_count == 1
+        mock_llm.diagnose.assert_not_called()
+        assert again.cached is True
@@ -1,10 +1,16 @@
 """Tests for WarehouseConnector discovery methods."""
 
+from datetime import datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
+from sqlalchemy import text
 
-from aegis.core.connectors import WarehouseConnector
+from aegis.core.connectors import (
+    ConnectorRegistry,
+    WarehouseConnector,
+    resolve_timestamp_column,
+)
 
 
 @pytest.fixture
@@ -72,3 +78,278 @@ class TestListTables:
         assert len(tables) == 2
         assert tables[0] == {"name": "users", "type": "BASE TABLE", "schema": "public"}
         assert tables[1] == {"name": "active_users", "type": "VIEW", "schema": "public"}
+
+
+class TestFetchSchemas:
+    def test_groups_columns_by_table_in_one_query(self, mock_connector):
+        connector, engine = mock_connector
+        mock_conn = MagicMock()
+        engine.connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        engine.connect.return_value.__exit__ = MagicMock(return_value=False)
+
+        mock_conn.execute.return_value.fetchall.return_value = [
+            ("public", "orders", "id", "integer", "NO", 1),
+            ("public", "orders", "price", "numeric", "YES", 2),
+            ("public", "users", "id", "integer", "NO", 1),
+        ]
+
+        schemas = connector.fetch_schemas(["public"])
+
+        assert mock_conn.execute.call_count == 1
+        assert set(schemas) == {("public", "orders"), ("public", "users")}
+        assert schemas[("public", "orders")][1] == {
+            "name": "price", "type": "numeric", "nullable": True, "ordinal": 2,
+        }
+
+    def test_whole_connection_skips_system_schemas(self, mock_connector):
+        connector, engine = mock_connector
+        mock_conn = MagicMock()
+        engine.connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        engine.connect.return_value.__exit__ = MagicMock(return_value=False)
+
+        mock_conn.execute.return_value.fetchall.return_value = [
+            ("information_schema", "tables", "table_name", "text", "YES", 1),
+            ("public", "orders", "id", "integer", "NO", 1),
+        ]
+
+        schemas = connector.fetch_schemas()
+        assert list(schemas) == [("public", "orders")]
+
+
+class TestFetchLastUpdateTimes:
+    @pytest.fixture
+    def sqlite_connector(self):
+        connector = WarehouseConnector("sqlite:///:memory:", "sqlite")
+        with connector._engine.begin() as conn:
+            conn.execute(text("CREATE TABLE orders (id INTEGER, updated_at TEXT)"))
+            conn.execute(text("INSERT INTO orders VALUES (1, '2026-01-01T10:00:00')"))
+            conn.execute(text("CREATE TABLE users (id INTEGER, created_at TEXT)"))
+            conn.execute(text("INSERT INTO users VALUES (1, '2026-01-02T10:00:00')"))
+        yield connector
+        connector.dispose()
+
+    def test_batches_known_columns_into_one_statement(self, sqlite_connector):
+        single_probe = sqlite_connector.fetch_last_update_time
+        with patch.object(sqlite_connector, "fetch_last_update_time", wraps=single_probe) as single:
+            result = sqlite_connector.fetch_last_update_times([
+                ("main", "orders", "updated_at"),
+                ("main", "users", "created_at"),
+            ])
+
+        single.assert_not_called()
+        assert result[("main", "orders")] == datetime(2026, 1, 1, 10, 0)
+        assert result[("main", "users")] == datetime(2026, 1, 2, 10, 0)
+
+    def test_broken_table_is_isolated(self, sqlite_connector):
+        result = sqlite_connector.fetch_last_update_times([
+            ("main", "orders", "updated_at"),
+            ("main", "users", "no_such_column"),
+        ])
+
+        assert result == {("main", "orders"): datetime(2026, 1, 1, 10, 0)}
+
+    def test_unknown_column_uses_candidate_probe(self, sqlite_connector):
+        result = sqlite_connector.fetch_last_update_times([("main", "users", None)])
+        assert result == {("main", "users"): datetime(2026, 1, 2, 10, 0)}
+
+    def test_identifiers_are_quoted_not_interpolated(self, sqlite_connector):
+        with sqlite_connector._engine.begin() as conn:
+            conn.execute(text('CREATE TABLE events ("loaded at" TEXT)'))
+            conn.execute(text("INSERT INTO events VALUES ('2026-01-03T10:00:00')"))
+        injected = "id) + (SELECT 1"  # valid SQL if spliced in unquoted
+
+        result = sqlite_connector.fetch_last_update_times([
+            ("main", "events", "loaded at"),
+            ("main", "orders", injected),
+        ])
+
+        assert result == {("main", "events"): datetime(2026, 1, 3, 10, 0)}
+        with pytest.raises(Exception):  # unquoted, this would return MAX(id) + 1
+            sqlite_connector.fetch_last_update_time("main", "orders", injected)
+
+
+    def test_postgres_casts_every_branch_under_utc(self, mock_connector):
+        connector, engine = mock_connector
+        mock_conn = MagicMock()
+        engine.connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        engine.connect.return_value.__exit__ = MagicMock(return_value=False)
+        engine.dialect.identifier_preparer.quote.side_effect = lambda name: name
+        mock_conn.execute.return_value.fetchall.return_value = []
+
+        connector.fetch_last_update_times([("s", "a", "ts"), ("s", "b", "ts_tz")])
+
+        set_zone, batch = (str(c.args[0]) for c in mock_conn.execute.call_args_list)
+        assert set_zone == "SET LOCAL TIME ZONE 'UTC'"
+        assert batch.count("AS TIMESTAMPTZ)") == 2
+
+    def test_bigquery_casts_every_branch_to_timestamp(self, mock_connector):
+        connector, engine = mock_connector
+        connector.dialect = "bigquery"
+        mock_conn = MagicMock()
+        engine.connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        engine.connect.return_value.__exit__ = MagicMock(return_value=False)
+        engine.dialect.identifier_preparer.quote.side_effect = lambda name: name
+        mock_conn.execute.return_value.fetchall.return_value = []
+
+        connector.fetch_last_update_times([("d", "a", "ts"), ("d", "b", "dt")])
+
+        [batch] = (str(c.args[0]) for c in mock_conn.execute.call_args_list)
+        assert batch == (
+            "SELECT 0 AS idx, CAST(MAX(ts) AS TIMESTAMP) AS last_update FROM d.a UNION ALL "
+            "SELECT 1 AS idx, CAST(MAX(dt) AS TIMESTAMP) AS last_update FROM d.b"
+        )
+
+
+class TestMetadataFreshness:
+    def _rows(self, engine, rows):
+        mock_conn = MagicMock()
+        engine.connect.return_value.__enter__ = MagicMock(return_value=mock_conn)
+        engine.connect.return_value.__exit__ = MagicMock(return_value=False)
+        mock_conn.execute.return_value.fetchall.return_value = rows
+        return mock_conn
+
+    def test_snowflake_reads_last_altered(self, mock_connector):
+        connector, engine = mock_connector
+        connector.dialect = "snowflake"
+        altered = datetime(2026, 3, 1, 8, 0)
+        self._rows(engine, [("ORDERS", altered)])
+
+        result = connector.fetch_metadata_last_modified([("PUBLIC", "ORDERS")])
+        assert result == {("PUBLIC", "ORDERS"): altered}
+
+    def test_postgres_dates_change_when_counters_move(self, mock_connector):
+        connector, engine = mock_connector
+        self._rows(engine, [("orders", 100)])
+        # First sighting has no baseline
+        assert connector.fetch_metadata_last_modified([("public", "orders")]) == {
+            ("public", "orders"): None
+        }
+
+        self._rows(engine, [("orders", 120)])
+        changed = connector.fetch_metadata_last_modified([("public", "orders")])
+        assert ("public", "orders") in changed
+
+        # Unchanged counters keep reporting the observed change time
+        self._rows(engine, [("orders", 120)])
+        assert connector.fetch_metadata_last_modified([("public", "orders")]) == changed
+
+    def test_unsupported_dialect_returns_nothing(self, mock_connector):
+        connector, _ = mock_connector
+        connector.dialect = "databricks"
+        assert connector.fetch_metadata_last_modified([("s", "t")]) == {}
+
+    def test_batch_falls_back_to_column_probe_for_unanswered_tables(self, mock_connector):
+        connector, _ = mock_connector
+        altered = datetime(2026, 3, 1, 8, 0)
+        probed = datetime(2026, 3, 2, 8, 0)
+        with patch.object(
+            connector, "fetch_metadata_last_modified", return_value={("s", "a"): altered}
+        ), patch.object(
+            connector, "_max_timestamps", return_value={("s", "b"): probed}
+        ) as column_probe:
+            result = connector.fetch_last_update_times(
+                [("s", "a", "updated_at"), ("s", "b", "updated_at")],
+                metadata_tables={("s", "a"), ("s", "b")},
+            )
+
+        assert result == {("s", "a"): altered, ("s", "b"): probed}
+        column_probe.assert_called_once_with([("s", "b", "updated_at")])
+
+    def test_undated_table_without_column_is_not_probed(self, mock_connector):
+        connector, _ = mock_connector
+        probed = datetime(2026, 3, 2, 8, 0)
+        undated = {("s", "a"): None, ("s", "b"): None}
+        with patch.object(
+            connector, "fetch_metadata_last_modified", return_value=undated
+        ), patch.object(
+            connector, "_max_timestamps", return_value={("s", "b"): probed}
+        ) as column_probe, patch.object(connector, "fetch_last_update_time") as candidates:
+            result = connector.fetch_last_update_times(
+                [("s", "a", None), ("s", "b", "updated_at")],
+                metadata_tables={("s", "a"), ("s", "b")},
+            )
+
+        assert result == {("s", "a"): None, ("s", "b"): probed}
+        candidates.assert_not_called()
+        column_probe.assert_called_once_with([("s", "b", "updated_at")])
+
+
+class TestResolveTimestampColumn:
+    def test_prefers_candidates_in_priority_order(self):
+        columns = [{"name": "CREATED_AT"}, {"name": "Updated_At"}, {"name": "id"}]
+        assert resolve_timestamp_column(columns) == "Updated_At"
+
+    def test_returns_none_without_candidates(self):
+        assert resolve_timestamp_column([{"name": "id"}, {"name": "price"}]) is None
+
+
+class TestConnectorRegistry:
+    def test_reuses_engine_for_same_connection(self):
+        registry = ConnectorRegistry(idle_timeout_seconds=60)
+        first = registry.get(1, "sqlite:///:memory:", "sqlite")
+        second = registry.get(1, "sqlite:///:memory:", "sqlite")
+
+        assert first is second
+        stats = registry.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["connections"][0]["checkouts"] == 2
+
+    def test_rebuilds_when_uri_changes(self):
+        registry = ConnectorRegistry(idle_timeout_seconds=60)
+        with registry.checkout(1, "sqlite:///:memory:", "sqlite") as first:
+            pass
+        with patch.object(first, "dispose") as dispose:
+            second = registry.get(1, "sqlite:///other.db", "sqlite")
+
+        assert first is not second
+        dispose.assert_called_once()
+
+    def test_evicts_idle_engines(self):
+        registry = ConnectorRegistry(idle_timeout_seconds=0)
+        with registry.checkout(1, "sqlite:///:memory:", "sqlite"):
+            pass
+
+        assert registry.evict_idle() == 1
+        assert registry.stats()["engines"] == 0
+
+    def test_does_not_evict_checked_out_engine(self):
+        registry = ConnectorRegistry(idle_timeout_seconds=0)
+        connector = registry.get(1, "sqlite:///:memory:", "sqlite")
+
+        assert registry.evict_idle() == 0
+        assert registry.stats()["connections"][0]["in_use"] == 1
+
+        registry.release(1, connector)
+        assert registry.evict_idle() == 1
+
+    def test_invalidate_defers_dispose_until_released(self):
+        registry = ConnectorRegistry(idle_timeout_seconds=60)
+        connector = registry.get(1, "sqlite:///:memory:", "sqlite")
+        with patch.object(connector, "dispose") as dispose:
+            registry.invalidate(1)
+            dispose.assert_not_called()
+            assert registry.stats()["engines"] == 0
+
+            registry.release(1, connector)
+            dispose.assert_called_once()
+
+    def test_change_markers_survive_idle_eviction(self):
+        registry = ConnectorRegistry(idle_timeout_seconds=0)
+        with registry.checkout(1, "sqlite:///:memory:", "sqlite") as first:
+            first._change_markers[("public", "orders")] = (5, None)
+        registry.evict_idle()
+
+        with registry.checkout(1, "sqlite:///:memory:", "sqlite") as second:
+            assert second is not first
+            assert second._change_markers == {("public", "orders"): (5, None)}
+
+    def test_invalidate_disposes_engine(self):
+        registry = ConnectorRegistry(idle_timeout_seconds=60)
+        with registry.checkout(1, "sqlite:///:memory:", "sqlite") as connector:
+            pass
+        with patch.object(connector, "dispose") as dispose:
+            registry.invalidate(1)
+
+        dispose.assert_called_once()
+        assert registry.stats()["engines"] == 0
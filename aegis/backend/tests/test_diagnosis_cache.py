@@ -0,0 +1,88 @@
+"""Tests for the diagnosis cache and anomaly fingerprints."""
+
+from aegis.core.diagnosis_cache import DiagnosisCache, anomaly_fingerprint
+from aegis.core.models import Diagnosis, Recommendation
+
+_DRIFT = [{"change": "column_added", "column": "note", "new_type": "TEXT"}]
+
+
+def _diagnosis(table="staging.orders"):
+    return Diagnosis(
+        root_cause=f"Upstream loader added a nullable column to {table}",
+        root_cause_table=table,
+        blast_radius=["mart.orders"],
+        severity="low",
+        confidence=0.9,
+        recommendations=[Recommendation(action="ack", description="Expected", priority=3)],
+    )
+
+
+class TestFingerprint:
+    def test_ignores_volatile_detail_and_order(self):
+        first = {"last_update": "2026-01-01T00:00:00", "sla_minutes": 60, "minutes_overdue": 12}
+        second = {"last_update": "2026-01-02T00:00:00", "sla_minutes": 60, "minutes_overdue": 47}
+        assert anomaly_fingerprint("freshness_violation", "high", first, ["raw.a"], 1) == \
+            anomaly_fingerprint("freshness_violation", "high", second, ["raw.a"], 1)
+
+        changes = [{"change": "a", "column": "x"}, {"change": "b", "column": "y"}]
+        assert anomaly_fingerprint("schema_drift", "low", changes, ["b", "a"], 0) == \
+            anomaly_fingerprint("schema_drift", "low", changes[::-1], ["a", "b"], 0)
+
+    def test_neighborhood_and_changes_matter(self):
+        base = anomaly_fingerprint("schema_drift", "low", _DRIFT, ["raw.orders"], 2)
+        assert base != anomaly_fingerprint("schema_drift", "low", _DRIFT, ["raw.users"], 2)
+        assert base != anomaly_fingerprint("schema_drift", "low", _DRIFT, ["raw.orders"], 3)
+        other = [{**_DRIFT[0], "column": "memo"}]
+        assert base != anomaly_fingerprint("schema_drift", "low", other, ["raw.orders"], 2)
+
+
+class TestDiagnosisCache:
+    def test_hit_is_rewritten_for_sibling_table(self):
+        cache = DiagnosisCache(maxsize=10, ttl_seconds=60)
+        cache.put("fp", "staging.orders", _diagnosis(), ["raw.orders"])
+
+        hit = cache.get("fp", "staging.refunds")
+
+        assert hit.cached is True
+        assert hit.root_cause_table == "staging.refunds"
+        assert hit.root_cause.endswith("staging.refunds")
+        assert cache.get("fp", "staging.orders").root_cause_table == "staging.orders"
+        assert cache.stats()["hits"] == 2
+
+    def test_hit_rewrites_recommendations_by_whole_name(self):
+        diagnosis = _diagnosis()
+        diagnosis.root_cause = "staging.orders gained a column; staging.orders_v2 did not"
+        diagnosis.recommendations = [Recommendation(
+            action="update_downstream",
+            description="Backfill staging.orders.note",
+            sql="ALTER TABLE staging.orders ALTER COLUMN note SET DEFAULT ''",
+        )]
+        cache = DiagnosisCache(maxsize=10, ttl_seconds=60)
+        cache.put("fp", "staging.orders", diagnosis, [])
+
+        hit = cache.get("fp", "staging.refunds")
+
+        assert hit.root_cause == "staging.refunds gained a column; staging.orders_v2 did not"
+        [recommendation] = hit.recommendations
+        assert recommendation.description == "Backfill staging.refunds.note"
+        assert recommendation.sql == (
+            "ALTER TABLE staging.refunds ALTER COLUMN note SET DEFAULT ''"
+        )
+
+    def test_ttl_expiry(self):
+        now = [0.0]
+        cache = DiagnosisCache(maxsize=10, ttl_seconds=60, clock=lambda: now[0])
+        cache.put("fp", "staging.orders", _diagnosis(), [])
+
+        now[0] = 61
+        assert cache.get("fp", "staging.orders") is None
+        assert cache.stats()["size"] == 0
+
+    def test_lineage_change_invalidates_neighborhood(self):
+        cache = DiagnosisCache(maxsize=10, ttl_seconds=60)
+        cache.put("a", "staging.orders", _diagnosis(), ["raw.orders", "mart.orders"])
+        cache.put("b", "staging.users", _diagnosis("staging.users"), ["raw.users"])
+
+        assert cache.invalidate_tables({"mart.orders"}) == 1
+        assert cache.get("a", "staging.orders") is None
+        assert cache.get("b", "staging.users") is not None
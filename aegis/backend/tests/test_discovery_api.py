@@ -67,10 +67,10 @@ def mock_discovery_report():
 
 def test_discover_endpoint(client, mock_discovery_report):
     with patch("aegis.api.discovery.Investigator") as MockInvestigator, \
-         patch("aegis.api.discovery.WarehouseConnector") as MockConnector:
+         patch("aegis.api.discovery.connector_registry") as mock_registry:
         mock_inv = MockInvestigator.return_value
         mock_inv.discover.return_value = mock_discovery_report
-        mock_conn = MockConnector.return_value
+        mock_conn = mock_registry.checkout.return_value.__enter__.return_value
 
         # Create connection first
         resp = client.post(
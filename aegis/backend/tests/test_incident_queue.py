@@ -0,0 +1,294 @@
+"""Tests for the durable incident queue and its worker pool."""
+
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine, delete, text
+from sqlalchemy.orm import sessionmaker
+
+from aegis.agents.architect import Architect
+from aegis.agents.orchestrator import Orchestrator
+from aegis.config import settings
+from aegis.core.database import Base
+from aegis.core.models import (
+    AnomalyModel,
+    ConnectionModel,
+    IncidentJobModel,
+    IncidentModel,
+    MonitoredTableModel,
+)
+from aegis.services.incident_queue import IncidentQueue, IncidentWorkerPool
+from tests.test_orchestrator import _mock_architect, _mock_executor
+
+
+class _SessionFactory:
+    """Hands the test session to the pool without letting it be closed."""
+
+    def __init__(self, db):
+        self.db = db
+
+    def __call__(self):
+        return self
+
+    def __enter__(self):
+        return self.db
+
+    def __exit__(self, *exc):
+        return False
+
+
+def _seed_anomaly(db):
+    conn = ConnectionModel(name="c", dialect="postgresql", connection_uri="x")
+    db.add(conn)
+    db.flush()
+    table = MonitoredTableModel(
+        connection_id=conn.id, schema_name="public", table_name="t",
+        fully_qualified_name="public.t",
+    )
+    db.add(table)
+    db.flush()
+    anomaly = AnomalyModel(
+        table_id=table.id, type="schema_drift", severity="high", detail="[]",
+        detected_at=datetime.now(timezone.utc),
+    )
+    db.add(anomaly)
+    db.flush()
+    return anomaly
+
+
+def _pool(db):
+    def orchestrator(_db):
+        return Orchestrator(_mock_architect(), _mock_executor())
+
+    return IncidentWorkerPool(
+        IncidentQueue(), session_factory=_SessionFactory(db), orchestrator_factory=orchestrator
+    )
+
+
+class TestIncidentQueue:
+    def test_handle_anomaly_only_enqueues(self, db, sample_anomaly):
+        architect = _mock_architect()
+        orchestrator = Orchestrator(architect, _mock_executor(), work_queue=IncidentQueue())
+
+        incident = orchestrator.handle_anomaly(sample_anomaly, db)
+
+        architect.analyze.assert_not_called()
+        assert incident.status == "investigating"
+        assert incident.diagnosis is None
+        job = db.query(IncidentJobModel).one()
+        assert (job.incident_id, job.status) == (incident.id, "pending")
+
+    def test_worker_processes_job(self, db, sample_anomaly):
+        Orchestrator(_mock_architect(), _mock_executor(), work_queue=IncidentQueue()) \
+            .handle_anomaly(sample_anomaly, db)
+        db.commit()
+        pool = _pool(db)
+
+        assert pool.run_once() is True
+        assert pool.run_once() is False
+
+        incident = db.query(IncidentModel).one()
+        assert incident.status == "pending_review"
+        assert incident.severity == "critical"
+        assert incident.report is not None
+        job = db.query(IncidentJobModel).one()
+        assert (job.status, job.attempts) == ("done", 1)
+        assert pool.stats()["processed"] == 1
+
+    def test_worker_diagnoses_a_cycle_together(self, db, sample_table):
+        architect = _mock_architect()
+        orchestrator = Orchestrator(architect, _mock_executor(), work_queue=IncidentQueue())
+        for kind in ("schema_drift", "freshness_violation"):
+            anomaly = AnomalyModel(
+                table_id=sample_table.id, type=kind, severity="high", detail="[]",
+                detected_at=datetime.now(timezone.utc),
+            )
+            db.add(anomaly)
+            db.flush()
+            orchestrator.handle_anomaly(anomaly, db)
+        db.commit()
+        pool = _pool(db)
+        pool._orchestrator_factory = lambda _db: Orchestrator(architect, _mock_executor())
+
+        assert pool.run_once() is True
+
+        architect.analyze_many.assert_called_once()
+        architect.analyze.assert_not_called()
+        assert {j.status for j in db.query(IncidentJobModel)} == {"done"}
+        assert pool.stats()["processed"] == 2
+
+    def test_failed_job_backs_off_then_gives_up(self, db, sample_anomaly):
+        Orchestrator(_mock_architect(), _mock_executor(), work_queue=IncidentQueue()) \
+            .handle_anomaly(sample_anomaly, db)
+        db.commit()
+        pool = _pool(db)
+        pool._orchestrator_factory = MagicMock(side_effect=RuntimeError("boom"))
+
+        with patch("aegis.services.incident_queue.settings") as settings:
+            settings.incident_job_max_attempts = 2
+            settings.incident_job_retry_seconds = 60
+            settings.incident_job_visibility_timeout_seconds = 900
+            settings.incident_job_batch_size = 20
+
+            assert pool.run_once() is True
+            job = db.query(IncidentJobModel).one()
+            assert job.status == "pending"
+            assert job.last_error == "RuntimeError: boom"
+            assert pool.run_once() is False  # still backing off
+
+            job.available_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+            db.commit()
+            assert pool.run_once() is True
+
+        job = db.query(IncidentJobModel).populate_existing().one()
+        assert (job.status, job.attempts) == ("failed", 2)
+
+    def test_stale_running_job_is_reclaimed(self, db, sample_anomaly):
+        incident = IncidentModel(anomaly_id=sample_anomaly.id, severity="high")
+        db.add(incident)
+        db.flush()
+        db.add(IncidentJobModel(
+            incident_id=incident.id,
+            anomaly_id=sample_anomaly.id,
+            status="running",
+            attempts=1,
+            available_at=datetime.now(timezone.utc) - timedelta(hours=2),
+            locked_at=datetime.now(timezone.utc) - timedelta(hours=1),
+        ))
+        db.commit()
+        queue = IncidentQueue()
+
+        [job] = queue.claim(db)
+
+        assert job.attempts == 2
+        assert queue.claim(db) == []  # freshly locked now
+
+    def test_expired_job_on_last_attempt_is_failed(self, db, sample_anomaly):
+        incident = IncidentModel(anomaly_id=sample_anomaly.id, severity="high")
+        db.add(incident)
+        db.flush()
+        db.add(IncidentJobModel(
+            incident_id=incident.id,
+            anomaly_id=sample_anomaly.id,
+            status="running",
+            attempts=settings.incident_job_max_attempts,
+            available_at=datetime.now(timezone.utc) - timedelta(hours=2),
+            locked_at=datetime.now(timezone.utc) - timedelta(hours=1),
+        ))
+        db.commit()
+
+        assert IncidentQueue().claim(db) == []
+
+        job = db.query(IncidentJobModel).populate_existing().one()
+        assert (job.status, job.locked_at) == ("failed", None)
+        assert job.last_error.startswith("LeaseExpired")
+
+    def test_failed_llm_diagnosis_is_retried_then_falls_back(self, db, sample_anomaly):
+        Orchestrator(_mock_architect(), _mock_executor(), work_queue=IncidentQueue()) \
+            .handle_anomaly(sample_anomaly, db)
+        db.commit()
+        pool = _pool(db)
+        pool._orchestrator_factory = lambda _db: Orchestrator(Architect(), _mock_executor())
+
+        with patch("aegis.agents.architect.llm_client") as llm, \
+             patch.object(settings, "openai_api_key", "test-key"):
+            llm.diagnose_many.side_effect = lambda requests: [None] * len(requests)
+
+            assert pool.run_once() is True
+            job = db.query(IncidentJobModel).one()
+            assert job.status == "pending"
+            assert job.last_error.startswith("DiagnosisUnavailableError")
+
+            job.attempts = settings.incident_job_max_attempts - 1
+            job.available_at = datetime.now(timezone.utc) - timedelta(seconds=1)
+            db.commit()
+            assert pool.run_once() is True
+
+        job = db.query(IncidentJobModel).populate_existing().one()
+        assert job.status == "done"
+        incident = db.query(IncidentModel).one()
+        assert json.loads(incident.diagnosis)["confidence"] == 0.0  # rule-based
+
+    def test_job_for_deleted_incident_is_dropped(self, db, sample_anomaly):
+        Orchestrator(_mock_architect(), _mock_executor(), work_queue=IncidentQueue()) \
+            .handle_anomaly(sample_anomaly, db)
+        db.commit()
+        db.execute(text("PRAGMA foreign_keys=OFF"))
+        db.execute(delete(IncidentModel))
+        db.commit()
+
+        assert _pool(db).run_once() is True
+
+        job = db.query(IncidentJobModel).populate_existing().one()
+        assert (job.status, job.attempts) == ("failed", 1)
+
+    def test_lease_is_renewed_while_batch_runs(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'lease.db'}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+        with session_factory() as db:
+            anomaly = _seed_anomaly(db)
+            Orchestrator(_mock_architect(), _mock_executor(), work_queue=IncidentQueue()) \
+                .handle_anomaly(anomaly, db)
+            db.commit()
+
+        stolen = []
+
+        class SlowOrchestrator(Orchestrator):
+            def process_incident(self, *args, **kwargs):
+                time.sleep(0.4)  # several visibility timeouts
+                with session_factory() as other:
+                    stolen.extend(IncidentQueue().claim(other))
+                return super().process_incident(*args, **kwargs)
+
+        pool = IncidentWorkerPool(
+            IncidentQueue(),
+            session_factory=session_factory,
+            orchestrator_factory=lambda _db: SlowOrchestrator(_mock_architect(), _mock_executor()),
+        )
+        with patch.object(settings, "incident_job_visibility_timeout_seconds", 0.15):
+            assert pool.run_once() is True
+
+        assert stolen == []
+        with session_factory() as db:
+            assert db.query(IncidentJobModel).one().status == "done"
+
+    def test_workers_drain_queue_in_background(self, tmp_path):
+        engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+        Base.metadata.create_all(engine)
+        session_factory = sessionmaker(bind=engine)
+
+        with session_factory() as db:
+            table_id = _seed_anomaly(db).table_id
+            orchestrator = Orchestrator(
+                _mock_architect(), _mock_executor(), work_queue=IncidentQueue()
+            )
+            for kind in ("schema_drift", "freshness_violation"):
+                anomaly = AnomalyModel(
+                    table_id=table_id, type=kind, severity="high", detail="[]",
+                    detected_at=datetime.now(timezone.utc),
+                )
+                db.add(anomaly)
+                db.flush()
+                orchestrator.handle_anomaly(anomaly, db)
+            db.commit()
+
+        pool = IncidentWorkerPool(
+            IncidentQueue(),
+            session_factory=session_factory,
+            orchestrator_factory=lambda _db: Orchestrator(_mock_architect(), _mock_executor()),
+        )
+        pool.start(workers=2)
+        try:
+            pool.wake()
+            deadline = time.monotonic() + 5
+            while pool.stats()["processed"] < 2 and time.monotonic() < deadline:
+                time.sleep(0.05)
+        finally:
+            pool.stop()
+
+        with session_factory() as db:
+            assert {j.status for j in db.query(IncidentJobModel)} == {"done"}
+            assert {i.status for i in db.query(IncidentModel)} == {"pending_review"}
@@ -1,7 +1,28 @@
 """Tests for lineage engine — SQL parsing and graph traversal."""
 
-from aegis.core.lineage import LineageGraph
-from aegis.utils.sql_parser import extract_lineage_edges
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+import sqlglot
+
+from aegis.config import settings
+from aegis.core.lineage import LineageGraph, LineageIndex, LineageRefresher, ReachabilityStore
+from aegis.core.models import (
+    ColumnLineageEdgeModel,
+    LineageCursorModel,
+    LineageEdgeModel,
+    LineageReachabilityModel,
+    ParsedQueryModel,
+)
+from aegis.core.parse_cache import ParseCache, normalize_sql, parse_cache
+from aegis.core.parse_pool import parse_statements, shutdown_parse_pool
+from aegis.utils.sql_parser import (
+    classify_statements,
+    extract_column_edges,
+    extract_lineage_edges,
+    may_have_lineage,
+)
 
 
 class TestSQLParser:
@@ -59,6 +80,39 @@ class TestSQLParser:
         assert len(data_edges) >= 1
 
 
+class TestPrefilter:
+    def test_classifies_writes_and_sources(self):
+        shapes = classify_statements(
+            "INSERT INTO db.t VALUES (1, 'a;b'); CREATE TABLE IF NOT EXISTS a.b AS SELECT x FROM c;"
+            " SELECT 1",
+            "snowflake",
+        )
+        assert [(s.is_write, s.has_sources) for s in shapes] == [
+            (True, False), (True, True), (False, False),
+        ]
+
+    def test_agrees_with_full_parse(self):
+        for sql in [
+            "INSERT INTO t VALUES (1)",
+            "INSERT INTO t SELECT 1",
+            "CREATE TEMP TABLE tmp (a INT)",
+            "CREATE TABLE t (a INT REFERENCES other (id))",
+            "CREATE TABLE t CLONE s",
+            "MERGE INTO t USING s ON t.id = s.id WHEN MATCHED THEN DELETE",
+            "WITH c AS (SELECT * FROM s) INSERT INTO t SELECT * FROM c",
+            "UPDATE t SET a = 1 FROM s",
+            "CREATE TABLE child PARTITION OF parent FOR VALUES IN (1)",
+            "CREATE TABLE c (a INT) INHERITS (p)",
+            "INSERT INTO t TABLE s",
+            "INSERT INTO TABLE t VALUES (1)",
+            "SELECT * FROM a JOIN b ON a.id = b.id",
+            "garbage ' unterminated",
+        ]:
+            assert may_have_lineage(sql, "snowflake") == bool(
+                extract_lineage_edges(sql, "snowflake")
+            ), sql
+
+
 class TestLineageGraph:
     def test_get_downstream(self, db, sample_lineage_edges):
         graph = LineageGraph(db)
@@ -99,9 +153,648 @@ class TestLineageGraph:
         # No reverse path in a DAG
         assert path is None
 
+    def test_top_paths_ranked_by_confidence(self, db, sample_lineage_edges):
+        db.add_all([
+            LineageEdgeModel(
+                source_table="raw.orders", target_table="analytics.orders", confidence=0.6
+            ),
+            LineageEdgeModel(
+                source_table="staging.orders", target_table="analytics.customer_ltv",
+                confidence=0.9,
+            ),
+        ])
+        db.commit()
+
+        paths = LineageGraph(db).get_top_paths("raw.orders", "analytics.customer_ltv", k=5)
+
+        assert [p["path"] for p in paths] == [
+            ["raw.orders", "staging.orders", "analytics.customer_ltv"],
+            ["raw.orders", "staging.orders", "analytics.orders", "analytics.customer_ltv"],
+            ["raw.orders", "analytics.orders", "analytics.customer_ltv"],
+        ]
+        assert [round(p["confidence"], 3) for p in paths] == [0.9, 0.8, 0.48]
+        assert [p["hops"] for p in paths] == [2, 3, 2]
+
+    def test_top_paths_unreachable(self, db, sample_lineage_edges):
+        assert LineageGraph(db).get_top_paths("analytics.daily_revenue", "raw.orders") == []
+
     def test_get_full_graph(self, db, sample_lineage_edges):
         graph = LineageGraph(db)
         full = graph.get_full_graph()
 
         assert len(full["nodes"]) == 5
         assert len(full["edges"]) == 4
+        assert full["next_cursor"] is None
+
+    def test_full_graph_connection_filter_in_sql(self, db, sample_lineage_edges, sample_connection):
+        from aegis.core.models import MonitoredTableModel
+
+        db.add(MonitoredTableModel(
+            connection_id=sample_connection.id, schema_name="analytics",
+            table_name="customer_ltv", fully_qualified_name="analytics.customer_ltv",
+        ))
+        db.commit()
+
+        full = LineageGraph(db).get_full_graph(connection_id=sample_connection.id)
+
+        assert [(e["source"], e["target"]) for e in full["edges"]] == [
+            ("analytics.orders", "analytics.customer_ltv"),
+        ]
+
+    def test_full_graph_pagination(self, db, sample_lineage_edges):
+        graph = LineageGraph(db)
+        pages, cursor = [], None
+        while True:
+            page = graph.get_full_graph(cursor=cursor, limit=3)
+            pages.append(len(page["edges"]))
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert pages == [3, 1]
+
+    def test_full_graph_focus_subgraph(self, db, sample_lineage_edges):
+        full = LineageGraph(db).get_full_graph(focus="staging.orders", depth=1)
+
+        assert {n["id"] for n in full["nodes"]} == {
+            "raw.orders", "staging.orders", "analytics.orders",
+        }
+        assert len(full["edges"]) == 2
+
+    def test_iter_full_graph_emits_nodes_before_edges(self, db, sample_lineage_edges):
+        records = list(LineageGraph(db).iter_full_graph())
+
+        seen = set()
+        for record in records:
+            if record["type"] == "node":
+                seen.add(record["id"])
+            else:
+                assert {record["source"], record["target"]} <= seen
+        assert sum(r["type"] == "edge" for r in records) == 4
+
+
+class TestLineageIndex:
+    def test_index_matches_sql_traversal(self, db, sample_lineage_edges):
+        with patch("aegis.core.lineage.settings") as settings:
+            settings.lineage_traversal_mode = "sql"
+            expected = LineageGraph(db).get_blast_radius("raw.orders")
+            expected_up = LineageGraph(db).get_upstream("analytics.customer_ltv", depth=10)
+
+        assert LineageGraph(db).get_blast_radius("raw.orders") == expected
+        assert LineageGraph(db).get_upstream("analytics.customer_ltv", depth=10) == expected_up
+
+    def test_traversals_share_one_index_load(self, db, sample_lineage_edges):
+        graph = LineageGraph(db)
+        with patch.object(db, "execute", wraps=db.execute) as execute:
+            graph.get_downstream("raw.orders", depth=10)
+            graph.get_path("raw.orders", "analytics.customer_ltv")
+            graph.get_upstream("analytics.daily_revenue")
+
+        assert execute.call_count == 2  # the edges plus their change marker
+
+    def test_skips_stale_edges(self, db, sample_lineage_edges):
+        sample_lineage_edges[3].last_seen_at = datetime.now(timezone.utc) - timedelta(days=60)
+        db.commit()
+
+        index = LineageIndex()
+        index.rebuild(db)
+        downstream = LineageGraph(db, index=index).get_downstream("analytics.orders")
+
+        assert [n["table"] for n in downstream] == ["analytics.daily_revenue"]
+
+    def test_refresh_rebuilds_shared_index(self, db, sample_connection):
+        index = LineageIndex()
+        extractor = FakeExtractor([_entry("INSERT INTO b SELECT * FROM a", 1)])
+
+        with patch("aegis.core.lineage.get_extractor", return_value=extractor), \
+                patch("aegis.core.lineage.lineage_index", index):
+            LineageRefresher(db).refresh(
+                MagicMock(dialect="snowflake"), connection_id=sample_connection.id
+            )
+
+        assert index.is_built
+        assert [n["table"] for n in LineageGraph(db, index=index).get_downstream("a")] == ["b"]
+
+    def test_rebuilds_after_an_outside_write(self, db, sample_lineage_edges):
+        index = LineageIndex()
+        graph = LineageGraph(db, index=index)
+        assert [n["table"] for n in graph.get_downstream("analytics.daily_revenue")] == []
+
+        # Another process (the snapshot CLI, a second server) adds an edge.
+        db.add(LineageEdgeModel(
+            source_table="analytics.daily_revenue", target_table="exports.finance",
+        ))
+        db.commit()
+        assert [n["table"] for n in graph.get_downstream("analytics.daily_revenue")] == []
+
+        with patch.object(settings, "lineage_index_check_seconds", 0):
+            downstream = graph.get_downstream("analytics.daily_revenue")
+
+        assert [n["table"] for n in downstream] == ["exports.finance"]
+
+    def test_csr_built_before_a_rebuild_is_not_kept(self, db, sample_lineage_edges):
+        pytest.importorskip("numpy")
+        from aegis.core.lineage_csr import CSRLineage
+
+        index = LineageIndex()
+        index.rebuild(db)
+        build = CSRLineage.from_db
+
+        def racing_build(session):
+            snapshot = build(session)
+            index.rebuild(session)  # a refresh lands while the CSR is being built
+            return snapshot
+
+        with patch.object(CSRLineage, "from_db", side_effect=racing_build):
+            stale = index.csr(db)
+
+        assert index._csr is None
+        assert index.csr(db) is not stale
+
+
+class TestRecursiveCTE:
+    def _walk(self, db, mode, fn, *args):
+        with patch("aegis.core.lineage.settings") as settings:
+            settings.lineage_traversal_mode = mode
+            graph = LineageGraph(db)
+            nodes = getattr(graph, fn)(*args)
+        return sorted((n["table"], n["depth"], n["confidence"]) for n in nodes)
+
+    def test_matches_per_node_traversal(self, db, sample_lineage_edges):
+        db.add(
+            LineageEdgeModel(
+                source_table="raw.orders", target_table="analytics.orders", confidence=0.6
+            )
+        )
+        db.commit()
+
+        for fn, start, depth in [
+            ("get_downstream", "raw.orders", 10),
+            ("get_downstream", "raw.orders", 1),
+            ("get_upstream", "analytics.customer_ltv", 10),
+        ]:
+            assert (
+                self._walk(db, "cte", fn, start, depth) == self._walk(db, "sql", fn, start, depth)
+            )
+
+    def test_single_query_and_cycles_terminate(self, db, sample_lineage_edges):
+        db.add(LineageEdgeModel(source_table="analytics.daily_revenue", target_table="raw.orders"))
+        db.commit()
+
+        with patch("aegis.core.lineage.settings") as settings, \
+                patch.object(db, "execute", wraps=db.execute) as execute:
+            settings.lineage_traversal_mode = "cte"
+            settings.lineage_reachability_enabled = False
+            radius = LineageGraph(db).get_blast_radius("raw.orders")
+
+        assert execute.call_count == 1
+        assert radius["total_affected"] == 4
+        assert radius["max_depth"] == 3
+        assert radius["affected_tables"][0] == {
+            "table": "staging.orders", "depth": 1, "confidence": 1.0,
+        }
+
+    def test_respects_stale_cutoff(self, db, sample_lineage_edges):
+        sample_lineage_edges[1].last_seen_at = datetime.now(timezone.utc) - timedelta(days=60)
+        db.commit()
+
+        assert self._walk(db, "cte", "get_downstream", "raw.orders", 10) == [
+            ("staging.orders", 1, 1.0)
+        ]
+
+
+@patch.object(settings, "lineage_reachability_enabled", True)
+class TestReachabilityStore:
+    def test_rebuild_matches_live_blast_radius(self, db, sample_lineage_edges):
+        live = LineageGraph(db).get_blast_radius("raw.orders")
+
+        assert ReachabilityStore(db).rebuild() == 3
+        with patch.object(db, "execute", wraps=db.execute) as execute:
+            materialized = LineageGraph(db).get_blast_radius("raw.orders")
+
+        assert execute.call_count == 1
+        key = lambda n: (n["depth"], n["table"])  # noqa: E731 - ties are ordered by name
+        assert (
+            sorted(materialized["affected_tables"], key=key)
+            == sorted(live["affected_tables"], key=key)
+        )
+        assert materialized["max_depth"] == live["max_depth"]
+        # No closure rows: leaves and not-yet-synced sources are walked live.
+        assert ReachabilityStore(db).lookup("analytics.daily_revenue") is None
+        assert LineageGraph(db).get_blast_radius("analytics.daily_revenue")["total_affected"] == 0
+
+    def test_unsynced_source_falls_back_to_live_walk(self, db, sample_lineage_edges):
+        ReachabilityStore(db).rebuild()
+        db.add(LineageEdgeModel(source_table="raw.users", target_table="staging.users"))
+        db.commit()
+
+        radius = LineageGraph(db, index=LineageIndex()).get_blast_radius("raw.users")
+
+        assert radius["affected_tables"] == [
+            {"table": "staging.users", "depth": 1, "confidence": 1.0},
+        ]
+
+    def test_every_mode_agrees_on_depth_and_confidence(self, db, sample_lineage_edges):
+        # analytics.refunds is reached at depth 2 from two parents, and the
+        # weaker edge comes from the parent discovered first.
+        db.add_all([
+            LineageEdgeModel(
+                source_table="staging.orders", target_table="analytics.refunds", confidence=0.5,
+            ),
+            LineageEdgeModel(source_table="raw.orders", target_table="staging.refunds"),
+            LineageEdgeModel(
+                source_table="staging.refunds", target_table="analytics.refunds", confidence=0.9,
+            ),
+        ])
+        db.commit()
+        ReachabilityStore(db).rebuild()
+
+        def radius(mode, reachability):
+            with patch.object(settings, "lineage_traversal_mode", mode), \
+                    patch.object(settings, "lineage_reachability_enabled", reachability):
+                nodes = LineageGraph(db, index=LineageIndex()).get_blast_radius("raw.orders")
+            return sorted(
+                (n["table"], n["depth"], n["confidence"]) for n in nodes["affected_tables"]
+            )
+
+        expected = radius("cte", False)
+        assert ("analytics.refunds", 2, 0.9) in expected
+        for mode in ("index", "sql", "csr"):
+            assert radius(mode, False) == expected, mode
+        assert radius("index", True) == expected
+
+    def test_sync_recomputes_ancestors_of_changed_edges(self, db, sample_lineage_edges):
+        ReachabilityStore(db).rebuild()
+        db.add(
+            LineageEdgeModel(source_table="analytics.daily_revenue", target_table="exports.finance")
+        )
+        db.commit()
+
+        recomputed = ReachabilityStore(db).sync({"analytics.daily_revenue"})
+
+        assert recomputed == 4  # daily_revenue plus its three ancestors
+        radius = LineageGraph(db).get_blast_radius("raw.orders")
+        assert {"table": "exports.finance", "depth": 4, "confidence": 1.0} in (
+            radius["affected_tables"]
+        )
+
+    def test_stale_edges_expire_rows(self, db, sample_lineage_edges):
+        store = ReachabilityStore(db)
+        store.rebuild()
+        # Time passes: staging.orders -> analytics.orders goes stale and the
+        # rows whose path runs through it reach their expiry.
+        past = datetime.now(timezone.utc) - timedelta(days=31)
+        sample_lineage_edges[1].last_seen_at = past
+        db.query(LineageReachabilityModel).filter(
+            LineageReachabilityModel.source_table.in_(["raw.orders", "staging.orders"]),
+            LineageReachabilityModel.target_table.like("analytics.%"),
+        ).update({"expires_at": past + timedelta(days=30)}, synchronize_session=False)
+        db.commit()
+
+        assert store.lookup("raw.orders") is None  # falls back to a live walk
+        assert ReachabilityStore(db).sync() == 2  # raw.orders and staging.orders
+        assert store.lookup("raw.orders") == [
+            {"table": "staging.orders", "depth": 1, "confidence": 1.0},
+        ]
+
+    def test_refresh_materializes_new_edges(self, db, sample_connection):
+        extractor = FakeExtractor([
+            _entry("INSERT INTO b SELECT * FROM a", 2),
+            _entry("INSERT INTO c SELECT * FROM b", 1),
+        ])
+        with patch("aegis.core.lineage.get_extractor", return_value=extractor), \
+                patch("aegis.core.lineage.lineage_index", LineageIndex()):
+            LineageRefresher(db).refresh(
+                MagicMock(dialect="snowflake"), connection_id=sample_connection.id
+            )
+
+        rows = db.query(LineageReachabilityModel).order_by(
+            LineageReachabilityModel.source_table, LineageReachabilityModel.target_table
+        )
+        assert [(r.source_table, r.target_table, r.depth) for r in rows] == [
+            ("a", "b", 1), ("a", "c", 2), ("b", "c", 1),
+        ]
+
+
+class FakeExtractor:
+    """Serves a fixed query log the way warehouse extractors do: >= since, oldest first."""
+
+    def __init__(self, entries):
+        self.entries = sorted(entries, key=lambda e: e["executed_at"])
+        self.calls = []
+
+    def extract(self, since, limit=10000):
+        self.calls.append(since)
+        return [e for e in self.entries if e["executed_at"] >= since][:limit]
+
+
+def _entry(sql, minutes_ago):
+    at = datetime.now(timezone.utc).replace(microsecond=0) - timedelta(minutes=minutes_ago)
+    return {"sql": sql, "user": "etl", "executed_at": at, "duration_ms": 1}
+
+
+class TestLineageRefresher:
+    def _refresh(self, db, extractor, connection_id, **kwargs):
+        connector = MagicMock(dialect="snowflake")
+        with patch("aegis.core.lineage.get_extractor", return_value=extractor), \
+                patch.object(parse_cache, "get_many", wraps=parse_cache.get_many) as resolve:
+            edges = LineageRefresher(db).refresh(connector, connection_id=connection_id, **kwargs)
+        return edges, sum(len(c.args[0]) for c in resolve.call_args_list)
+
+    def test_cursor_skips_already_parsed_entries(self, db, sample_connection):
+        shared = _entry("INSERT INTO b SELECT * FROM a", 10)
+        extractor = FakeExtractor([
+            _entry("INSERT INTO a SELECT * FROM src", 20),
+            shared,
+            {**shared, "sql": "INSERT INTO c SELECT * FROM b"},  # same timestamp
+        ])
+
+        edges, parsed = self._refresh(db, extractor, sample_connection.id)
+        assert (edges, parsed) == (3, 3)
+
+        cursor = db.get(LineageCursorModel, sample_connection.id)
+        assert cursor.last_executed_at.replace(tzinfo=timezone.utc) == shared["executed_at"]
+
+        # Nothing new: the boundary entries are re-served (>= since) but not re-parsed.
+        assert self._refresh(db, extractor, sample_connection.id) == (0, 0)
+
+        extractor.entries.append(_entry("INSERT INTO d SELECT * FROM c", 1))
+        assert self._refresh(db, extractor, sample_connection.id) == (1, 1)
+        assert db.query(LineageEdgeModel).count() == 4
+
+    def test_late_arriving_entry_is_picked_up(self, db, sample_connection):
+        extractor = FakeExtractor([_entry("INSERT INTO b SELECT * FROM a", 5)])
+        assert self._refresh(db, extractor, sample_connection.id) == (1, 1)
+
+        # A long-running query that started before the mark is published afterwards.
+        extractor.entries.insert(0, _entry("INSERT INTO c SELECT * FROM b", 30))
+        assert self._refresh(db, extractor, sample_connection.id) == (1, 1)
+        assert db.query(LineageEdgeModel).count() == 2
+
+        # Beyond the ingest-latency window it stays out.
+        extractor.entries.insert(0, _entry("INSERT INTO d SELECT * FROM c", 90))
+        assert self._refresh(db, extractor, sample_connection.id) == (0, 0)
+
+    def test_page_of_already_seen_entries_keeps_paging(self, db, sample_connection):
+        extractor = FakeExtractor([
+            _entry(f"INSERT INTO t{i} SELECT * FROM s{i}", 30 - i) for i in range(4)
+        ])
+        with patch.object(settings, "lineage_extract_page_size", 2):
+            self._refresh(db, extractor, sample_connection.id)
+            extractor.entries.append(_entry("INSERT INTO u SELECT * FROM t3", 1))
+
+            assert self._refresh(db, extractor, sample_connection.id) == (1, 1)
+
+    def test_pages_through_large_logs(self, db, sample_connection):
+        extractor = FakeExtractor([
+            _entry(f"INSERT INTO t{i} SELECT * FROM s{i}", 30 - i) for i in range(7)
+        ])
+
+        with patch("aegis.core.lineage.settings") as settings:
+            settings.lineage_extract_page_size = 3
+            settings.lineage_max_pages = 10
+            settings.lineage_initial_lookback_hours = 2
+            settings.lineage_max_backfill_hours = 168
+            settings.lineage_ingest_latency_minutes = 60
+            settings.lineage_index_check_seconds = 30
+            settings.lineage_upsert_batch_size = 2
+            settings.parse_cache_persist = False
+            edges, parsed = self._refresh(db, extractor, sample_connection.id)
+
+        assert (edges, parsed) == (7, 7)
+        assert len(extractor.calls) == 4  # pages overlap on their boundary entry
+
+    def test_edges_are_aggregated_and_upserted(self, db, sample_connection):
+        db.add(LineageEdgeModel(
+            source_table="a", target_table="b", query_hash="old", confidence=1.0,
+        ))
+        db.flush()
+        extractor = FakeExtractor([
+            _entry("INSERT INTO b SELECT * FROM (SELECT * FROM a) x", 3),
+            _entry("INSERT INTO b SELECT * FROM (SELECT * FROM a) y", 2),
+            _entry("INSERT INTO c SELECT * FROM (SELECT * FROM a) x", 1),
+        ])
+
+        edges, _ = self._refresh(db, extractor, sample_connection.id)
+
+        assert edges == 3
+        rows = {
+            (e.source_table, e.target_table): e
+            for e in db.query(LineageEdgeModel).populate_existing()
+        }
+        assert set(rows) == {("a", "b"), ("a", "c")}
+        assert rows[("a", "b")].confidence == 1.0  # kept the existing maximum
+        assert rows[("a", "b")].query_hash != "old"
+        assert rows[("a", "c")].confidence == 0.8
+
+    def test_backfill_is_clamped_to_limit(self, db, sample_connection):
+        extractor = FakeExtractor([_entry("INSERT INTO b SELECT * FROM a", 5)])
+        connector = MagicMock(dialect="snowflake")
+
+        with patch("aegis.core.lineage.get_extractor", return_value=extractor):
+            edges = LineageRefresher(db).backfill(
+                connector, sample_connection.id, datetime.now(timezone.utc) - timedelta(days=365)
+            )
+
+        assert edges == 1
+        assert extractor.calls[0] > datetime.now(timezone.utc) - timedelta(days=8)
+
+
+class TestColumnLineage:
+    def _edges(self, sql, **kwargs):
+        return {
+            (e.source_table, e.source_column, e.target_column, e.confidence)
+            for e in extract_column_edges(sql, "snowflake", **kwargs)
+        }
+
+    def test_insert_column_list_and_transforms(self):
+        sql = (
+            "INSERT INTO mart.orders (id, total) "
+            "SELECT o.id, o.amount * 2 FROM staging.orders o "
+            "JOIN staging.customers c ON o.customer_id = c.id"
+        )
+        assert self._edges(sql) == {
+            ("staging.orders", "id", "id", 1.0),
+            ("staging.orders", "amount", "total", 0.8),
+        }
+
+    def test_resolves_through_ctes_and_derived_tables(self):
+        sql = (
+            "INSERT INTO t (x) WITH c AS (SELECT id + 1 AS k FROM raw.s) "
+            "SELECT sub.k FROM (SELECT k FROM c) sub"
+        )
+        assert self._edges(sql) == {("raw.s", "id", "x", 0.8)}
+
+    def test_merge_update_and_insert(self):
+        sql = (
+            "MERGE INTO t USING stg.s AS src ON t.id = src.id "
+            "WHEN MATCHED THEN UPDATE SET t.a = src.a "
+            "WHEN NOT MATCHED THEN INSERT (id, a) VALUES (src.id, src.a)"
+        )
+        assert self._edges(sql) == {("stg.s", "a", "a", 1.0), ("stg.s", "id", "id", 1.0)}
+
+    def test_star_and_ambiguous_columns_are_skipped(self):
+        assert self._edges("INSERT INTO t SELECT * FROM s") == set()
+        assert self._edges("INSERT INTO t SELECT x FROM a JOIN b ON a.id = b.id") == set()
+
+    def test_node_budget_skips_statement(self):
+        sql = "INSERT INTO t (a) SELECT " + " + ".join(f"c{i}" for i in range(50)) + " FROM s"
+        assert self._edges(sql, max_nodes=20) == set()
+        assert len(self._edges(sql, max_nodes=1000)) == 50
+
+    def test_refresh_writes_column_edges(self, db, sample_connection):
+        extractor = FakeExtractor([
+            _entry("INSERT INTO b (id, v) SELECT id, v * 2 FROM a", 2),
+            _entry("INSERT INTO b (id, v) SELECT id, v FROM a", 1),
+        ])
+        with patch("aegis.core.lineage.get_extractor", return_value=extractor), \
+                patch.object(settings, "column_lineage_enabled", True), \
+                patch("aegis.utils.sql_parser.sqlglot.parse", wraps=sqlglot.parse) as parse:
+            LineageRefresher(db).refresh(MagicMock(dialect="snowflake"))
+
+        rows = {
+            (e.source_column, e.target_column): e.confidence
+            for e in db.query(ColumnLineageEdgeModel)
+        }
+        assert rows == {("id", "id"): 1.0, ("v", "v"): 1.0}
+        assert parse.call_count == 2  # one parse per statement, shared by both levels
+
+    def test_long_statement_skipped_before_parsing(self):
+        sql = "INSERT INTO t (a) SELECT a FROM s"
+        with patch("aegis.utils.sql_parser.sqlglot.parse") as parse:
+            assert self._edges(sql, max_chars=10) == set()
+        parse.assert_not_called()
+
+    def test_column_blast_radius(self, db):
+        now = datetime.now(timezone.utc)
+        for src, dst, seen in [
+            (("raw.orders", "amount"), ("stg.orders", "amount"), now),
+            (("stg.orders", "amount"), ("mart.revenue", "total"), now),
+            (("stg.orders", "amount"), ("mart.old", "total"), now - timedelta(days=60)),
+            (("raw.orders", "id"), ("stg.orders", "id"), now),
+        ]:
+            db.add(ColumnLineageEdgeModel(
+                source_table=src[0], source_column=src[1],
+                target_table=dst[0], target_column=dst[1],
+                confidence=1.0, last_seen_at=seen,
+            ))
+        db.flush()
+
+        radius = LineageGraph(db).get_column_blast_radius("raw.orders", "amount")
+
+        assert [(n["table"], n["column"], n["depth"]) for n in radius["affected_columns"]] == [
+            ("stg.orders", "amount", 1),
+            ("mart.revenue", "total", 2),
+        ]
+        assert radius["affected_tables"] == ["mart.revenue", "stg.orders"]
+        assert radius["max_depth"] == 2
+
+
+class TestParseCache:
+    def test_repeat_query_skips_parsing(self):
+        cache = ParseCache(maxsize=10)
+        sql = "INSERT INTO analytics.orders SELECT * FROM staging.orders"
+
+        with patch(
+            "aegis.core.parse_cache.extract_lineage_edges", wraps=extract_lineage_edges
+        ) as parse:
+            first = cache.get_edges(sql, "postgresql")
+            second = cache.get_edges("/* run 42 */ " + sql.replace(" ", "\n  ") + ";", "postgresql")
+
+        assert parse.call_count == 1
+        assert first == second
+        assert first[0].source == "staging.orders"
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_dialect_is_part_of_key(self):
+        cache = ParseCache(maxsize=10)
+        cache.get_edges("INSERT INTO b SELECT * FROM a", "snowflake")
+        cache.get_edges("INSERT INTO b SELECT * FROM a", "bigquery")
+        assert cache.misses == 2
+
+    def test_lru_evicts_oldest(self):
+        cache = ParseCache(maxsize=2)
+        for table in ("a", "b", "a", "c"):
+            cache.get_edges(f"INSERT INTO t SELECT * FROM {table}", "snowflake")
+
+        assert cache.stats()["size"] == 2
+        cache.get_edges("INSERT INTO t SELECT * FROM b", "snowflake")
+        assert cache.misses == 4  # b was evicted; a survived through its reuse
+
+    def test_persistent_tier_survives_restart(self, db):
+        sql = "INSERT INTO b SELECT * FROM a"
+        ParseCache(maxsize=10).get_edges(sql, "snowflake", db)
+        db.flush()
+        assert db.query(ParsedQueryModel).count() == 1
+
+        fresh = ParseCache(maxsize=10)
+        with patch("aegis.core.parse_cache.extract_lineage_edges") as parse:
+            edges = fresh.get_edges(sql, "snowflake", db)
+
+        parse.assert_not_called()
+        assert [(e.source, e.target) for e in edges] == [("a", "b")]
+        assert fresh.persistent_hits == 1
+
+    def test_prefilter_skips_statements_without_sources(self):
+        cache = ParseCache(maxsize=10)
+        statements = [
+            "INSERT INTO t VALUES (1, 'a')",
+            "CREATE TEMPORARY TABLE tmp_x (id INT)",
+            "SELECT * FROM a",
+            "INSERT INTO t SELECT * FROM s",
+        ]
+
+        with patch(
+            "aegis.core.parse_cache.extract_lineage_edges", wraps=extract_lineage_edges
+        ) as parse:
+            results = cache.get_many(statements, "snowflake")
+
+        assert parse.call_count == 1
+        assert [len(edges) for edges in results] == [0, 0, 0, 1]
+        assert cache.stats()["prefiltered"] == 3
+        assert cache.stats()["skip_rate"] == 0.75
+
+    def test_normalize_keeps_literals_distinct(self):
+        assert normalize_sql("SELECT '--' FROM a") != normalize_sql("SELECT '--' FROM b")
+        assert normalize_sql("-- tag\nSELECT 1;") == "SELECT 1"
+
+
+class TestParsePool:
+    STATEMENTS = [f"INSERT INTO t{i} SELECT * FROM s{i} JOIN s{i + 1} ON 1 = 1" for i in range(9)]
+
+    def test_small_batches_parse_in_process(self):
+        with patch("aegis.core.parse_pool._get_executor") as get_executor:
+            results = parse_statements(self.STATEMENTS[:2], "snowflake")
+
+        get_executor.assert_not_called()
+        assert [e.target for e in results[1]] == ["t1", "t1"]
+
+    def test_pool_results_match_serial_order(self):
+        serial = [extract_lineage_edges(sql, "snowflake") for sql in self.STATEMENTS]
+
+        with patch("aegis.core.parse_pool.settings") as settings:
+            settings.lineage_parse_workers = 2
+            settings.lineage_parse_chunk_size = 2
+            settings.lineage_parse_min_batch = 1
+            try:
+                pooled = parse_statements(self.STATEMENTS, "snowflake")
+            finally:
+                shutdown_parse_pool()
+
+        assert pooled == serial
+
+    def test_cache_hands_only_distinct_misses_to_parser(self):
+        cache = ParseCache(maxsize=10)
+        batches = []
+
+        def parse(statements, dialect):
+            batches.append(list(statements))
+            return [extract_lineage_edges(sql, dialect) for sql in statements]
+
+        sql = self.STATEMENTS[0]
+        results = cache.get_many([sql, sql, self.STATEMENTS[1]], "snowflake", parse=parse)
+
+        assert batches == [[sql, self.STATEMENTS[1]]]
+        assert results[0] == results[1]
+        assert cache.stats()["hits"] == 1
@@ -0,0 +1,90 @@
+"""Tests for lineage retention compaction."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from aegis.core.lineage_compaction import compact_lineage
+from aegis.core.models import (
+    ColumnLineageEdgeArchiveModel,
+    ColumnLineageEdgeModel,
+    LineageEdgeArchiveModel,
+    LineageEdgeModel,
+    ParsedQueryModel,
+)
+
+
+def _edges(db, ages_in_days):
+    now = datetime.now(timezone.utc)
+    db.add_all([
+        LineageEdgeModel(
+            source_table=f"s{i}", target_table=f"t{i}", confidence=1.0,
+            first_seen_at=now - timedelta(days=age), last_seen_at=now - timedelta(days=age),
+        )
+        for i, age in enumerate(ages_in_days)
+    ])
+    db.commit()
+
+
+class TestCompactLineage:
+    def test_archives_edges_past_retention(self, db):
+        _edges(db, [1, 45, 120, 400])
+
+        report = compact_lineage(db)
+
+        assert report["rows_removed"] == 2
+        assert report["mode"] == "archive"
+        assert sorted(e.source_table for e in db.query(LineageEdgeModel)) == ["s0", "s1"]
+        assert sorted(a.source_table for a in db.query(LineageEdgeArchiveModel)) == ["s2", "s3"]
+        assert report["pages_before"]["page_count"] > 0
+        assert report["pages_reclaimed"] is not None
+
+    def test_delete_mode_and_stale_floor(self, db):
+        _edges(db, [10, 35])
+
+        with patch("aegis.core.lineage_compaction.settings") as settings:
+            settings.lineage_retention_days = 7  # clamped up to the stale window
+            settings.lineage_compaction_mode = "delete"
+            settings.parse_cache_retention_days = 30
+            settings.parse_cache_max_rows = 100
+            report = compact_lineage(db)
+
+        assert report["rows_removed"] == 1
+        assert [e.source_table for e in db.query(LineageEdgeModel)] == ["s0"]
+        assert db.query(LineageEdgeArchiveModel).count() == 0
+
+    def test_compacts_column_edges_with_same_retention(self, db):
+        now = datetime.now(timezone.utc)
+        db.add_all([
+            ColumnLineageEdgeModel(
+                source_table="s", source_column=f"c{i}", target_table="t", target_column="c",
+                first_seen_at=now - timedelta(days=age), last_seen_at=now - timedelta(days=age),
+            )
+            for i, age in enumerate([1, 120])
+        ])
+        db.commit()
+
+        report = compact_lineage(db)
+
+        assert (report["rows_removed"], report["column_rows_removed"]) == (0, 1)
+        assert [e.source_column for e in db.query(ColumnLineageEdgeModel)] == ["c0"]
+        assert [a.source_column for a in db.query(ColumnLineageEdgeArchiveModel)] == ["c1"]
+
+    def test_prunes_parsed_queries_by_age_and_cap(self, db):
+        now = datetime.now(timezone.utc)
+        db.add_all([
+            ParsedQueryModel(
+                query_key=f"q{i}", dialect="duckdb", created_at=now - timedelta(days=age),
+            )
+            for i, age in enumerate([1, 2, 3, 90])
+        ])
+        db.commit()
+
+        with patch("aegis.core.lineage_compaction.settings.parse_cache_max_rows", 2):
+            report = compact_lineage(db)
+
+        assert report["parsed_queries_removed"] == 2
+        assert sorted(q.query_key for q in db.query(ParsedQueryModel)) == ["q0", "q1"]
+
+    def test_nothing_to_do(self, db):
+        _edges(db, [1])
+        assert compact_lineage(db)["rows_removed"] == 0
@@ -0,0 +1,73 @@
+"""Tests for the NumPy CSR lineage backend."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from aegis.core.lineage import LineageGraph  # noqa: E402
+from aegis.core.lineage_csr import CSRLineage  # noqa: E402
+from aegis.core.models import LineageEdgeModel  # noqa: E402
+
+
+def _cutoff():
+    return datetime.now(timezone.utc) - timedelta(days=30)
+
+
+@pytest.fixture
+def diamond_edges(db, sample_lineage_edges):
+    """Sample chain plus a shortcut, a cycle and a stale edge."""
+    now = datetime.now(timezone.utc)
+    db.add_all([
+        LineageEdgeModel(
+            source_table="raw.orders", target_table="analytics.orders", confidence=0.6
+        ),
+        LineageEdgeModel(source_table="analytics.customer_ltv", target_table="raw.orders"),
+        LineageEdgeModel(
+            source_table="analytics.daily_revenue", target_table="exports.finance",
+            last_seen_at=now - timedelta(days=45),
+        ),
+    ])
+    db.commit()
+
+
+def _walk(db, mode, fn, *args):
+    with patch("aegis.core.lineage.settings") as settings:
+        settings.lineage_traversal_mode = mode
+        settings.lineage_reachability_enabled = False
+        settings.lineage_index_check_seconds = 30
+        return getattr(LineageGraph(db), fn)(*args)
+
+
+class TestCSRLineage:
+    @pytest.mark.parametrize("fn,args", [
+        ("get_downstream", ("raw.orders", 10)),
+        ("get_downstream", ("staging.orders", 1)),
+        ("get_upstream", ("analytics.customer_ltv", 10)),
+        ("get_blast_radius", ("raw.orders",)),
+        ("get_path", ("raw.orders", "analytics.daily_revenue")),
+        ("get_path", ("analytics.daily_revenue", "raw.orders")),
+    ])
+    def test_matches_index_backend(self, db, diamond_edges, fn, args):
+        assert _walk(db, "csr", fn, *args) == _walk(db, "index", fn, *args)
+
+    def test_unknown_table(self, db, diamond_edges):
+        csr = CSRLineage.from_db(db)
+        assert csr.bfs("nope", 3, "downstream", _cutoff()) == []
+        assert csr.path("nope", "raw.orders", _cutoff()) is None
+
+    def test_reach_counts(self, db, diamond_edges):
+        counts = CSRLineage.from_db(db).reach_counts(_cutoff(), depth=10)
+
+        assert counts["raw.orders"] == 4
+        assert counts["analytics.customer_ltv"] == 4  # through the cycle back to raw
+        assert counts["analytics.daily_revenue"] == 0  # its only edge is stale
+
+    def test_propagate_keeps_best_path_product(self, db, diamond_edges):
+        scores = CSRLineage.from_db(db).propagate("raw.orders", _cutoff(), depth=10)
+
+        assert scores["analytics.orders"] == 1.0  # via staging beats the 0.6 shortcut
+        assert scores["analytics.customer_ltv"] == pytest.approx(0.8)
+        assert "exports.finance" not in scores
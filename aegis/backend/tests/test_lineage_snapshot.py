@@ -0,0 +1,97 @@
+"""Tests for lineage snapshot export/import."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from aegis.core.lineage_snapshot import (
+    LineageSnapshot,
+    SnapshotError,
+    export_snapshot,
+    import_snapshot,
+)
+from aegis.core.models import LineageEdgeModel
+
+
+def _rows(db):
+    return sorted(
+        (
+            e.source_table, e.target_table, e.relationship_type, e.confidence, e.query_hash,
+            e.first_seen_at.replace(tzinfo=None), e.last_seen_at.replace(tzinfo=None),
+        )
+        for e in db.query(LineageEdgeModel).populate_existing()
+    )
+
+
+class TestLineageSnapshot:
+    def test_round_trip(self, db, sample_lineage_edges, tmp_path):
+        sample_lineage_edges[0].query_hash = "00ff00ff00ff00ff"
+        db.commit()
+        expected = _rows(db)
+        path = tmp_path / "lineage.aegl"
+
+        stats = export_snapshot(db, path)
+        assert stats["nodes"] == 6  # five tables plus the "direct" relationship
+        assert stats["edges"] == 4
+
+        import_snapshot(db, path, replace=True)
+
+        assert _rows(db) == expected
+
+    def test_memory_mapped_columns(self, db, sample_lineage_edges, tmp_path):
+        path = tmp_path / "lineage.aegl"
+        export_snapshot(db, path)
+
+        with LineageSnapshot(path) as snapshot:
+            assert snapshot.edge_count == 4
+            assert snapshot.string(snapshot.columns["source"][0]) == "raw.orders"
+            assert list(snapshot.columns["confidence"]) == pytest.approx([1.0, 1.0, 1.0, 0.8])
+
+    def test_merge_keeps_best_values(self, db, sample_lineage_edges, tmp_path):
+        path = tmp_path / "lineage.aegl"
+        export_snapshot(db, path)
+
+        edge = sample_lineage_edges[3]
+        edge.confidence = 0.6
+        edge.last_seen_at = datetime.now(timezone.utc) + timedelta(days=1)
+        db.commit()
+        newer = edge.last_seen_at.replace(tzinfo=None)
+
+        import_snapshot(db, path)
+
+        db.refresh(edge)
+        assert edge.confidence == pytest.approx(0.8)
+        assert edge.last_seen_at.replace(tzinfo=None) == newer
+        assert db.query(LineageEdgeModel).count() == 4
+
+    def test_unsupported_dialect_lists_supported(self, tmp_path):
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "mysql"
+
+        with pytest.raises(ValueError, match="sqlite, postgresql"):
+            import_snapshot(db, tmp_path / "lineage.aegl", replace=True)
+
+        db.execute.assert_not_called()
+
+    def test_rejects_foreign_files(self, tmp_path):
+        path = tmp_path / "not-a-snapshot"
+        path.write_bytes(b"PK\x03\x04" + b"\0" * 64)
+
+        with pytest.raises(SnapshotError):
+            LineageSnapshot(path)
+
+    def test_builds_csr_without_touching_the_db(self, db, sample_lineage_edges, tmp_path):
+        pytest.importorskip("numpy")
+        from aegis.core.lineage_csr import CSRLineage
+
+        path = tmp_path / "lineage.aegl"
+        export_snapshot(db, path)
+        cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+
+        with LineageSnapshot(path) as snapshot:
+            csr = CSRLineage.from_snapshot(snapshot)
+
+        assert csr.bfs("raw.orders", 10, "downstream", cutoff) == (
+            CSRLineage.from_db(db).bfs("raw.orders", 10, "downstream", cutoff)
+        )
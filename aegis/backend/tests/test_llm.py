@@ -0,0 +1,219 @@
+"""Tests for the async LLM client against a local stub server."""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+from openai import AsyncOpenAI
+
+from aegis.services.llm import AsyncLLMClient, TokenBucket, _parse_duration
+
+
+class _StubOpenAI(BaseHTTPRequestHandler):
+    """Chat completions endpoint replaying ``server.script`` one response per request.
+
+    Script entries are ``(status, headers)`` or ``(status, headers, error_code)``.
+    """
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["content-length"]))
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+            status, headers, *code = server.script.pop(0) if server.script else (200, {})
+        try:
+            server.delay.wait(server.hold)
+            if status == 200:
+                body = {
+                    "id": "chatcmpl-1",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": "gpt-4",
+                    "choices": [{
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {"role": "assistant", "content": json.dumps({"ok": True})},
+                    }],
+                }
+            else:
+                body = {"error": {
+                    "message": "slow down", "type": "rate_limit", "code": next(iter(code), None),
+                }}
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubOpenAI)
+    server.lock = threading.Lock()
+    server.script = []
+    server.requests = server.in_flight = server.peak = 0
+    server.hold = 0.0
+    server.delay = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _client(server, **bucket):
+    openai = AsyncOpenAI(
+        api_key="test-key",
+        base_url=f"http://127.0.0.1:{server.server_address[1]}/v1",
+        max_retries=0,
+    )
+    return AsyncLLMClient(
+        client=openai,
+        bucket=TokenBucket(**({"capacity": 100, "refill_per_second": 100} | bucket)),
+    )
+
+
+class TestAsyncLLMClient:
+    async def test_diagnose_parses_response(self, stub):
+        assert await _client(stub).diagnose("prompt") == {"ok": True}
+
+    async def test_rate_limit_pauses_then_retries(self, stub):
+        stub.script = [(429, {"retry-after-ms": "50"}), (200, {})]
+        client = _client(stub)
+
+        with patch("aegis.services.llm._backoff", return_value=10.0):
+            result = await asyncio.wait_for(client.diagnose("prompt"), timeout=5)
+
+        assert result == {"ok": True}
+        assert stub.requests == 2
+
+    async def test_concurrency_is_bounded(self, stub):
+        stub.hold = 0.05
+        client = _client(stub)
+
+        with patch("aegis.services.llm.settings") as settings:
+            settings.llm_max_concurrency = 2
+            settings.llm_max_attempts = 3
+            settings.llm_diagnosis_timeout_seconds = 30
+            results = await asyncio.gather(*(client.diagnose(f"p{i}") for i in range(6)))
+
+        assert results == [{"ok": True}] * 6
+        assert stub.peak <= 2
+
+    async def test_rate_limits_do_not_use_up_attempts(self, stub):
+        stub.script = [(429, {"retry-after-ms": "10"})] * 3 + [(500, {})] * 2 + [(200, {})]
+        client = _client(stub)
+
+        with patch("aegis.services.llm._backoff", return_value=0.0):
+            result = await asyncio.wait_for(client.diagnose("prompt"), timeout=5)
+
+        assert result == {"ok": True}
+        assert stub.requests == 6
+
+    async def test_rate_limit_that_never_clears_times_out(self, stub):
+        stub.script = [(429, {"retry-after-ms": "20"})] * 1000
+        client = _client(stub)
+
+        with patch("aegis.services.llm.settings") as settings:
+            settings.llm_max_concurrency = 2
+            settings.llm_max_attempts = 3
+            settings.llm_diagnosis_timeout_seconds = 0.3
+            result = await asyncio.wait_for(client.diagnose("prompt"), timeout=5)
+
+        assert result is None
+        assert stub.requests > 3
+
+    async def test_exhausted_quota_counts_as_an_attempt(self, stub):
+        stub.script = [(429, {}, "insufficient_quota")] * 3
+        client = _client(stub)
+
+        with patch("aegis.services.llm._backoff", return_value=0.0):
+            assert await client.diagnose("prompt") is None
+        assert stub.requests == 3
+
+    def test_callers_on_different_loops_share_one_bound(self, stub):
+        stub.hold = 0.05
+        client = _client(stub)
+
+        async def burst():
+            return await asyncio.gather(client.diagnose("a"), client.diagnose("b"))
+
+        with patch("aegis.services.llm.settings") as settings:
+            settings.llm_max_concurrency = 1
+            settings.llm_max_attempts = 3
+            settings.llm_diagnosis_timeout_seconds = 30
+            results = asyncio.run(burst()) + asyncio.run(burst())
+
+        assert results == [{"ok": True}] * 4
+        assert stub.peak == 1
+
+    async def test_gives_up_after_max_attempts(self, stub):
+        stub.script = [(500, {})] * 3
+        client = _client(stub)
+
+        with patch("aegis.services.llm._backoff", return_value=0.0):
+            assert await client.diagnose("prompt") is None
+        assert stub.requests == 3
+
+    def test_blocking_call_from_worker_thread(self, stub):
+        assert _client(stub).diagnose_blocking("prompt") == {"ok": True}
+
+    def test_many_prompts_are_in_flight_together(self, stub):
+        stub.hold = 0.1
+        client = _client(stub)
+
+        with patch("aegis.services.llm.settings") as settings:
+            settings.llm_max_concurrency = 3
+            settings.llm_max_attempts = 3
+            settings.llm_diagnosis_timeout_seconds = 30
+            results = client.diagnose_many_blocking([(f"p{i}", "system") for i in range(6)])
+
+        assert results == [{"ok": True}] * 6
+        assert 1 < stub.peak <= 3
+
+
+class TestTokenBucket:
+    def test_follows_rate_limit_headers(self):
+        now = [0.0]
+        bucket = TokenBucket(capacity=60, refill_per_second=1, clock=lambda: now[0])
+
+        bucket.observe({
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-remaining-requests": "2",
+            "x-ratelimit-reset-requests": "1m",
+        })
+
+        assert bucket.capacity == 500
+        assert bucket.tokens == 2
+        assert bucket.rate == pytest.approx(498 / 60)
+
+    async def test_pause_holds_all_callers(self):
+        bucket = TokenBucket(capacity=10, refill_per_second=10)
+        bucket.pause(0.1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+
+        await asyncio.gather(bucket.acquire(), bucket.acquire())
+
+        assert loop.time() - start >= 0.1
+
+    def test_parse_duration(self):
+        assert _parse_duration("6m0s") == 360
+        assert _parse_duration("1.5s") == 1.5
+        assert _parse_duration("20ms") == pytest.approx(0.02)
+        assert _parse_duration("7") == 7
+        assert _parse_duration(None) is None
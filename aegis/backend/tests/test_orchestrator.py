@@ -1,11 +1,19 @@
 """Tests for Orchestrator — incident lifecycle and deduplication."""
 
 import json
-from datetime import datetime, timezone
-from unittest.mock import MagicMock
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
 
 from aegis.agents.orchestrator import Orchestrator
-from aegis.core.models import AnomalyModel, Diagnosis, IncidentModel, Recommendation
+from aegis.config import settings
+from aegis.core.lineage import LineageGraph
+from aegis.core.models import (
+    AnomalyModel,
+    Diagnosis,
+    IncidentModel,
+    MonitoredTableModel,
+    Recommendation,
+)
 
 
 def _mock_architect():
@@ -20,6 +28,9 @@ def _mock_architect():
             Recommendation(action="revert_schema", description="Revert the change", priority=1)
         ],
     )
+    architect.analyze_many.side_effect = lambda anomalies, db, **kwargs: {
+        a.id: architect.analyze.return_value for a in anomalies
+    }
     return architect
 
 
@@ -126,3 +137,120 @@ class TestOrchestrator:
         notifier.broadcast.assert_called()
         call_args = notifier.broadcast.call_args
         assert call_args[0][0] == "incident.created"
+
+    def test_inline_cycle_is_diagnosed_together(self, db, sample_table):
+        architect, notifier = _mock_architect(), MagicMock()
+        orchestrator = Orchestrator(architect, _mock_executor(), notifier=notifier)
+        anomalies = []
+        for kind in ("schema_drift", "freshness_violation"):
+            anomaly = AnomalyModel(
+                table_id=sample_table.id, type=kind, severity="high", detail="[]",
+                detected_at=datetime.now(timezone.utc),
+            )
+            db.add(anomaly)
+            db.flush()
+            anomalies.append(anomaly)
+
+        incidents = orchestrator.handle_anomalies(anomalies, db)
+
+        architect.analyze_many.assert_called_once_with(anomalies, db, fallback=True)
+        architect.analyze.assert_not_called()
+        assert {i.status for i in incidents} == {"pending_review"}
+        assert notifier.broadcast.call_count == 2
+
+
+def _anomaly_on(db, connection, fqn, detected_at=None, severity="high"):
+    schema, name = fqn.split(".")
+    table = MonitoredTableModel(
+        connection_id=connection.id, schema_name=schema, table_name=name,
+        fully_qualified_name=fqn,
+    )
+    db.add(table)
+    db.flush()
+    anomaly = AnomalyModel(
+        table_id=table.id,
+        type="freshness_violation",
+        severity=severity,
+        detail=json.dumps({"sla_minutes": 60, "minutes_overdue": 30}),
+        detected_at=detected_at or datetime.now(timezone.utc),
+    )
+    db.add(anomaly)
+    db.flush()
+    return anomaly
+
+
+@patch.object(settings, "incident_correlation_enabled", True)
+class TestCorrelation:
+    def test_downstream_anomaly_joins_upstream_incident(
+        self, db, sample_connection, sample_lineage_edges
+    ):
+        architect, notifier = _mock_architect(), MagicMock()
+        orchestrator = Orchestrator(
+            architect, _mock_executor(), notifier=notifier, lineage_graph=LineageGraph(db)
+        )
+        root = orchestrator.handle_anomaly(_anomaly_on(db, sample_connection, "raw.orders"), db)
+        architect.analyze.reset_mock()
+        notifier.reset_mock()
+
+        downstream = _anomaly_on(
+            db, sample_connection, "analytics.daily_revenue", severity="critical"
+        )
+        incident = orchestrator.handle_anomaly(downstream, db)
+
+        assert incident.id == root.id
+        assert downstream.correlated_incident_id == root.id
+        assert incident.severity == "critical"
+        assert db.query(IncidentModel).count() == 1
+        architect.analyze.assert_not_called()
+        notifier.broadcast.assert_called_once_with(
+            "incident.updated", {"incident_id": root.id, "severity": "critical"}
+        )
+
+    def test_lineage_failure_is_logged_and_opens_incident(self, db, sample_connection, caplog):
+        lineage = MagicMock()
+        lineage.get_upstream.side_effect = RuntimeError("lineage db locked")
+        orchestrator = Orchestrator(_mock_architect(), _mock_executor(), lineage_graph=lineage)
+
+        anomaly = _anomaly_on(db, sample_connection, "analytics.orders")
+        with caplog.at_level("WARNING", logger="aegis.orchestrator"):
+            incident = orchestrator.handle_anomaly(anomaly, db)
+
+        assert incident.anomaly_id == anomaly.id
+        assert "Could not load lineage" in caplog.text
+
+    def test_scan_cycle_is_handled_upstream_first(
+        self, db, sample_connection, sample_lineage_edges
+    ):
+        orchestrator = Orchestrator(
+            _mock_architect(), _mock_executor(), lineage_graph=LineageGraph(db)
+        )
+        anomalies = [
+            _anomaly_on(db, sample_connection, fqn)
+            for fqn in ("analytics.customer_ltv", "analytics.orders", "staging.orders")
+        ]
+
+        incidents = orchestrator.handle_anomalies(anomalies, db)
+
+        assert len({i.id for i in incidents}) == 1
+        assert db.query(IncidentModel).one().anomaly_id == anomalies[2].id
+
+    def test_old_or_closed_upstream_incident_is_not_used(
+        self, db, sample_connection, sample_lineage_edges
+    ):
+        orchestrator = Orchestrator(
+            _mock_architect(), _mock_executor(), lineage_graph=LineageGraph(db)
+        )
+        root = orchestrator.handle_anomaly(_anomaly_on(db, sample_connection, "raw.orders"), db)
+        later = datetime.now(timezone.utc) + timedelta(hours=3)
+
+        stale = orchestrator.handle_anomaly(
+            _anomaly_on(db, sample_connection, "staging.orders", detected_at=later), db
+        )
+        root.status = "resolved"
+        db.flush()
+        after_close = orchestrator.handle_anomaly(
+            _anomaly_on(db, sample_connection, "analytics.orders"), db
+        )
+
+        assert stale.id != root.id
+        assert after_close.id == stale.id  # staging's incident is still open
@@ -100,6 +100,18 @@ class TestReportGenerator:
         assert len(report.recommended_actions) == 1
         assert len(report.timeline) >= 3  # detected, created, diagnosed at minimum
 
+    def test_marks_cached_diagnosis(self):
+        diagnosis = _make_diagnosis()
+        diagnosis.cached = True
+        report = ReportGenerator().generate(
+            incident=_make_incident(),
+            anomaly=_make_anomaly(),
+            table=_make_table(),
+            diagnosis=diagnosis,
+            remediation=None,
+        )
+        assert report.root_cause.cached is True
+
     def test_generates_report_without_diagnosis(self):
         gen = ReportGenerator()
         report = gen.generate(
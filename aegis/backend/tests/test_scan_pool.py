@@ -0,0 +1,169 @@
+"""Tests for the concurrent scan pool and concurrent scan mode."""
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from aegis.agents.sentinel import FreshnessSentinel, SchemaSentinel
+from aegis.services.scan_pool import ScanJob, ScanPool
+from aegis.services.scanner import _freshness_targets, _scan_concurrent
+
+
+class TestScanPool:
+    def test_results_yielded_in_submission_order(self):
+        def make(i):
+            def run():
+                time.sleep(0.01 * (5 - i))  # later jobs finish first
+                return i
+            return run
+
+        jobs = [ScanJob(key=i % 2, fn=make(i), payload=i) for i in range(5)]
+        results = list(ScanPool(max_workers=4, max_per_connection=2).run(jobs))
+
+        assert [r.job.payload for r in results] == [0, 1, 2, 3, 4]
+        assert [r.value for r in results] == [0, 1, 2, 3, 4]
+
+    def test_respects_per_connection_limit(self):
+        lock = threading.Lock()
+        active = {"a": 0, "b": 0}
+        peak = {"a": 0, "b": 0}
+
+        def probe(key):
+            def run():
+                with lock:
+                    active[key] += 1
+                    peak[key] = max(peak[key], active[key])
+                time.sleep(0.02)
+                with lock:
+                    active[key] -= 1
+            return run
+
+        jobs = [ScanJob(key=k, fn=probe(k)) for k in ("a", "b") for _ in range(6)]
+        list(ScanPool(max_workers=8, max_per_connection=2).run(jobs))
+
+        assert peak["a"] <= 2
+        assert peak["b"] <= 2
+
+    def test_errors_are_returned_not_raised(self):
+        def boom():
+            raise RuntimeError("warehouse down")
+
+        jobs = [ScanJob(key=1, fn=boom), ScanJob(key=1, fn=lambda: "ok")]
+        results = list(ScanPool(max_workers=2, max_per_connection=1).run(jobs))
+
+        assert isinstance(results[0].error, RuntimeError)
+        assert results[1].value == "ok"
+        assert results[1].error is None
+
+
+class TestConcurrentScan:
+    def test_detects_anomalies_and_writes_on_caller_session(
+        self, db, sample_connection, sample_table, sample_snapshot
+    ):
+        connector = MagicMock()
+        connector.fetch_schemas.return_value = {
+            ("public", "orders"): [
+                {"name": "id", "type": "INTEGER", "nullable": False, "ordinal": 1},
+            ],
+        }
+        connector.fetch_last_update_times.return_value = {
+            ("public", "orders"): datetime.now(timezone.utc) - timedelta(minutes=400),
+        }
+        orchestrator = MagicMock()
+
+        with patch("aegis.services.scanner.connector_registry") as registry:
+            registry.checkout.return_value.__enter__.return_value = connector
+            tables, anomalies = _scan_concurrent(
+                [sample_connection], db, orchestrator, SchemaSentinel(), FreshnessSentinel()
+            )
+
+        assert tables == 1
+        assert anomalies == 2
+        handled = [a.type for a in orchestrator.handle_anomalies.call_args.args[0]]
+        assert handled == ["schema_drift", "freshness_violation"]
+        connector.fetch_schemas.assert_called_once_with({"public"})
+        connector.fetch_schema.assert_not_called()
+
+    def test_schema_fallback_runs_on_pool_workers(
+        self, db, sample_connection, sample_table, sample_snapshot
+    ):
+        threads = []
+        connector = MagicMock()
+        connector.fetch_schemas.side_effect = RuntimeError("information_schema timeout")
+
+        def fetch_schema(schema, table):
+            threads.append(threading.current_thread().name)
+            return [{"name": "id", "type": "INTEGER", "nullable": False, "ordinal": 1}]
+
+        connector.fetch_schema.side_effect = fetch_schema
+        connector.fetch_last_update_times.return_value = {}
+
+        with patch("aegis.services.scanner.connector_registry") as registry:
+            registry.checkout.return_value.__enter__.return_value = connector
+            _, anomalies = _scan_concurrent(
+                [sample_connection], db, MagicMock(), SchemaSentinel(), FreshnessSentinel()
+            )
+
+        assert anomalies == 1
+        connector.fetch_schema.assert_called_once_with("public", "orders")
+        assert threads[0].startswith("aegis-scan")
+
+    def test_freshness_fallback_runs_on_pool_workers(
+        self, db, sample_connection, sample_table, sample_snapshot
+    ):
+        threads = []
+        connector = MagicMock()
+        connector.fetch_schemas.return_value = {}
+        connector.fetch_schema.return_value = json.loads(sample_snapshot.columns)
+        connector.fetch_last_update_times.side_effect = RuntimeError("union type mismatch")
+
+        def fetch_last_update_time(schema, table, column):
+            threads.append(threading.current_thread().name)
+            return datetime.now(timezone.utc) - timedelta(minutes=400)
+
+        connector.fetch_last_update_time.side_effect = fetch_last_update_time
+
+        with patch("aegis.services.scanner.connector_registry") as registry:
+            registry.checkout.return_value.__enter__.return_value = connector
+            _, anomalies = _scan_concurrent(
+                [sample_connection], db, MagicMock(), SchemaSentinel(), FreshnessSentinel()
+            )
+
+        assert anomalies == 1
+        connector.fetch_last_update_time.assert_called_once_with(
+            "public", "orders", sample_table.timestamp_column
+        )
+        assert threads[0].startswith("aegis-scan")
+
+
+class TestFreshnessTargets:
+    def test_resolves_column_from_latest_snapshot(self, db, sample_table, sample_snapshot):
+        sample_snapshot.columns = '[{"name": "id"}, {"name": "updated_at"}]'
+        db.flush()
+
+        targets = _freshness_targets([sample_table], db)
+
+        assert targets == [("public", "orders", "updated_at")]
+        assert sample_table.timestamp_column == "updated_at"
+
+    def test_skips_snapshotted_table_without_timestamp(self, db, sample_table, sample_snapshot):
+        assert _freshness_targets([sample_table], db) == []
+
+    def test_unsnapshotted_table_falls_back_to_probe(self, db, sample_table):
+        assert _freshness_targets([sample_table], db) == [("public", "orders", None)]
+
+    def test_misses_are_cached_until_the_snapshot_changes(
+        self, db, sample_table, sample_snapshot
+    ):
+        assert _freshness_targets([sample_table], db) == []
+        with patch.object(db, "execute", wraps=db.execute) as execute:
+            assert _freshness_targets([sample_table], db) == []
+        execute.assert_not_called()
+
+        columns = json.loads(sample_snapshot.columns)
+        SchemaSentinel().evaluate(
+            sample_table, [*columns, {"name": "updated_at", "type": "TIMESTAMP"}], db
+        )
+        assert _freshness_targets([sample_table], db) == [("public", "orders", "updated_at")]
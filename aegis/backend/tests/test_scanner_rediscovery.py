@@ -7,7 +7,7 @@ from aegis.services.scanner import _run_rediscovery
 
 def test_run_rediscovery_calls_investigator():
     with patch("aegis.services.scanner.SyncSessionLocal") as MockSession, \
-         patch("aegis.services.scanner.WarehouseConnector") as MockConnector, \
+         patch("aegis.services.scanner.connector_registry"), \
          patch("aegis.services.scanner.Investigator") as MockInvestigator, \
          patch("aegis.services.notifier.notifier") as mock_notifier:
 
@@ -34,7 +34,7 @@ def test_run_rediscovery_calls_investigator():
 
 def test_run_rediscovery_broadcasts_deltas():
     with patch("aegis.services.scanner.SyncSessionLocal") as MockSession, \
-         patch("aegis.services.scanner.WarehouseConnector") as MockConnector, \
+         patch("aegis.services.scanner.connector_registry"), \
          patch("aegis.services.scanner.Investigator") as MockInvestigator, \
          patch("aegis.services.notifier.notifier") as mock_notifier:
 
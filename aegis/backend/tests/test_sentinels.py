@@ -88,6 +88,60 @@ class TestSchemaSentinel:
         assert result is not None
         assert result.severity == "low"
 
+    def test_uses_prefetched_columns_without_querying(self, db, sample_table, sample_snapshot):
+        """A bulk-fetched column map replaces the per-table round trip."""
+        columns = json.loads(sample_snapshot.columns)
+        connector = MagicMock()
+
+        sentinel = SchemaSentinel()
+        result = sentinel.inspect(
+            sample_table, connector, db, prefetched={("public", "orders"): columns}
+        )
+
+        assert result is None
+        connector.fetch_schema.assert_not_called()
+
+    def test_table_missing_from_prefetch_is_fetched_individually(
+        self, db, sample_table, sample_snapshot
+    ):
+        """A prefetch miss must not be diffed as 'every column dropped'."""
+        connector = MagicMock()
+        connector.fetch_schema.return_value = json.loads(sample_snapshot.columns)
+
+        sentinel = SchemaSentinel()
+        result = sentinel.inspect(
+            sample_table, connector, db, prefetched={("public", "customers"): []}
+        )
+
+        assert result is None
+        connector.fetch_schema.assert_called_once_with("public", "orders")
+
+    def test_first_snapshot_resolves_timestamp_column(self, db, sample_table):
+        connector = MagicMock()
+        connector.fetch_schema.return_value = [
+            {"name": "id", "type": "INTEGER", "nullable": False, "ordinal": 1},
+            {"name": "CREATED_AT", "type": "TIMESTAMP", "nullable": True, "ordinal": 2},
+            {"name": "_LOADED_AT", "type": "TIMESTAMP", "nullable": True, "ordinal": 3},
+        ]
+
+        SchemaSentinel().inspect(sample_table, connector, db)
+
+        assert sample_table.timestamp_column == "_LOADED_AT"
+
+    def test_drift_keeps_timestamp_column_that_still_exists(
+        self, db, sample_table, sample_snapshot
+    ):
+        sample_table.timestamp_column = "name"
+        columns = json.loads(sample_snapshot.columns) + [
+            {"name": "updated_at", "type": "TIMESTAMP", "nullable": True, "ordinal": 4}
+        ]
+        connector = MagicMock()
+        connector.fetch_schema.return_value = columns
+
+        SchemaSentinel().inspect(sample_table, connector, db)
+
+        assert sample_table.timestamp_column == "name"
+
 
 class TestFreshnessSentinel:
     def test_no_sla_returns_none(self, db, sample_table):
@@ -138,3 +192,14 @@ class TestFreshnessSentinel:
 
         assert result is not None
         assert result.severity == "critical"
+
+    def test_passes_resolved_timestamp_column(self, db, sample_table):
+        sample_table.timestamp_column = "_etl_loaded_at"
+        connector = MagicMock()
+        connector.fetch_last_update_time.return_value = datetime.now(timezone.utc)
+
+        FreshnessSentinel().inspect(sample_table, connector, db)
+
+        connector.fetch_last_update_time.assert_called_once_with(
+            "public", "orders", "_etl_loaded_at"
+        )
@@ -1,5 +1,6 @@
 import client from "./client";
 import type {
+  Anomaly,
   Connection,
   Incident,
   IncidentReport,
@@ -34,7 +35,13 @@ export const discoverTables = (id: number) =>
 
 export const confirmDiscovery = (
   id: number,
-  tableSelections: { schema_name: string; table_name: string; check_types: string[]; freshness_sla_minutes: number | null }[]
+  tableSelections: {
+    schema_name: string;
+    table_name: string;
+    check_types: string[];
+    freshness_sla_minutes: number | null;
+    timestamp_column?: string | null;
+  }[]
 ) =>
   client
     .post<{ enrolled: unknown[]; total: number }>(`/connections/${id}/discover/confirm`, {
@@ -83,8 +90,17 @@ export const getIncidentReport = (id: number) =>
     })
     .then((r) => (r.status === 204 ? null : r.data));
 
+export const getCorrelatedAnomalies = (id: number) =>
+  client.get<Anomaly[]>(`/incidents/${id}/correlated`).then((r) => r.data);
+
 // --- Lineage ---
-export const getLineageGraph = (params?: { connection_id?: number }) =>
+export const getLineageGraph = (params?: {
+  connection_id?: number;
+  focus?: string;
+  depth?: number;
+  cursor?: number;
+  limit?: number;
+}) =>
   client.get<LineageGraph>("/lineage/graph", { params }).then((r) => r.data);
 
 export const getBlastRadius = (table: string) =>
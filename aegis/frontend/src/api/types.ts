@@ -17,6 +17,8 @@ export interface MonitoredTable {
   fully_qualified_name: string;
   check_types: string[];
   freshness_sla_minutes: number | null;
+  timestamp_column: string | null;
+  freshness_strategy: "column" | "metadata";
   created_at: string;
   updated_at: string;
 }
@@ -26,8 +28,9 @@ export interface Anomaly {
   table_id: number;
   type: "schema_drift" | "freshness_violation";
   severity: Severity;
-  detail: Record<string, unknown>;
+  detail: Record<string, unknown> | unknown[];
   detected_at: string;
+  correlated_incident_id?: number | null;
 }
 
 export type Severity = "critical" | "high" | "medium" | "low";
@@ -46,6 +49,7 @@ export interface Diagnosis {
   severity: Severity;
   confidence: number;
   recommendations: Recommendation[];
+  cached?: boolean;
 }
 
 export interface Incident {
@@ -90,6 +94,7 @@ export interface LineageEdge {
 export interface LineageGraph {
   nodes: LineageNode[];
   edges: LineageEdge[];
+  next_cursor: number | null;
 }
 
 export interface BlastRadius {
@@ -120,6 +125,7 @@ export interface RootCauseDetail {
   explanation: string;
   source_table: string;
   confidence: number;
+  cached?: boolean;
 }
 
 export interface BlastRadiusDetail {
@@ -170,5 +176,6 @@ export interface TableProposal {
   classification: string;
   check_types: string[];
   freshness_sla_minutes: number | null;
+  timestamp_column?: string | null;
   rationale: string;
 }
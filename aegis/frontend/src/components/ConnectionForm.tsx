@@ -92,6 +92,7 @@ export default function ConnectionForm({ onCreated }: Props) {
           table_name: p.table_name,
           check_types: p.check_types,
           freshness_sla_minutes: p.freshness_sla_minutes,
+          timestamp_column: p.timestamp_column ?? null,
         }));
       await confirmDiscovery(connId, selections);
       setStep("done");
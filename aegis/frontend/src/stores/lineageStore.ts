@@ -5,17 +5,20 @@ import { getLineageGraph } from "../api/endpoints";
 interface LineageState {
   graph: LineageGraph | null;
   loading: boolean;
-  fetchGraph: (connectionId?: number) => Promise<void>;
+  fetchGraph: (connectionId?: number, focus?: string) => Promise<void>;
 }
 
 export const useLineageStore = create<LineageState>((set) => ({
   graph: null,
   loading: false,
 
-  fetchGraph: async (connectionId) => {
+  fetchGraph: async (connectionId, focus) => {
     set({ loading: true });
     try {
-      const params = connectionId ? { connection_id: connectionId } : undefined;
+      const params = {
+        ...(connectionId ? { connection_id: connectionId } : {}),
+        ...(focus ? { focus } : {}),
+      };
       const data = await getLineageGraph(params);
       set({ graph: data });
     } finally {